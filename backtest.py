@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Vectorized Strategy Backtester
+
+Replays historical candles through the bot's strategy rules
+(generate_signal_short / generate_signal_ultra_short) and scores every
+signal at its expiry:
+
+- indicators are computed for every candle at once as NumPy series
+  (vector_indicators.indicator_series), equal to what
+  calculate_indicators returns over the history up to that candle
+- the strategy branches run as boolean masks over those series
+  (trading_logic.apply_strategy_arrays)
+- a BUY wins when the close ``expiry`` candles later is above the signal
+  candle's close, a SELL when it is below; equal closes are ties
+- pairs are spread over a process pool, one task per pair
+
+Candle files are either memory-mapped archives (.cndl, see
+candle_archive.py; the series is read from the header and --start/--end
+are looked up in the archive's index) or CSV with a header row and
+timestamp, open, high, low, close columns, named PAIR_TIMEFRAME.csv
+(e.g. EURUSD_1m.csv).
+
+The report gives, per pair and timeframe, the signal count, win rate and
+confidence calibration: the realized win rate of the signals issued at
+each confidence level, and the signal-weighted gap between the two.
+
+Usage:
+  python backtest.py data/*.csv --expiry 1 --workers 4
+  python backtest.py archive/*.cndl --start 1704067200
+  python backtest.py --synthetic 1000000 --pairs EURUSD,GBPUSD --timeframes 1m,5s
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import vector_indicators
+from candle_archive import EXTENSION, CandleArchive, csv_columns, series_from_name
+from candle_store import CandleView
+from resampler import TIMEFRAME_SECONDS
+from trading_logic import StrategyParams, apply_strategy_arrays, indicator_masks, strategy_params
+
+logger = logging.getLogger(__name__)
+
+# candles of history before the first scored signal (the slow EMA/SMA period)
+DEFAULT_WARMUP = 20
+# rows run through the strategy per pass; bounds the memory of the mask arrays
+CHUNK_ROWS = 1 << 20
+
+
+class BacktestJob(NamedTuple):
+    """One (pair, timeframe) history: a candle file, or ``candles`` synthetic bars"""
+    pair: str
+    timeframe: str
+    path: Optional[str] = None
+    candles: int = 0
+    # candle timestamps kept: start <= timestamp < end
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+
+def job_from_path(path: str, start: Optional[float] = None, end: Optional[float] = None) -> BacktestJob:
+    """Job for a candle archive or a PAIR_TIMEFRAME.csv file"""
+    if path.endswith(EXTENSION):
+        with CandleArchive(path) as archive:
+            return BacktestJob(archive.pair, archive.timeframe, path=path, start=start, end=end)
+    pair, timeframe = series_from_name(path)
+    if not pair or timeframe not in TIMEFRAME_SECONDS:
+        raise ValueError(f"{path}: expected a PAIR_TIMEFRAME.csv file name")
+    return BacktestJob(pair, timeframe, path=path, start=start, end=end)
+
+
+def load_candle_file(path: str) -> CandleView:
+    """Read a candle CSV (header row naming the OHLC + timestamp columns)"""
+    with open(path, newline="") as f:
+        columns = csv_columns(f.readline().split(","), path)
+    data = np.loadtxt(path, delimiter=",", skiprows=1, usecols=columns, dtype=np.float64, ndmin=2)
+    return CandleView(*data.T)
+
+
+def synthetic_candles(count: int, seed: int = 0, price: float = 1.0, volatility: float = 0.001) -> CandleView:
+    """Random-walk candles with slowly alternating trends (vectorized)"""
+    rng = np.random.default_rng(seed)
+    drift = 0.6 * volatility * np.sin(np.arange(count) / 200.0)
+    closes = price * np.cumprod(1 + drift + rng.normal(0.0, volatility, count))
+    opens = np.concatenate([[price], closes[:-1]])
+    wicks = np.abs(rng.normal(0.0, volatility, (2, count))) * 0.5
+    highs = np.maximum(opens, closes) * (1 + wicks[0])
+    lows = np.minimum(opens, closes) * (1 - wicks[1])
+    stamps = np.arange(count, dtype=np.float64)
+    return CandleView(stamps, opens, highs, lows, closes)
+
+
+def load_job(job: BacktestJob) -> CandleView:
+    """Candles of a job; archives are returned as zero-copy memmap views"""
+    if job.path is not None and job.path.endswith(EXTENSION):
+        return CandleArchive(job.path).view(job.start, job.end)
+    if job.path is not None:
+        view = load_candle_file(job.path)
+    else:
+        seed = zlib.crc32(f"{job.pair}:{job.timeframe}".encode())
+        view = synthetic_candles(job.candles, seed=seed)
+    if job.start is None and job.end is None:
+        return view
+    keep = np.ones(len(view.timestamp), dtype=bool)
+    if job.start is not None:
+        keep &= view.timestamp >= job.start
+    if job.end is not None:
+        keep &= view.timestamp < job.end
+    return CandleView(*(column[keep] for column in view))
+
+
+def backtest_series(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    timeframe: str,
+    expiry: int = 1,
+    warmup: int = DEFAULT_WARMUP,
+    params: Optional[StrategyParams] = None
+) -> Dict[str, Any]:
+    """
+    Score every signal the strategy for ``timeframe`` gives over one history.
+
+    Args:
+        highs, lows, closes: Candle columns, oldest first
+        timeframe: Selects the strategy (ultra-short vs short)
+        expiry: Candles between the signal close and the outcome close
+        warmup: Candles of history required before a signal is scored
+        params: Strategy parameters (default: the shared strategy_params)
+
+    Returns:
+        Counts, win rate and per-confidence calibration
+    """
+    params = params or strategy_params
+    values = vector_indicators.indicator_series(highs, lows, closes, params.ema_fast, params.ema_slow)
+    return score_series(values, timeframe, expiry, warmup, params)
+
+
+def score_series(
+    values: Dict[str, np.ndarray],
+    timeframe: str,
+    expiry: int = 1,
+    warmup: int = DEFAULT_WARMUP,
+    params: Optional[StrategyParams] = None
+) -> Dict[str, Any]:
+    """``backtest_series`` for precomputed ``indicator_series`` values.
+
+    The EMA series in ``values`` must use ``params``' periods; everything
+    else is independent of the parameters, so param_sweep.py computes it
+    once per history.
+    """
+    if expiry < 1:
+        raise ValueError("expiry must be at least one candle")
+    closes = values["last_close"]
+    stop = len(closes) - expiry
+
+    actions, confidences, outcomes = [], [], []
+    for lo in range(warmup, max(warmup, stop), CHUNK_ROWS):
+        hi = min(lo + CHUNK_ROWS, stop)
+        chunk = {name: series[lo:hi] for name, series in values.items()}
+        action, confidence = apply_strategy_arrays(
+            chunk, indicator_masks(chunk, params), timeframe, chunk["last_close"], params
+        )
+        rows = np.flatnonzero(action)
+        entry = closes[lo + rows]
+        exit_ = closes[lo + rows + expiry]
+        actions.append(action[rows])
+        confidences.append(confidence[rows])
+        # +1 win, -1 loss, 0 tie
+        outcomes.append((np.sign(exit_ - entry) * action[rows]).astype(np.int8))
+
+    action = np.concatenate(actions) if actions else np.zeros(0, dtype=np.int8)
+    confidence = np.concatenate(confidences) if confidences else np.zeros(0, dtype=np.int64)
+    outcome = np.concatenate(outcomes) if outcomes else np.zeros(0, dtype=np.int8)
+    return _summarize(len(closes), action, confidence, outcome)
+
+
+def _win_rate(wins: int, losses: int) -> Optional[float]:
+    """Wins over decided signals (ties excluded), None without any"""
+    return round(wins / (wins + losses), 4) if wins + losses else None
+
+
+def _summarize(candles: int, action: np.ndarray, confidence: np.ndarray, outcome: np.ndarray) -> Dict[str, Any]:
+    wins, losses = int((outcome == 1).sum()), int((outcome == -1).sum())
+    calibration = []
+    gap = 0.0
+    decided_total = 0
+    for level in np.unique(confidence).tolist():
+        at_level = outcome[confidence == level]
+        level_wins, level_losses = int((at_level == 1).sum()), int((at_level == -1).sum())
+        rate = _win_rate(level_wins, level_losses)
+        calibration.append({"confidence": int(level), "signals": len(at_level), "wins": level_wins, "win_rate": rate})
+        if rate is not None:
+            gap += abs(level / 100 - rate) * (level_wins + level_losses)
+            decided_total += level_wins + level_losses
+    return {
+        "candles": candles,
+        "signals": len(action),
+        "buy": int((action == 1).sum()),
+        "sell": int((action == -1).sum()),
+        "wins": wins,
+        "losses": losses,
+        "ties": len(outcome) - wins - losses,
+        "win_rate": _win_rate(wins, losses),
+        "calibration": calibration,
+        # signal-weighted |stated confidence - realized win rate|
+        "calibration_error": round(gap / decided_total, 4) if decided_total else None,
+    }
+
+
+def _backtest_pair(
+    jobs: List[BacktestJob],
+    expiry: int,
+    warmup: int,
+    params: Optional[StrategyParams] = None
+) -> List[Dict[str, Any]]:
+    """Worker task: every timeframe of one pair"""
+    results = []
+    for job in jobs:
+        started = time.perf_counter()
+        view = load_job(job)
+        loaded = time.perf_counter()
+        result = backtest_series(view.high, view.low, view.close, job.timeframe, expiry, warmup, params)
+        done = time.perf_counter()
+        result.update(pair=job.pair, timeframe=job.timeframe,
+                      load_seconds=round(loaded - started, 4), seconds=round(done - loaded, 4))
+        results.append(result)
+    return results
+
+
+def run_backtest(
+    jobs: List[BacktestJob],
+    expiry: int = 1,
+    warmup: int = DEFAULT_WARMUP,
+    workers: Optional[int] = None,
+    params: Optional[StrategyParams] = None
+) -> Dict[str, Any]:
+    """
+    Backtest every job, one process-pool task per pair.
+
+    Args:
+        jobs: Histories to replay
+        expiry: Candles until a signal's outcome is read
+        warmup: Candles of history before the first scored signal
+        workers: Pool size (defaults to the CPU count; 1 runs inline)
+        params: Strategy parameters (default: the shared strategy_params)
+
+    Returns:
+        {"results": [...per pair/timeframe...], "candles", "wall_time", "candles_per_sec"}
+    """
+    by_pair: Dict[str, List[BacktestJob]] = {}
+    for job in jobs:
+        by_pair.setdefault(job.pair, []).append(job)
+    workers = min(workers or os.cpu_count() or 1, len(by_pair)) or 1
+
+    started = time.perf_counter()
+    if workers == 1:
+        batches = [_backtest_pair(group, expiry, warmup, params) for group in by_pair.values()]
+    else:
+        # spawn, like SignalExecutor: workers only need numpy and the indicator modules
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(_backtest_pair, group, expiry, warmup, params) for group in by_pair.values()]
+            batches = [future.result() for future in futures]
+    wall_time = time.perf_counter() - started
+
+    results = sorted((r for batch in batches for r in batch),
+                     key=lambda r: (r["pair"], TIMEFRAME_SECONDS[r["timeframe"]]))
+    candles = sum(r["candles"] for r in results)
+    return {
+        "results": results,
+        "workers": workers,
+        "expiry": expiry,
+        "candles": candles,
+        "wall_time": round(wall_time, 4),
+        "candles_per_sec": round(candles / wall_time) if wall_time > 0 else 0,
+    }
+
+
+def _percent(rate: Optional[float]) -> str:
+    return "-" if rate is None else f"{rate:.1%}"
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{'pair':<14}{'tf':>5}{'candles':>12}{'signals':>10}{'buy':>9}{'sell':>9}"
+          f"{'win rate':>10}{'calib err':>11}{'sec':>8}")
+    for r in report["results"]:
+        error = "-" if r["calibration_error"] is None else f"{r['calibration_error']:.3f}"
+        print(f"{r['pair']:<14}{r['timeframe']:>5}{r['candles']:>12}{r['signals']:>10}{r['buy']:>9}{r['sell']:>9}"
+              f"{_percent(r['win_rate']):>10}{error:>11}{r['seconds']:>8.2f}")
+        levels = "  ".join(f"{c['confidence']}%: {_percent(c['win_rate'])} ({c['signals']})" for c in r["calibration"])
+        if levels:
+            print(f"{'':<19}calibration  {levels}")
+    print(f"\nCandles: {report['candles']}  Workers: {report['workers']}  Expiry: {report['expiry']} candle(s)  "
+          f"Wall: {report['wall_time']:.2f}s  Throughput: {report['candles_per_sec']:,} candles/s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="candle archives (.cndl) or PAIR_TIMEFRAME.csv files")
+    parser.add_argument("--expiry", type=int, default=1, help="candles until the outcome is read")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="history before the first signal")
+    parser.add_argument("--start", type=float, default=None, help="first candle timestamp (epoch seconds)")
+    parser.add_argument("--end", type=float, default=None, help="stop before this timestamp")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate this many candles per series")
+    parser.add_argument("--pairs", default="EURUSD,GBPUSD,USDJPY,AUDUSD", help="pairs for --synthetic")
+    parser.add_argument("--timeframes", default="5s,1m", help="timeframes for --synthetic")
+    parser.add_argument("--config", help="strategy parameter file (default: STRATEGY_CONFIG or built-in)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        params = StrategyParams.load(args.config) if args.config else None
+        jobs = [job_from_path(path, args.start, args.end) for path in args.files]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.synthetic:
+        jobs += [BacktestJob(pair, tf, candles=args.synthetic, start=args.start, end=args.end)
+                 for pair in args.pairs.split(",") if pair
+                 for tf in args.timeframes.split(",") if tf]
+    if not jobs:
+        parser.error("give candle files or --synthetic N")
+
+    report = run_backtest(jobs, expiry=args.expiry, warmup=args.warmup, workers=args.workers, params=params)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
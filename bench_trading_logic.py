@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the trading_logic hot path.
+
+Measures ops/sec and allocations of the indicator functions, both
+strategies, the full generate_trading_signal pipeline and
+format_signal_message at history sizes from 30 to 100k candles.
+
+Results are compared against a stored JSON baseline; the run fails
+(exit code 1) when a benchmark is slower, or allocates more, than the
+baseline by more than the tolerance.
+
+Usage:
+  python bench_trading_logic.py --save           # record a new baseline
+  python bench_trading_logic.py                  # compare against it
+  python bench_trading_logic.py --sizes 30,1000 --only calculate_rsi
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import trading_logic
+from trading_logic import (
+    calculate_atr,
+    calculate_ema,
+    calculate_indicators,
+    calculate_rsi,
+    generate_signal_short,
+    generate_signal_ultra_short,
+    generate_trading_signal,
+    simulate_price_history,
+)
+
+DEFAULT_SIZES = [30, 100, 1_000, 10_000, 100_000]
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, "bench_baseline.json")
+DEFAULT_TOLERANCE = 0.20
+MIN_RUN_TIME = 0.2      # seconds per repeat
+REPEATS = 3
+ALLOC_SLACK = 4096      # bytes; small peaks jitter between runs
+
+
+def build_benchmarks(size: int) -> Dict[str, Callable[[], object]]:
+    """Return name -> zero-argument callable for one history size"""
+    # signal_bot.format_signal_message delegates to the active ModeRender;
+    # importing signal_bot would build the whole bot from the environment
+    from render import ModeRender
+
+    candles = simulate_price_history(1.0850, size, 0.001, "uptrend", seed=size)
+    closes = [c.close for c in candles]
+    indicators = calculate_indicators(candles)
+    price = closes[-1]
+    signal = generate_signal_short(indicators, "EUR/USD", "5m", price)
+    render = ModeRender.build("NORMAL", ["EUR/USD"], ["5m"])
+    # untimestamped records: exercises the full dict -> Candle -> indicators path
+    records = [{"open": c.open, "high": c.high, "low": c.low, "close": c.close} for c in candles]
+
+    def full_pipeline():
+        original = trading_logic.get_market_data
+        trading_logic.get_market_data = lambda pair, timeframe: records
+        try:
+            return generate_trading_signal("EUR/USD", "5m", price)
+        finally:
+            trading_logic.get_market_data = original
+
+    return {
+        "calculate_ema": lambda: calculate_ema(closes, 20),
+        "calculate_rsi": lambda: calculate_rsi(closes, 14),
+        "calculate_atr": lambda: calculate_atr(candles, 14),
+        "calculate_indicators": lambda: calculate_indicators(candles),
+        "generate_signal_short": lambda: generate_signal_short(indicators, "EUR/USD", "5m", price),
+        "generate_signal_ultra_short": lambda: generate_signal_ultra_short(indicators, "EUR/USD", "15s", price),
+        "generate_trading_signal": full_pipeline,
+        "format_signal_message": lambda: render.format_signal(signal),
+    }
+
+
+def measure(fn: Callable[[], object]) -> Dict[str, float]:
+    """Best-of-N ops/sec plus peak bytes and blocks allocated by one call"""
+    best = 0.0
+    for _ in range(REPEATS):
+        loops = 0
+        started = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < MIN_RUN_TIME:
+            fn()
+            loops += 1
+            elapsed = time.perf_counter() - started
+        best = max(best, loops / elapsed)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    return {"ops_per_sec": best, "alloc_peak_bytes": peak, "alloc_blocks": blocks}
+
+
+def run(sizes: List[int], only: List[str]) -> Dict[str, Dict[str, float]]:
+    """Run every selected benchmark at every size"""
+    results = {}
+    for size in sizes:
+        for name, fn in build_benchmarks(size).items():
+            if only and name not in only:
+                continue
+            key = f"{name}[{size}]"
+            results[key] = measure(fn)
+            r = results[key]
+            print(f"{key:<40} {r['ops_per_sec']:>14,.1f} ops/s {r['alloc_peak_bytes']:>12,} B peak")
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a description of every regression beyond ``tolerance``"""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if current["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: {current['ops_per_sec']:,.1f} ops/s vs baseline {base['ops_per_sec']:,.1f}"
+            )
+        limit = max(base["alloc_peak_bytes"] * (1 + tolerance), base["alloc_peak_bytes"] + ALLOC_SLACK)
+        if current["alloc_peak_bytes"] > limit:
+            regressions.append(
+                f"{key}: {current['alloc_peak_bytes']:,} B peak vs baseline {base['alloc_peak_bytes']:,}"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative regression (default 0.20)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated history sizes")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names")
+    args = parser.parse_args()
+
+    # keep per-call INFO logging out of the measurements
+    trading_logic.logger.disabled = True
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = [s for s in args.only.split(",") if s]
+    results = run(sizes, only)
+
+    if args.save:
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\n✓ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
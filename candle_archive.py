@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Candle Archive
+
+Compact on-disk history for one pair and timeframe (normally the 5s base
+timeframe): a 64-byte header followed by fixed-width little-endian
+records of int64 timestamp (candle open, epoch seconds) and float64
+open/high/low/close - 40 bytes per candle, about 250 MB per pair-year of
+5s candles.
+
+Readers map the file with numpy.memmap and get zero-copy column views
+(CandleView) that go straight into vector_indicators / backtest.py; only
+the pages a computation touches are read. A sparse index - the timestamp
+of every INDEX_STRIDE-th record, kept in a small ``.idx`` sidecar - turns
+a time range lookup into a bisect plus one short search inside a single
+block. A missing or stale index is rebuilt from the records on open.
+
+Archives are append-only with strictly increasing timestamps. The
+importer converts CSV files (timestamp,open,high,low,close) in a single
+streaming pass of fixed-size chunks:
+
+  python candle_archive.py import EURUSD_5s.csv --out archive/
+  python candle_archive.py info archive/EURUSD_5s.cndl
+
+With CANDLE_ARCHIVE_DIR set, the bot warms its resampler from the
+archived base candles at startup (see warm_from_archives).
+"""
+
+import argparse
+import csv
+import itertools
+import logging
+import os
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from candle_store import CandleView
+from resampler import TIMEFRAME_SECONDS, TimeframeResampler
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CNDLARC\x01"
+VERSION = 1
+HEADER_SIZE = 64
+# magic, version, record size, index stride, pair, timeframe
+HEADER = struct.Struct("<8sHHI32s8s")
+RECORD = np.dtype([
+    ("timestamp", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+])
+INDEX_STRIDE = 4096
+EXTENSION = ".cndl"
+# CSV rows converted per importer chunk
+IMPORT_CHUNK = 65536
+CSV_COLUMNS = ("timestamp", "open", "high", "low", "close")
+
+
+class ArchiveError(ValueError):
+    """Raised for files that are not valid candle archives"""
+
+
+def archive_path(directory: str, pair: str, timeframe: str) -> str:
+    """File name of a series' archive, e.g. EURUSD-OTC_5s.cndl for "EUR/USD OTC" """
+    name = pair.replace("/", "").replace(" ", "-")
+    return os.path.join(directory, f"{name}_{timeframe}{EXTENSION}")
+
+
+def series_from_name(path: str) -> Tuple[str, str]:
+    """(pair, timeframe) from a PAIR_TIMEFRAME file name; either may be empty or invalid"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    pair, _, timeframe = stem.rpartition("_")
+    return pair, timeframe
+
+
+def csv_columns(header: Iterable[str], path: str) -> List[int]:
+    """Positions of CSV_COLUMNS in a CSV header row (any order, case-insensitive)"""
+    names = [name.strip().lower() for name in header]
+    try:
+        return [names.index(name) for name in CSV_COLUMNS]
+    except ValueError:
+        raise ArchiveError(f"{path}: header must name {', '.join(CSV_COLUMNS)}") from None
+
+
+def _read_header(f) -> Tuple[int, str, str]:
+    """Return (index stride, pair, timeframe) of an open archive file"""
+    raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ArchiveError("file is shorter than the archive header")
+    magic, version, record_size, stride, pair, timeframe = HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ArchiveError("not a candle archive")
+    if version != VERSION or record_size != RECORD.itemsize:
+        raise ArchiveError(f"unsupported archive version {version} (record size {record_size})")
+    return stride, pair.rstrip(b"\0").decode(), timeframe.rstrip(b"\0").decode()
+
+
+class CandleArchive:
+    """
+    Read-only memory-mapped archive.
+
+    Args:
+        path: Archive file (``.cndl``); its ``.idx`` sidecar is rebuilt if stale
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.index_stride, self.pair, self.timeframe = _read_header(f)
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD.itemsize
+        if count:
+            self._records = np.memmap(path, dtype=RECORD, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self._records = np.zeros(0, dtype=RECORD)
+        self.index = self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __enter__(self) -> "CandleArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _load_index(self) -> np.ndarray:
+        expected = -(-len(self) // self.index_stride)
+        try:
+            index = np.fromfile(self.path + ".idx", dtype="<i8")
+            if len(index) == expected:
+                return index
+        except OSError:
+            pass
+        index = np.array(self._records["timestamp"][::self.index_stride])
+        try:
+            index.tofile(self.path + ".idx")
+        except OSError:
+            logger.debug("Cannot write index for %s; keeping it in memory", self.path)
+        return index
+
+    @property
+    def first_timestamp(self) -> Optional[int]:
+        return int(self._records["timestamp"][0]) if len(self) else None
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._records["timestamp"][-1]) if len(self) else None
+
+    def locate(self, timestamp: float) -> int:
+        """Position of the first candle with a timestamp >= ``timestamp``"""
+        block = int(np.searchsorted(self.index, timestamp, side="right")) - 1
+        if block < 0:
+            return 0
+        lo = block * self.index_stride
+        hi = min(lo + self.index_stride, len(self))
+        return lo + int(np.searchsorted(self._records["timestamp"][lo:hi], timestamp, side="left"))
+
+    def _columns(self, lo: int, hi: int) -> CandleView:
+        window = self._records[lo:hi]
+        return CandleView(window["timestamp"], window["open"], window["high"], window["low"], window["close"])
+
+    def view(self, start: Optional[float] = None, end: Optional[float] = None) -> CandleView:
+        """Zero-copy column views of the candles with start <= timestamp < end"""
+        lo = 0 if start is None else self.locate(start)
+        hi = len(self) if end is None else self.locate(end)
+        return self._columns(lo, max(lo, hi))
+
+    def tail(self, n: int) -> CandleView:
+        """Zero-copy column views of the last ``n`` candles"""
+        return self._columns(max(0, len(self) - n), len(self))
+
+    def close(self) -> None:
+        """Release the mapping (views taken earlier keep their own reference)"""
+        self._records = np.zeros(0, dtype=RECORD)
+
+    def stats(self) -> Dict[str, object]:
+        return {"pair": self.pair, "timeframe": self.timeframe, "candles": len(self),
+                "first": self.first_timestamp, "last": self.last_timestamp,
+                "bytes": HEADER_SIZE + len(self) * RECORD.itemsize, "index_entries": len(self.index)}
+
+
+class CandleArchiveWriter:
+    """
+    Appends candles to an archive, creating it on first use.
+
+    Candles whose timestamp is not newer than every earlier one are
+    skipped (counted in ``skipped``). The index sidecar is written on close.
+
+    Args:
+        path: Archive file
+        pair: Pair stored in a new archive's header (checked for existing ones)
+        timeframe: Timeframe stored in the header (checked likewise)
+        index_stride: Records per index entry for a new archive
+    """
+
+    def __init__(self, path: str, pair: str, timeframe: str, index_stride: int = INDEX_STRIDE) -> None:
+        self.path = path
+        self.skipped = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with CandleArchive(path) as archive:
+                if (archive.pair, archive.timeframe) != (pair, timeframe):
+                    raise ArchiveError(f"{path} holds {archive.pair} {archive.timeframe}, not {pair} {timeframe}")
+                self.index_stride = archive.index_stride
+                self.count = len(archive)
+                self._last = archive.last_timestamp
+                self._index: List[int] = archive.index.tolist()
+            self._file = open(path, "r+b")
+            # drop a partial record left by an interrupted write
+            self._file.truncate(HEADER_SIZE + self.count * RECORD.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            if timeframe not in TIMEFRAME_SECONDS:
+                raise ArchiveError(f"unknown timeframe {timeframe!r}")
+            self.index_stride = index_stride
+            self.count = 0
+            self._last = None
+            self._index = []
+            self._file = open(path, "wb")
+            header = HEADER.pack(MAGIC, VERSION, RECORD.itemsize, index_stride,
+                                 pair.encode()[:32], timeframe.encode()[:8])
+            self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+    def __enter__(self) -> "CandleArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append(self, timestamps, opens, highs, lows, closes) -> int:
+        """Append candle columns (oldest first); returns how many were written"""
+        stamps = np.rint(np.asarray(timestamps, dtype=np.float64)).astype(np.int64)
+        if len(stamps) == 0:
+            return 0
+        floor = np.iinfo(np.int64).min if self._last is None else self._last
+        newest_before = np.maximum.accumulate(np.concatenate([[floor], stamps[:-1]]))
+        keep = stamps > newest_before
+        records = np.empty(int(keep.sum()), dtype=RECORD)
+        records["timestamp"] = stamps[keep]
+        for name, column in zip(CSV_COLUMNS[1:], (opens, highs, lows, closes)):
+            records[name] = np.asarray(column, dtype=np.float64)[keep]
+        self.skipped += len(stamps) - len(records)
+        if not len(records):
+            return 0
+
+        records.tofile(self._file)
+        first = -(-self.count // self.index_stride) * self.index_stride
+        self._index.extend(records["timestamp"][first - self.count::self.index_stride].tolist())
+        self.count += len(records)
+        self._last = int(records["timestamp"][-1])
+        return len(records)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        np.asarray(self._index, dtype="<i8").tofile(self.path + ".idx")
+
+
+def _parse_rows(rows: List[List[str]], columns: List[int]) -> np.ndarray:
+    """(rows, 5) float array of the wanted columns; malformed rows are dropped"""
+    try:
+        return np.array([[row[i] for i in columns] for row in rows], dtype=np.float64).reshape(-1, len(columns))
+    except (ValueError, IndexError):
+        parsed = []
+        for row in rows:
+            try:
+                parsed.append([float(row[i]) for i in columns])
+            except (ValueError, IndexError):
+                continue
+        return np.array(parsed, dtype=np.float64).reshape(-1, len(columns))
+
+
+def import_csv(
+    csv_path: str,
+    out_path: str,
+    pair: str,
+    timeframe: str,
+    chunk_rows: int = IMPORT_CHUNK
+) -> Dict[str, int]:
+    """
+    Append a candle CSV to an archive in one streaming pass.
+
+    Args:
+        csv_path: CSV with a header naming timestamp, open, high, low, close
+        out_path: Archive to create or extend
+        pair, timeframe: Series stored in the archive header
+        chunk_rows: Rows parsed and written per chunk (bounds memory)
+
+    Returns:
+        {"rows", "written", "skipped"} (skipped: malformed or out-of-order rows)
+    """
+    rows = written = 0
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        # checked before the writer creates the archive and its index
+        columns = csv_columns(next(reader, []), csv_path)
+        with CandleArchiveWriter(out_path, pair, timeframe) as writer:
+            for chunk in iter(lambda: list(itertools.islice(reader, chunk_rows)), []):
+                rows += len(chunk)
+                data = _parse_rows(chunk, columns)
+                written += writer.append(*data.T)
+    return {"rows": rows, "written": written, "skipped": rows - written}
+
+
+def warm_from_archives(
+    directory: str,
+    pairs: Iterable[str],
+    target: TimeframeResampler
+) -> Dict[str, int]:
+    """
+    Load each pair's archived base candles into ``target`` (see load_history).
+
+    Only the tail needed to fill every derived timeframe's store is read.
+    Returns the number of base candles loaded per pair that has an archive.
+    """
+    base_secs = TIMEFRAME_SECONDS[target.base_timeframe]
+    longest = max([secs for _, secs in target.timeframes] + [base_secs])
+    needed = target.stores.capacity * longest // base_secs
+    loaded = {}
+    for pair in pairs:
+        path = archive_path(directory, pair, target.base_timeframe)
+        if not os.path.exists(path):
+            continue
+        try:
+            with CandleArchive(path) as archive:
+                view = archive.tail(needed)
+                loaded[pair] = target.load_history(pair, view)
+        except (ArchiveError, OSError) as e:
+            logger.warning("Skipping candle archive %s: %s", path, e)
+    return loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="convert CSV files to archives")
+    importer.add_argument("files", nargs="+", help="CSV files, named PAIR_TIMEFRAME.csv unless --pair is given")
+    importer.add_argument("--out", default=".", help="archive directory")
+    importer.add_argument("--pair", help="pair stored in the archive (default: from the file name)")
+    importer.add_argument("--timeframe", help="timeframe (default: from the file name)")
+    info = commands.add_parser("info", help="describe archives")
+    info.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        for path in args.files:
+            with CandleArchive(path) as archive:
+                print(f"{path}: {archive.stats()}")
+        return 0
+
+    os.makedirs(args.out, exist_ok=True)
+    for path in args.files:
+        name_pair, name_timeframe = series_from_name(path)
+        pair, timeframe = args.pair or name_pair, args.timeframe or name_timeframe
+        if not pair or timeframe not in TIMEFRAME_SECONDS:
+            parser.error(f"{path}: give --pair/--timeframe or name it PAIR_TIMEFRAME.csv")
+        out = archive_path(args.out, pair, timeframe)
+        result = import_csv(path, out, pair, timeframe)
+        print(f"{path} -> {out}: {result['written']} candles written, {result['skipped']} skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Columnar Candle Store
+
+Fixed-capacity ring buffers of float64 OHLC + timestamp columns, one per
+(pair, timeframe). Market data records are written straight into
+preallocated arrays - no Candle objects are created - and readers get
+zero-copy NumPy views of the most recent candles, oldest first.
+
+Each column is stored twice back to back (a "mirrored" ring buffer), so
+any window of the last N candles is one contiguous slice even after the
+buffer wraps. Memory per series is fixed at 2 * 5 * 8 * capacity bytes.
+"""
+
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CAPACITY = 500
+
+# column order inside the backing array
+TIMESTAMP, OPEN, HIGH, LOW, CLOSE = range(5)
+
+
+class CandleView(NamedTuple):
+    """Zero-copy column views of a window of candles (oldest first)"""
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+
+class CandleStore:
+    """
+    Ring buffer of candles for a single (pair, timeframe) series.
+
+    Candles are appended in timestamp order. A record with the same
+    timestamp as the last candle overwrites it (the bar is still forming);
+    older records are ignored.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros((5, 2 * capacity), dtype=np.float64)
+        self._head = 0      # next write position in [0, capacity)
+        self._size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the backing array"""
+        return self._data.nbytes
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp of the newest candle, None when empty"""
+        if self._size == 0:
+            return None
+        return float(self._data[TIMESTAMP, self._head - 1 + self.capacity])
+
+    def _write(self, pos: int, timestamp: float, open_: float, high: float, low: float, close: float) -> None:
+        column = self._data[:, pos]
+        column[0], column[1], column[2], column[3], column[4] = timestamp, open_, high, low, close
+        self._data[:, pos + self.capacity] = column
+
+    def append(self, timestamp: float, open_: float, high: float, low: float, close: float) -> None:
+        """Append a new candle, evicting the oldest when full"""
+        self._write(self._head, timestamp, open_, high, low, close)
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def update_last(self, timestamp: float, open_: float, high: float, low: float, close: float) -> None:
+        """Overwrite the newest candle in place"""
+        if self._size == 0:
+            raise ValueError("store is empty")
+        self._write((self._head - 1) % self.capacity, timestamp, open_, high, low, close)
+
+    def extend_records(self, records: List[Dict]) -> int:
+        """
+        Ingest market data records (dicts with timestamp/open/high/low/close).
+
+        Returns the number of candles appended; an update of the forming
+        candle is not counted. Malformed records are skipped.
+        """
+        added = 0
+        last_ts = self.last_timestamp
+        for rec in records:
+            try:
+                ts = float(rec["timestamp"])
+                values = (ts, float(rec["open"]), float(rec["high"]), float(rec["low"]), float(rec["close"]))
+            except Exception:
+                continue
+            if last_ts is None or ts > last_ts:
+                self.append(*values)
+                last_ts = ts
+                added += 1
+            elif ts == last_ts:
+                self.update_last(*values)
+        return added
+
+    def assign(self, timestamps, opens, highs, lows, closes) -> int:
+        """Replace the contents with candle columns (oldest first); keeps the newest ``capacity``"""
+        columns = np.array([timestamps, opens, highs, lows, closes], dtype=np.float64)[:, -self.capacity:]
+        n = columns.shape[1]
+        self._data[:, :n] = columns
+        self._data[:, self.capacity:self.capacity + n] = columns
+        self._head = n % self.capacity
+        self._size = n
+        return n
+
+    def view(self, n: Optional[int] = None) -> CandleView:
+        """Return views of the last ``n`` candles (all stored candles by default)"""
+        if n is None or n > self._size:
+            n = self._size
+        end = self._head + self.capacity
+        window = self._data[:, end - n:end]
+        return CandleView(window[TIMESTAMP], window[OPEN], window[HIGH], window[LOW], window[CLOSE])
+
+    def since(self, timestamp: Optional[float]) -> CandleView:
+        """Return views of the candles with a timestamp >= ``timestamp``"""
+        if timestamp is None:
+            return self.view()
+        stamps = self.view().timestamp
+        start = int(np.searchsorted(stamps, timestamp, side="left"))
+        return self.view(len(stamps) - start)
+
+    def clear(self) -> None:
+        """Drop all candles (the backing array is kept)"""
+        self._head = 0
+        self._size = 0
+
+
+class CandleStoreRegistry:
+    """Lazily created CandleStores keyed by (pair, timeframe)"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self._stores: Dict[Tuple[str, str], CandleStore] = {}
+        self._lock = threading.Lock()
+
+    def get(self, pair: str, timeframe: str) -> CandleStore:
+        """Return the store for a series, creating it on first use"""
+        key = (pair, timeframe)
+        store = self._stores.get(key)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(key)
+                if store is None:
+                    store = CandleStore(self.capacity)
+                    self._stores[key] = store
+        return store
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._stores
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes held by all stores"""
+        return sum(store.nbytes for store in list(self._stores.values()))
+
+    def clear(self) -> None:
+        """Remove every store"""
+        with self._lock:
+            self._stores.clear()
+
+
+# shared registry used by trading_logic
+candle_stores = CandleStoreRegistry()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Signal Execution Backends
+
+Signal generation is pure-Python and CPU-bound, so a thread pool is
+capped at one core by the GIL. SignalExecutor runs it on a configurable
+backend instead:
+
+- "thread":  ThreadPoolExecutor (default; shares in-process caches)
+- "process": ProcessPoolExecutor, scales with container cores; each
+             worker keeps its own candle stores and indicator state
+- "inline":  runs on the event loop itself (debugging / benchmarks)
+
+Configured through SIGNAL_EXECUTOR and SIGNAL_WORKERS. Workers are warmed
+up at start (modules imported, one signal computed) so the first user
+request does not pay for it. Every call is timed per backend, including
+the time it waited for a free worker (exported via metrics.py).
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("thread", "process", "inline")
+
+EXECUTOR_CALL_SECONDS = metrics.histogram(
+    "signal_executor_call_seconds", "Executor call duration including queue wait", ["backend"]
+)
+EXECUTOR_WAIT_SECONDS = metrics.histogram(
+    "signal_executor_wait_seconds", "Time a call waited for a free executor worker", ["backend"]
+)
+EXECUTOR_PENDING = metrics.gauge(
+    "signal_executor_pending_calls", "Calls submitted to the executor and not yet finished", ["backend"]
+)
+
+
+def _warm_worker() -> None:
+    """Import the signal stack and compute one signal so caches are hot"""
+    from trading_logic import generate_trading_signal
+    generate_trading_signal("EUR/USD", "1m", 1.0850)
+
+
+def _noop(_: Any = None) -> int:
+    return os.getpid()
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> Tuple[float, Any]:
+    """Run ``fn`` in the worker and return (wall-clock start time, result)"""
+    return time.time(), fn(*args)
+
+
+class LatencyStats:
+    """Count, mean and percentiles over the most recent samples"""
+
+    def __init__(self, window: int = 2048) -> None:
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return count/mean/p50/p95/p99/max (seconds)"""
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self.count, self.total
+        if not samples:
+            return {"count": count, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        def pct(q: float) -> float:
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "count": count,
+            "mean": total / count,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": samples[-1],
+        }
+
+
+class SignalExecutor:
+    """
+    Runs blocking signal functions off the event loop on the chosen backend.
+
+    Args:
+        backend: "thread", "process" or "inline"
+        workers: Worker count (defaults to the number of CPUs)
+    """
+
+    def __init__(self, backend: str = "thread", workers: Optional[int] = None) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown executor backend: {backend} (expected one of {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.latency = LatencyStats()
+        self._pool: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> "SignalExecutor":
+        """Build an executor from SIGNAL_EXECUTOR / SIGNAL_WORKERS"""
+        backend = os.getenv("SIGNAL_EXECUTOR", "thread").strip().lower()
+        workers = os.getenv("SIGNAL_WORKERS")
+        return cls(backend, int(workers) if workers else None)
+
+    def start(self) -> None:
+        """Create the pool and warm every worker (idempotent)"""
+        if self._pool is not None or self.backend == "inline":
+            if self.backend == "inline":
+                _warm_worker()
+            return
+        started = time.perf_counter()
+        if self.backend == "process":
+            # spawn: forking a process that already runs the bot's threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            # force every worker to start (and run the initializer) now
+            list(self._pool.map(_noop, range(self.workers)))
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="signal",
+                initializer=_warm_worker,
+            )
+            # idle threads are reused, so hold each one at a barrier until all exist
+            barrier = threading.Barrier(self.workers)
+            list(self._pool.map(lambda _: barrier.wait(timeout=30), range(self.workers)))
+        logger.info(
+            "Signal executor started: %s backend, %d workers (warm-up %.2fs)",
+            self.backend, self.workers, time.perf_counter() - started
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the backend and return its result"""
+        started = time.perf_counter()
+        pending = EXECUTOR_PENDING.labels(backend=self.backend)
+        pending.inc()
+        try:
+            if self.backend == "inline":
+                EXECUTOR_WAIT_SECONDS.labels(backend=self.backend).observe(0.0)
+                return fn(*args)
+            if self._pool is None:
+                self.start()
+            loop = asyncio.get_running_loop()
+            submitted = time.time()
+            began, result = await loop.run_in_executor(self._pool, functools.partial(_timed_call, fn, *args))
+            EXECUTOR_WAIT_SECONDS.labels(backend=self.backend).observe(max(0.0, began - submitted))
+            return result
+        finally:
+            pending.dec()
+            elapsed = time.perf_counter() - started
+            self.latency.record(elapsed)
+            EXECUTOR_CALL_SECONDS.labels(backend=self.backend).observe(elapsed)
+
+    def shutdown(self) -> None:
+        """Stop the pool (pending calls are completed)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend, worker count and latency statistics"""
+        return {"backend": self.backend, "workers": self.workers, **self.latency.snapshot()}
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Minimal HTTP/1.1 Helpers
+
+Request parsing and response serialization for the small asyncio
+servers in this repo: the webhook receiver (webhook.py), the stub
+market data server (market_data.py) and the fake Bot API (loadtest.py).
+Keep-alive only, no chunked encoding; bodies are capped at MAX_BODY.
+"""
+
+import asyncio
+from typing import Dict, Optional, Tuple
+
+MAX_BODY = 1 << 20
+
+
+async def read_http_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Read one request (method, path, lower-cased headers, body); None on EOF"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        raise ValueError(f"Request body too large ({length} bytes)")
+    body = await reader.readexactly(length)
+    return method, path, headers, body
+
+
+def http_response(status: int, body: bytes = b"", content_type: str = "application/json",
+                  headers: Optional[Dict[str, str]] = None) -> bytes:
+    """Serialize a keep-alive HTTP/1.1 response"""
+    reason = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 429: "Too Many Requests"}
+    extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    return (
+        f"HTTP/1.1 {status} {reason.get(status, 'Error')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"{extra}"
+        f"Connection: keep-alive\r\n\r\n"
+    ).encode() + body
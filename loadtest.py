@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+End-to-end Load Generator for signal_bot
+
+Runs the real handlers (start, pair_selection, timeframe_selection,
+restart_handler) of ``build_application()`` against FakeBotAPI, a local
+stand-in for the Telegram Bot API, and reports per-handler p50/p95/p99
+latency and overall throughput.
+
+Synthetic user flows (/start -> pair -> timeframe -> New Signal -> pair
+-> timeframe) are started at a fixed rate (open loop). The fake API can
+inject slow responses and 429 "Too Many Requests" errors.
+
+Updates reach the bot in one of three modes:
+  direct   app.process_update() (handler cost only)
+  webhook  POSTed to the bot's embedded webhook server (webhook.py)
+  polling  served by the fake API's getUpdates to the real Updater
+Latency is measured from submitting an update until its handler finished.
+
+Usage:
+  python loadtest.py --rate 20 --duration 30
+  python loadtest.py --mode webhook --rate 50
+  python loadtest.py --rate 50 --slow-rate 0.05 --slow-delay 0.5 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import httpx
+from telegram import Update
+from telegram.ext import TypeHandler
+
+from executors import LatencyStats
+from http_util import http_response, read_http_request
+from webhook import SECRET_HEADER, WebhookConfig, start_webhook
+
+BOT_ID = 100000001
+BOT_USER = {"id": BOT_ID, "is_bot": True, "first_name": "LoadTestBot", "username": "load_test_bot"}
+MODES = ("direct", "webhook", "polling")
+# never fault-injected: they drive the harness rather than user-visible replies
+CONTROL_METHODS = {"getMe", "getUpdates", "setWebhook", "deleteWebhook"}
+STEP_TIMEOUT = 30.0
+
+
+class FakeBotAPI:
+    """
+    Minimal HTTP/1.1 Bot API server answering the methods the bot uses.
+
+    Args:
+        slow_rate: Fraction of requests delayed by ``slow_delay`` seconds
+        slow_delay: Injected delay in seconds
+        error_rate: Fraction of requests answered with a 429 error
+        retry_after: retry_after value sent with injected 429s
+        latency: Base delay applied to every request (network round trip)
+        seed: Seed for fault injection
+    """
+
+    def __init__(
+        self,
+        slow_rate: float = 0.0,
+        slow_delay: float = 0.5,
+        error_rate: float = 0.0,
+        retry_after: int = 1,
+        latency: float = 0.0,
+        seed: Optional[int] = None
+    ) -> None:
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        self.injected = {"slow": 0, "429": 0}
+        self._rng = random.Random(seed)
+        self._message_ids = itertools.count(1000)
+        self._server: Optional[asyncio.AbstractServer] = None
+        # updates waiting to be fetched through getUpdates (polling mode)
+        self._updates: List[Dict[str, Any]] = []
+        self._updates_ready = asyncio.Event()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening and return the base_url to give the bot"""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}/bot"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def push_update(self, raw: Dict[str, Any]) -> None:
+        """Queue an update for the bot's next getUpdates call"""
+        self._updates.append(raw)
+        self._updates_ready.set()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await read_http_request(reader)
+                if request is None:
+                    break
+                _, path, _, body = request
+                status, payload = await self._dispatch(path.rsplit("/", 1)[-1], body)
+                writer.write(http_response(status, json.dumps(payload).encode()))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = params.get("offset") or 0
+        self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates and params.get("timeout"):
+            self._updates_ready.clear()
+            try:
+                await asyncio.wait_for(self._updates_ready.wait(), float(params["timeout"]))
+            except asyncio.TimeoutError:
+                pass
+        return [u for u in self._updates if u["update_id"] >= offset][:100]
+
+    async def _dispatch(self, method: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        params = {}
+        for key, value in parse_qsl(body.decode()):
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": await self._get_updates(params)}
+        if method in CONTROL_METHODS:
+            return 200, {"ok": True, "result": self._result(method, params)}
+
+        delay = self.latency
+        if self.slow_rate and self._rng.random() < self.slow_rate:
+            self.injected["slow"] += 1
+            delay += self.slow_delay
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.injected["429"] += 1
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+        return 200, {"ok": True, "result": self._result(method, params)}
+
+    def _result(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getMe":
+            return BOT_USER
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = params.get("chat_id", 0)
+            return {
+                "message_id": params.get("message_id") or next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        return True
+
+
+def _user(user_id: int) -> Dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+
+
+def command_update(update_id: int, user_id: int, command: str) -> Dict[str, Any]:
+    """Raw update for a ``/command`` sent in a private chat"""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": _user(user_id),
+            "text": command,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command.split()[0])}],
+        },
+    }
+
+
+def callback_update(update_id: int, user_id: int, data: str) -> Dict[str, Any]:
+    """Raw update for an inline button press on a bot message"""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": _user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": BOT_USER,
+                "text": "menu",
+            },
+        },
+    }
+
+
+class LoadTest:
+    """
+    Drives synthetic user flows into a running application.
+
+    Args:
+        app: Started telegram Application (from build_application)
+        pairs: Pairs to pick from
+        timeframes: Timeframes to pick from
+        users: Size of the simulated user pool
+        think_time: Pause between steps of a flow (seconds)
+        seed: Seed for pair/timeframe/user choice
+        submit: Coroutine function delivering a raw update (default: process_update)
+    """
+
+    def __init__(self, app, pairs: List[str], timeframes: List[str], users: int = 1000,
+                 think_time: float = 0.0, seed: Optional[int] = None, submit=None) -> None:
+        self.app = app
+        self.submit = submit or self._process_update
+        self.pairs = pairs
+        self.timeframes = timeframes
+        self.users = users
+        self.think_time = think_time
+        self.latency: Dict[str, LatencyStats] = {}
+        self.errors: Dict[str, int] = {}
+        self.flows_completed = 0
+        self._rng = random.Random(seed)
+        self._update_ids = itertools.count(1)
+        self._current: Dict[int, str] = {}
+        self._done: Dict[int, asyncio.Future] = {}
+
+        async def count_error(update, context) -> None:
+            name = self._current.get(getattr(update, "update_id", None), "unknown")
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+        async def completed(update, context) -> None:
+            future = self._done.pop(update.update_id, None)
+            if future is not None and not future.done():
+                future.set_result(None)
+
+        app.add_error_handler(count_error)
+        # last group: runs once the real handler (and any error handler) finished
+        app.add_handler(TypeHandler(Update, completed), group=99)
+
+    async def _process_update(self, raw: Dict[str, Any]) -> None:
+        await self.app.process_update(Update.de_json(raw, self.app.bot))
+
+    async def _step(self, name: str, raw: Dict[str, Any]) -> None:
+        update_id = raw["update_id"]
+        self._current[update_id] = name
+        done = self._done[update_id] = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        try:
+            await self.submit(raw)
+            await asyncio.wait_for(done, STEP_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        finally:
+            self.latency.setdefault(name, LatencyStats(window=100_000)).record(time.perf_counter() - started)
+            self._current.pop(update_id, None)
+            self._done.pop(update_id, None)
+        if self.think_time:
+            await asyncio.sleep(self.think_time)
+
+    async def flow(self) -> None:
+        """/start -> pair -> timeframe -> New Signal -> pair -> timeframe"""
+        user_id = 1 + self._rng.randrange(self.users)
+        await self._step("start", command_update(next(self._update_ids), user_id, "/start"))
+        for restart in (False, True):
+            if restart:
+                await self._step("restart_handler", callback_update(next(self._update_ids), user_id, "restart"))
+            pair = self._rng.choice(self.pairs)
+            timeframe = self._rng.choice(self.timeframes)
+            await self._step("pair_selection", callback_update(next(self._update_ids), user_id, f"pair_{pair}"))
+            await self._step("timeframe_selection", callback_update(next(self._update_ids), user_id, f"tf_{timeframe}"))
+        self.flows_completed += 1
+
+    async def run(self, rate: float, duration: float) -> float:
+        """Start ``rate`` flows per second for ``duration`` seconds; return wall time"""
+        started = time.perf_counter()
+        tasks = []
+        for i in range(max(1, int(rate * duration))):
+            # open loop: flows start on schedule no matter how slow the bot is
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.flow()))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+    def report(self, wall_time: float) -> Dict[str, Any]:
+        """Per-handler latency (ms) plus throughput"""
+        handlers = {}
+        total = 0
+        for name, stats in self.latency.items():
+            snap = stats.snapshot()
+            total += snap["count"]
+            handlers[name] = {
+                "count": snap["count"],
+                "errors": self.errors.get(name, 0),
+                **{k: snap[k] * 1000 for k in ("p50", "p95", "p99", "max")},
+            }
+        return {
+            "wall_time": wall_time,
+            "flows": self.flows_completed,
+            "updates": total,
+            "updates_per_sec": total / wall_time if wall_time else 0.0,
+            "handlers": handlers,
+        }
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the fake API, build the real application and run the load"""
+    import signal_bot
+
+    api = FakeBotAPI(
+        slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        latency=args.api_latency,
+        seed=args.seed,
+    )
+    mode = getattr(args, "mode", "direct")
+    base_url = await api.start()
+    app = signal_bot.build_application("123456:LOADTEST", base_url=base_url)
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+
+    server = client = None
+
+    async def post_to_webhook(raw):
+        response = await client.post("/telegram", json=raw)
+        response.raise_for_status()
+
+    async def push_to_get_updates(raw):
+        api.push_update(raw)
+
+    # direct mode (None) hands updates to app.process_update
+    submit = None
+    if mode == "webhook":
+        config = WebhookConfig(url="http://127.0.0.1", listen="127.0.0.1", port=0,
+                               url_path="telegram", secret_token="loadtest-secret")
+        server = await start_webhook(app, config)
+        client = httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{server.port}",
+            headers={SECRET_HEADER: config.secret_token},
+            limits=httpx.Limits(max_connections=config.max_connections),
+        )
+        submit = post_to_webhook
+    elif mode == "polling":
+        await app.updater.start_polling(poll_interval=0.0, timeout=1)
+        submit = push_to_get_updates
+
+    await app.start()
+    outbound_before = signal_bot.outbound.stats()
+    try:
+        pairs, _ = signal_bot.get_active_pairs()
+        test = LoadTest(app, pairs, signal_bot.get_active_timeframes(), users=args.users,
+                        think_time=args.think_time, seed=args.seed, submit=submit)
+        wall_time = await test.run(args.rate, args.duration)
+        result = test.report(wall_time)
+        result["mode"] = mode
+        result["api_calls"] = dict(api.calls)
+        result["api_injected"] = dict(api.injected)
+        outbound = signal_bot.outbound.stats()
+        result["outbound"] = {k: outbound[k] - outbound_before[k] for k in ("sent", "retried", "dropped", "failed")}
+        return result
+    finally:
+        if client is not None:
+            await client.aclose()
+        if server is not None:
+            await server.stop()
+        if app.updater.running:
+            await app.updater.stop()
+        await app.stop()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+        await app.shutdown()
+        await api.stop()
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"\n{'handler':<22}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, h in sorted(result["handlers"].items()):
+        print(f"{name:<22}{h['count']:>8}{h['errors']:>8}"
+              f"{h['p50']:>10.1f}{h['p95']:>10.1f}{h['p99']:>10.1f}{h['max']:>10.1f}")
+    print(f"\nMode: {result['mode']}  Flows: {result['flows']}  Updates: {result['updates']}  "
+          f"Wall: {result['wall_time']:.1f}s  Throughput: {result['updates_per_sec']:.1f} updates/s")
+    print(f"API calls: {result['api_calls']}  Injected: {result['api_injected']}")
+    print(f"Outbound: {result['outbound']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=MODES, default="direct", help="how updates reach the bot")
+    parser.add_argument("--rate", type=float, default=10.0, help="flows started per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to keep starting flows")
+    parser.add_argument("--users", type=int, default=1000, help="simulated user pool size")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause between flow steps (s)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="base fake API delay (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of slow API responses")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="delay of slow responses (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 429 API responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    # handler/library logging would dominate the output (and the timings);
+    # handler errors are counted in the report instead
+    logging.disable(logging.ERROR)
+    result = asyncio.run(run_load(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
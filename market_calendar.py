@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Market Session Calendar
+
+Decides whether the bot runs in NORMAL (market hours) or OTC mode from
+an explicit timezone, trading hours, trading weekdays and a holiday
+list, instead of the server's local clock.
+
+The current mode is cached together with the instant it stops being
+valid (the next open/close boundary), so ``current_mode()`` is one clock
+read and a comparison. ``next_boundary()`` tells the bot exactly when to
+fire its single mode-switch timer.
+
+Configured through MARKET_TZ, MARKET_OPEN, MARKET_CLOSE, MARKET_DAYS and
+MARKET_HOLIDAYS (see MarketCalendar.from_env).
+"""
+
+import logging
+import os
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+NORMAL = "NORMAL"
+OTC = "OTC"
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+# a year without any trading day is a configuration error, not a calendar
+MAX_LOOKAHEAD_DAYS = 366
+
+
+def _parse_time(value: str) -> dtime:
+    hours, _, minutes = value.strip().partition(":")
+    return dtime(int(hours), int(minutes or 0))
+
+
+class MarketCalendar:
+    """
+    Trading sessions in a fixed timezone.
+
+    Args:
+        tz: IANA timezone name the hours are expressed in
+        open_time: Session open (local), inclusive
+        close_time: Session close (local), exclusive
+        weekdays: Trading weekdays (0 = Monday)
+        holidays: Local dates without a session
+        clock: Epoch-seconds time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        tz: str = "UTC",
+        open_time: dtime = dtime(7, 0),
+        close_time: dtime = dtime(17, 0),
+        weekdays: Iterable[int] = range(5),
+        holidays: Iterable[date] = (),
+        clock=time.time
+    ) -> None:
+        if close_time <= open_time:
+            raise ValueError("Market close must be after open (overnight sessions are not supported)")
+        self.zone = ZoneInfo(tz)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.weekdays = frozenset(weekdays)
+        self.holidays = frozenset(holidays)
+        self.clock = clock
+        # cached (mode, valid-until epoch seconds)
+        self._mode = OTC
+        self._until = float("-inf")
+
+    @classmethod
+    def from_env(cls) -> "MarketCalendar":
+        """Calendar from MARKET_TZ / MARKET_OPEN / MARKET_CLOSE / MARKET_DAYS / MARKET_HOLIDAYS"""
+        days = os.getenv("MARKET_DAYS", "mon,tue,wed,thu,fri")
+        holidays = os.getenv("MARKET_HOLIDAYS", "")
+        calendar = cls(
+            tz=os.getenv("MARKET_TZ", "UTC"),
+            open_time=_parse_time(os.getenv("MARKET_OPEN", "07:00")),
+            close_time=_parse_time(os.getenv("MARKET_CLOSE", "17:00")),
+            weekdays=[WEEKDAYS.index(d.strip().lower()[:3]) for d in days.split(",") if d.strip()],
+            holidays=[date.fromisoformat(d.strip()) for d in holidays.split(",") if d.strip()],
+        )
+        logger.info(
+            "Market calendar: %s-%s %s on %s, %d holidays",
+            calendar.open_time.strftime("%H:%M"), calendar.close_time.strftime("%H:%M"),
+            calendar.zone.key, days, len(calendar.holidays)
+        )
+        return calendar
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() in self.weekdays and day not in self.holidays
+
+    def _session(self, day: date) -> Tuple[datetime, datetime]:
+        """Open/close of ``day``'s session as aware UTC datetimes"""
+        opened = datetime.combine(day, self.open_time, tzinfo=self.zone)
+        closed = datetime.combine(day, self.close_time, tzinfo=self.zone)
+        return opened.astimezone(timezone.utc), closed.astimezone(timezone.utc)
+
+    def mode_at(self, when: datetime) -> str:
+        """Mode at an aware datetime"""
+        local = when.astimezone(self.zone)
+        if self.is_trading_day(local.date()) and self.open_time <= local.time() < self.close_time:
+            return NORMAL
+        return OTC
+
+    def next_boundary(self, after: datetime) -> Optional[datetime]:
+        """First session open or close strictly after ``after`` (aware UTC)"""
+        day = after.astimezone(self.zone).date()
+        for offset in range(MAX_LOOKAHEAD_DAYS + 1):
+            current = day + timedelta(days=offset)
+            if not self.is_trading_day(current):
+                continue
+            for boundary in self._session(current):
+                if boundary > after:
+                    return boundary
+        return None
+
+    def refresh(self, now: Optional[float] = None) -> Tuple[str, float]:
+        """Recompute and cache the mode at ``now``; returns (mode, valid-until)"""
+        now = self.clock() if now is None else now
+        when = datetime.fromtimestamp(now, timezone.utc)
+        boundary = self.next_boundary(when)
+        self._mode = self.mode_at(when)
+        self._until = boundary.timestamp() if boundary is not None else float("inf")
+        return self._mode, self._until
+
+    def current_mode(self) -> str:
+        """Mode right now from the cache (recomputed only after a boundary)"""
+        if self.clock() >= self._until:
+            self.refresh()
+        return self._mode
+
+    @property
+    def valid_until(self) -> float:
+        """Epoch seconds of the next boundary (when the cached mode expires)"""
+        if self.clock() >= self._until:
+            self.refresh()
+        return self._until
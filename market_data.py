@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Async Market Data Provider
+
+Fetches OHLC candles over HTTP with one persistent, pooled httpx client
+instead of a new connection per request:
+
+- connection pool with keep-alive (MARKET_DATA_MAX_CONNECTIONS)
+- per-host concurrency limit (MARKET_DATA_PER_HOST)
+- timeouts with retries and full-jitter exponential backoff; 429/5xx and
+  transport errors are retried, Retry-After is honoured
+- ``fetch_many`` requests several pairs per call (MARKET_DATA_BATCH pairs
+  per request), so one refresh covers the whole pair list
+
+trading_logic keeps calling the synchronous ``get_market_data(pair,
+timeframe)`` from worker threads. MarketDataClient bridges that to the
+async provider running on its own event loop thread, and serves records
+that ``prefetch`` (run by the precompute job before each batch) fetched
+moments earlier from a short-lived cache. With the "process" executor
+backend each worker has its own client and cache.
+
+Without MARKET_DATA_URL ``get_market_data`` returns no records and the
+signal path falls back to simulated history, as before.
+
+Endpoint (served by StubMarketDataServer for tests and local runs):
+  GET /candles?pair=EUR/USD&timeframe=5s&limit=300   -> [candle, ...]
+  GET /candles?pairs=EUR/USD,GBP/USD&timeframe=5s    -> {pair: [candle, ...]}
+with candle = {"timestamp", "open", "high", "low", "close"}.
+
+Usage (stub server):
+  python market_data.py --port 8090
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from http_util import http_response, read_http_request
+from metrics import metrics
+from resampler import TIMEFRAME_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 300
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+MARKET_DATA_REQUESTS = metrics.counter(
+    "market_data_requests_total", "Market data HTTP requests by outcome", ["outcome"]
+)
+MARKET_DATA_SECONDS = metrics.histogram(
+    "market_data_request_seconds", "Market data HTTP request duration (per attempt)"
+)
+
+Records = List[Dict]
+
+
+class MarketDataError(Exception):
+    """A market data request failed after all retries"""
+
+
+# ===== Provider interface =====
+
+class MarketDataProvider(ABC):
+    """Async source of OHLC candle records"""
+
+    @abstractmethod
+    async def fetch(self, pair: str, timeframe: str, limit: int = DEFAULT_LIMIT) -> Records:
+        """Latest ``limit`` candle records for one series, oldest first"""
+
+    async def fetch_many(self, pairs: Sequence[str], timeframe: str, limit: int = DEFAULT_LIMIT) -> Dict[str, Records]:
+        """Records for several pairs (default: concurrent single fetches)"""
+        results = await asyncio.gather(*(self.fetch(p, timeframe, limit) for p in pairs))
+        return dict(zip(pairs, results))
+
+    async def aclose(self) -> None:
+        pass
+
+
+class HTTPMarketDataProvider(MarketDataProvider):
+    """
+    Pooled HTTP provider for the /candles endpoint.
+
+    Args:
+        base_url: Server root, e.g. http://127.0.0.1:8090
+        max_connections: Connection pool size (kept alive between requests)
+        max_per_host: Requests in flight per host
+        timeout: Per-attempt timeout in seconds
+        retries: Retries after the first attempt
+        backoff: Base delay of the exponential backoff (seconds)
+        max_backoff: Upper bound of a single backoff delay
+        batch_size: Pairs per batched request
+        client: Preconfigured httpx.AsyncClient (tests)
+        seed: Seed for the backoff jitter
+
+    The httpx client and per-host limits belong to the event loop that
+    first uses them. ``aclose`` drops them, and the next request creates
+    fresh ones on whichever loop it runs on.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 32,
+        max_per_host: int = 8,
+        timeout: float = 5.0,
+        retries: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        batch_size: int = 20,
+        client: Optional[httpx.AsyncClient] = None,
+        seed: Optional[int] = None
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client = client
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._rng = random.Random(seed)
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled client, created on first use on the calling event loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return limit
+
+    def _delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter backoff, never shorter than the server's Retry-After"""
+        delay = self._rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    async def _get_json(self, path: str, params: Dict[str, object]):
+        url = self.base_url + path
+        last_error: Optional[str] = None
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            async with self._host_limit(url):
+                started = time.perf_counter()
+                self.requests += 1
+                try:
+                    response = await self.client.get(url, params=params)
+                except httpx.HTTPError as e:
+                    response = None
+                    last_error = f"{type(e).__name__}: {e}"
+                MARKET_DATA_SECONDS.observe(time.perf_counter() - started)
+            if response is None:
+                MARKET_DATA_REQUESTS.labels(outcome="error").inc()
+            elif response.status_code == 200:
+                MARKET_DATA_REQUESTS.labels(outcome="ok").inc()
+                return response.json()
+            else:
+                last_error = f"HTTP {response.status_code}"
+                MARKET_DATA_REQUESTS.labels(outcome=str(response.status_code)).inc()
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                retry_after = response.headers.get("retry-after")
+            if attempt < self.retries:
+                self.retried += 1
+                # sleep outside the host limit so other requests can proceed
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        self.failed += 1
+        raise MarketDataError(f"GET {path} {params} failed: {last_error}")
+
+    async def fetch(self, pair: str, timeframe: str, limit: int = DEFAULT_LIMIT) -> Records:
+        return await self._get_json("/candles", {"pair": pair, "timeframe": timeframe, "limit": limit})
+
+    async def fetch_many(self, pairs: Sequence[str], timeframe: str, limit: int = DEFAULT_LIMIT) -> Dict[str, Records]:
+        """Records for ``pairs`` in batches of ``batch_size`` pairs per request"""
+        batches = [list(pairs[i:i + self.batch_size]) for i in range(0, len(pairs), self.batch_size)]
+        responses = await asyncio.gather(*(
+            self._get_json("/candles", {"pairs": ",".join(batch), "timeframe": timeframe, "limit": limit})
+            for batch in batches
+        ))
+        results: Dict[str, Records] = {}
+        for response in responses:
+            results.update(response)
+        return results
+
+    async def aclose(self) -> None:
+        """Close the connection pool; a later request opens a new one"""
+        client, self._client = self._client, None
+        self._host_limits = {}
+        if client is not None:
+            await client.aclose()
+
+
+# ===== Synchronous bridge for trading_logic =====
+
+class MarketDataClient:
+    """
+    Thread-safe synchronous facade over an async provider.
+
+    The provider runs on a dedicated event loop thread so its connection
+    pool is shared by every caller, whichever thread or loop it is on.
+
+    Args:
+        provider: Async provider to fetch from
+        ttl: Seconds a fetched (pair, timeframe) stays servable from cache
+        limit: Candles requested per pair
+        call_timeout: Upper bound for one synchronous ``get`` call
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        ttl: float = 2.0,
+        limit: int = DEFAULT_LIMIT,
+        call_timeout: float = 30.0
+    ) -> None:
+        self.provider = provider
+        self.ttl = ttl
+        self.limit = limit
+        self.call_timeout = call_timeout
+        self._cache: Dict[Tuple[str, str], Tuple[float, Records]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["MarketDataClient"]:
+        """Client for MARKET_DATA_URL (None when unset)"""
+        url = os.getenv("MARKET_DATA_URL")
+        if not url:
+            return None
+        provider = HTTPMarketDataProvider(
+            url,
+            max_connections=int(os.getenv("MARKET_DATA_MAX_CONNECTIONS", "32")),
+            max_per_host=int(os.getenv("MARKET_DATA_PER_HOST", "8")),
+            timeout=float(os.getenv("MARKET_DATA_TIMEOUT", "5")),
+            retries=int(os.getenv("MARKET_DATA_RETRIES", "3")),
+            batch_size=int(os.getenv("MARKET_DATA_BATCH", "20")),
+        )
+        logger.info("Market data provider: %s", url)
+        return cls(provider, ttl=float(os.getenv("MARKET_DATA_TTL", "2")),
+                   limit=int(os.getenv("MARKET_DATA_LIMIT", str(DEFAULT_LIMIT))))
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name="market-data", daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def _cached(self, pair: str, timeframe: str) -> Optional[Records]:
+        entry = self._cache.get((pair, timeframe))
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _store(self, timeframe: str, records: Dict[str, Records]) -> None:
+        now = time.monotonic()
+        for pair, recs in records.items():
+            self._cache[(pair, timeframe)] = (now, recs)
+
+    def get(self, pair: str, timeframe: str) -> Records:
+        """Records for one series; [] if the provider keeps failing"""
+        records = self._cached(pair, timeframe)
+        if records is not None:
+            self.hits += 1
+            return records
+        self.misses += 1
+        future = asyncio.run_coroutine_threadsafe(
+            self.provider.fetch(pair, timeframe, self.limit), self._ensure_loop()
+        )
+        try:
+            records = future.result(self.call_timeout)
+        except Exception as e:
+            future.cancel()
+            self.errors += 1
+            logger.warning("Market data for %s [%s] unavailable: %s", pair, timeframe, e)
+            return []
+        self._store(timeframe, {pair: records})
+        return records
+
+    async def prefetch(self, pairs: Sequence[str], timeframe: str) -> int:
+        """Fetch ``pairs`` in batches into the cache; returns pairs fetched"""
+        future = asyncio.run_coroutine_threadsafe(
+            self.provider.fetch_many(list(pairs), timeframe, self.limit), self._ensure_loop()
+        )
+        try:
+            records = await asyncio.wrap_future(future)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Market data prefetch of %d pairs failed: %s", len(pairs), e)
+            return 0
+        self._store(timeframe, records)
+        return len(records)
+
+    def close(self) -> None:
+        """Close the provider's connections and stop the loop thread.
+
+        The client stays usable: the next call starts a new loop thread and
+        the provider opens a new connection pool on it (e.g. when the bot
+        falls back from webhook to polling and runs post_init again).
+        """
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.provider.aclose(), self._loop).result(self.call_timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(self.call_timeout)
+        self._loop.close()
+        self._loop = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "cached": len(self._cache)}
+
+
+# shared client used by trading_logic (None without MARKET_DATA_URL)
+market_data_client = MarketDataClient.from_env()
+
+
+def get_market_data(pair: str, timeframe: str) -> Records:
+    """Candle records for ``pair``/``timeframe`` (empty when no provider is configured)"""
+    if market_data_client is None:
+        return []
+    return market_data_client.get(pair, timeframe)
+
+
+# ===== Stub server =====
+
+def canned_candles(pair: str, timeframe: str, limit: int, now: Optional[float] = None) -> Records:
+    """Deterministic candles ending with the bar open at ``now``.
+
+    Each bar depends only on (pair, bar index), so successive requests agree
+    on history and only the newest bars change.
+    """
+    secs = TIMEFRAME_SECONDS[timeframe]
+    last = int((time.time() if now is None else now) // secs)
+    seed = zlib.crc32(pair.encode())
+    base = 1.0 + (seed % 1000) / 1000
+
+    def close(k: int) -> float:
+        noise = random.Random(seed ^ k).uniform(-0.0005, 0.0005)
+        return base * (1 + 0.002 * math.sin(k / 9) + noise)
+
+    records = []
+    for k in range(last - limit + 1, last + 1):
+        open_, close_ = close(k - 1), close(k)
+        spread = base * 0.0002
+        records.append({
+            "timestamp": float(k * secs),
+            "open": open_,
+            "high": max(open_, close_) + spread,
+            "low": min(open_, close_) - spread,
+            "close": close_,
+        })
+    return records
+
+
+class StubMarketDataServer:
+    """
+    Local /candles server with canned OHLC data.
+
+    Args:
+        latency: Delay applied to every request (seconds)
+        fail_first: Number of initial requests answered with 503
+        retry_after: Retry-After sent with injected 503s (None = omitted)
+    """
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0, retry_after: Optional[float] = None) -> None:
+        self.latency = latency
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening and return the base_url"""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request = await read_http_request(reader)
+                if request is None:
+                    break
+                _, path, _, _ = request
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    writer.write(self._respond(path))
+                finally:
+                    self.in_flight -= 1
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, path: str) -> bytes:
+        if self.requests <= self.fail_first:
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+            return http_response(503, b'{"error": "unavailable"}', headers=headers)
+        route, _, query = path.partition("?")
+        params = dict(parse_qsl(query))
+        timeframe = params.get("timeframe", "")
+        if route != "/candles" or timeframe not in TIMEFRAME_SECONDS:
+            return http_response(404, b'{"error": "not found"}')
+        limit = min(int(params.get("limit", DEFAULT_LIMIT)), 5000)
+        if "pairs" in params:
+            payload = {p: canned_candles(p, timeframe, limit) for p in params["pairs"].split(",") if p}
+        else:
+            payload = canned_candles(params.get("pair", ""), timeframe, limit)
+        return http_response(200, json.dumps(payload).encode())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve canned OHLC candles for local runs and tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="delay per request in seconds")
+    args = parser.parse_args()
+
+    async def serve() -> None:
+        server = StubMarketDataServer(latency=args.latency)
+        url = await server.start(args.host, args.port)
+        print(f"Stub market data at {url}/candles (set MARKET_DATA_URL={url})")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
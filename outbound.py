@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Outbound Bot API Call Scheduler
+
+Every Bot API call the bot makes (query.answer(), edit_message_text,
+reply_text, subscription broadcasts) passes through OutboundScheduler,
+which is plugged into python-telegram-bot as the application's rate
+limiter (ApplicationBuilder.rate_limiter), so handlers keep calling the
+Bot API as before.
+
+- Callback answers are not messages: they skip the queue and go out at once.
+- Calls that target a chat are queued and released through a global token
+  bucket (OUTBOUND_RATE, ~30/s) and a per-chat bucket (OUTBOUND_CHAT_RATE
+  per second with a burst of OUTBOUND_CHAT_BURST).
+- Queued calls leave in priority order: edits before replies before
+  broadcasts (FIFO within a priority), so interactive users stay fast
+  while a fan-out is draining.
+- A queued edit of a message is dropped when a newer edit of the same
+  message is queued; the caller gets True as if it had been applied.
+- RetryAfter pauses all outbound traffic for the requested time and the
+  call is retried (up to OUTBOUND_MAX_RETRIES) in its original position.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from datetime import timedelta
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Lower value leaves the queue first"""
+    ANSWER = 0
+    EDIT = 1
+    SEND = 2
+    BROADCAST = 3
+
+
+ENDPOINT_PRIORITY = {
+    "answerCallbackQuery": Priority.ANSWER,
+    "answerInlineQuery": Priority.ANSWER,
+    "editMessageText": Priority.EDIT,
+    "editMessageReplyMarkup": Priority.EDIT,
+    "editMessageCaption": Priority.EDIT,
+}
+EDIT_ENDPOINTS = frozenset(e for e, p in ENDPOINT_PRIORITY.items() if p == Priority.EDIT)
+
+OUTBOUND_CALLS = metrics.counter(
+    "bot_outbound_calls_total", "Outbound Bot API calls by priority and outcome", ["priority", "outcome"]
+)
+OUTBOUND_QUEUE_SECONDS = metrics.histogram(
+    "bot_outbound_queue_seconds", "Time an outbound call waited for its turn", ["priority"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+
+def _seconds(value) -> float:
+    """RetryAfter.retry_after is an int or a timedelta depending on the PTB version"""
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``capacity``"""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Call:
+    __slots__ = ("priority", "seq", "chat_id", "key", "callback", "args", "kwargs",
+                 "future", "enqueued", "attempts")
+
+    def __init__(self, priority: Priority, seq: int, chat_id, key, callback, args, kwargs, future, enqueued) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.key = key
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.enqueued = enqueued
+        self.attempts = 0
+
+
+class _Chat:
+    """Pending calls of one chat (a heap by priority) and its token bucket"""
+    __slots__ = ("calls", "bucket", "waiting")
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.calls: List[Tuple[int, int, _Call]] = []
+        self.bucket = bucket
+        self.waiting = False      # parked until its bucket refills
+
+
+class OutboundScheduler(BaseRateLimiter):
+    """
+    Priority scheduler for outbound Bot API calls with token buckets.
+
+    Args:
+        rate: Chat-targeted calls per second across all chats (also the burst)
+        chat_rate: Calls per second to one chat
+        chat_burst: Calls one chat may receive back to back
+        max_in_flight: Concurrent API requests
+        max_retries: RetryAfter retries per call before the error is raised
+        max_pending: Queued calls before broadcasts are refused
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    __slots__ = (
+        "rate", "chat_rate", "chat_burst", "max_in_flight", "max_retries", "max_pending", "clock",
+        "_bucket", "_chats", "_ready", "_waiting", "_keys", "_seq", "_pending",
+        "_paused_until", "_slots", "_wakeup", "_task", "_inflight", "counts",
+    )
+
+    def __init__(
+        self,
+        rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_in_flight: int = 32,
+        max_retries: int = 3,
+        max_pending: int = 100_000,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self.clock = clock
+        self._bucket = TokenBucket(rate, rate, clock())
+        self._chats: Dict[Any, _Chat] = {}
+        self._ready: List[Tuple[int, int, Any]] = []       # (priority, seq, chat) of chat heads
+        self._waiting: List[Tuple[float, Any]] = []         # (bucket refill time, chat)
+        self._keys: Dict[Tuple, _Call] = {}                 # latest queued edit per message
+        self._seq = itertools.count()
+        self._pending = 0
+        self._paused_until = 0.0
+        self.max_in_flight = max_in_flight
+        # loop-bound primitives are created in initialize()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        self.counts = {"sent": 0, "dropped": 0, "retried": 0, "failed": 0, "refused": 0}
+
+    @classmethod
+    def from_env(cls) -> "OutboundScheduler":
+        """Scheduler configured from OUTBOUND_* environment variables"""
+        return cls(
+            rate=float(os.getenv("OUTBOUND_RATE", "30")),
+            chat_rate=float(os.getenv("OUTBOUND_CHAT_RATE", "1")),
+            chat_burst=float(os.getenv("OUTBOUND_CHAT_BURST", "3")),
+            max_retries=int(os.getenv("OUTBOUND_MAX_RETRIES", "3")),
+        )
+
+    @property
+    def pending(self) -> int:
+        """Queued calls (no __len__: PTB tests the rate limiter for truthiness)"""
+        return self._pending
+
+    # ----- BaseRateLimiter -----
+
+    async def initialize(self) -> None:
+        if self._task is None or self._task.done():
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="outbound_scheduler")
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for chat in self._chats.values():
+            for _, _, call in chat.calls:
+                if not call.future.done():
+                    call.future.set_exception(RuntimeError("outbound scheduler shut down"))
+            chat.calls.clear()
+        self._chats.clear()
+        self._ready.clear()
+        self._waiting.clear()
+        self._keys.clear()
+        self._pending = 0
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get("chat_id")
+        priority = ENDPOINT_PRIORITY.get(endpoint, Priority.SEND)
+        if rate_limit_args is not None:
+            priority = Priority(rate_limit_args)
+        if chat_id is None or priority == Priority.ANSWER or self._task is None:
+            return await self._direct(callback, args, kwargs, priority)
+
+        if priority == Priority.BROADCAST and self._pending >= self.max_pending:
+            self.counts["refused"] += 1
+            OUTBOUND_CALLS.labels(priority=priority.name, outcome="refused").inc()
+            raise RuntimeError("outbound queue full")
+        key = None
+        if endpoint in EDIT_ENDPOINTS and data.get("message_id") is not None:
+            key = (chat_id, data["message_id"])
+        call = _Call(priority, next(self._seq), chat_id, key, callback, args, kwargs,
+                     asyncio.get_running_loop().create_future(), self.clock())
+        self._submit(call)
+        return await call.future
+
+    # ----- queueing -----
+
+    async def _direct(self, callback, args, kwargs, priority: Priority):
+        """Unqueued call that still honours RetryAfter pauses"""
+        for attempt in range(self.max_retries + 1):
+            pause = self._paused_until - self.clock()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self._pause(e)
+                if attempt == self.max_retries:
+                    OUTBOUND_CALLS.labels(priority=priority.name, outcome="failed").inc()
+                    raise
+                continue
+            OUTBOUND_CALLS.labels(priority=priority.name, outcome="sent").inc()
+            return result
+
+    def _submit(self, call: _Call) -> None:
+        if call.key is not None:
+            previous = self._keys.get(call.key)
+            if previous is not None and not previous.future.done():
+                # the newer edit replaces the message content anyway
+                self._drop(previous)
+            self._keys[call.key] = call
+        chat = self._chats.get(call.chat_id)
+        if chat is None:
+            chat = self._chats[call.chat_id] = _Chat(TokenBucket(self.chat_rate, self.chat_burst, self.clock()))
+        heapq.heappush(chat.calls, (call.priority, call.seq, call))
+        self._pending += 1
+        if not chat.waiting and self._head(chat) is call:
+            self._activate(call.chat_id, chat, self.clock())
+        self._wakeup.set()
+
+    def _drop(self, call: _Call) -> None:
+        """Resolve an obsolete edit as applied; it is discarded when it reaches its chat's head"""
+        call.future.set_result(True)
+        self.counts["dropped"] += 1
+        OUTBOUND_CALLS.labels(priority=call.priority.name, outcome="dropped").inc()
+
+    def _head(self, chat: _Chat) -> Optional[_Call]:
+        """The chat's next live call (dropped or abandoned calls are discarded)"""
+        while chat.calls:
+            call = chat.calls[0][2]
+            if not call.future.done():
+                return call
+            heapq.heappop(chat.calls)
+            self._pending -= 1
+        return None
+
+    def _activate(self, chat_id, chat: _Chat, now: float) -> None:
+        """Put the chat's head call in the ready heap, or park the chat until its bucket refills"""
+        head = self._head(chat)
+        if head is None:
+            return
+        wait = chat.bucket.wait(now)
+        if wait > 0:
+            chat.waiting = True
+            heapq.heappush(self._waiting, (now + wait, chat_id))
+        else:
+            heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+
+    def _next_ready(self) -> Optional[Tuple[Any, _Chat]]:
+        """Chat whose head call is next in priority order (stale entries skipped)"""
+        while self._ready:
+            priority, seq, chat_id = self._ready[0]
+            chat = self._chats.get(chat_id)
+            head = self._head(chat) if chat is not None and not chat.waiting else None
+            if head is not None and head.priority == priority and head.seq == seq:
+                return chat_id, chat
+            heapq.heappop(self._ready)
+        return None
+
+    def _pause(self, error: RetryAfter) -> None:
+        delay = _seconds(error.retry_after)
+        self._paused_until = max(self._paused_until, self.clock() + delay)
+        logger.warning("Bot API flood control: pausing outbound calls for %.1fs", delay)
+
+    async def _sleep(self, delay: Optional[float]) -> None:
+        """Sleep up to ``delay`` seconds (forever if None), waking early on submit"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def _prune(self, now: float) -> None:
+        """Forget idle chats whose bucket is full again"""
+        idle = [c for c, chat in self._chats.items() if not chat.calls and not chat.waiting and chat.bucket.full(now)]
+        for chat_id in idle:
+            del self._chats[chat_id]
+
+    async def _run(self) -> None:
+        slot = False
+        while True:
+            if not slot:
+                # take a request slot before choosing, so the choice sees retries re-queued meanwhile
+                await self._slots.acquire()
+                slot = True
+            now = self.clock()
+            if self._paused_until > now:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            while self._waiting and self._waiting[0][0] <= now:
+                chat_id = heapq.heappop(self._waiting)[1]
+                chat = self._chats.get(chat_id)
+                if chat is not None:
+                    chat.waiting = False
+                    self._activate(chat_id, chat, now)
+
+            ready = self._next_ready()
+            if ready is None:
+                if len(self._chats) > 1024:
+                    self._prune(now)
+                await self._sleep(self._waiting[0][0] - now if self._waiting else None)
+                continue
+            wait = self._bucket.wait(now)
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+
+            chat_id, chat = ready
+            heapq.heappop(self._ready)
+            call = heapq.heappop(chat.calls)[2]
+            self._pending -= 1
+            if call.key is not None and self._keys.get(call.key) is call:
+                del self._keys[call.key]
+            self._bucket.take(now)
+            chat.bucket.take(now)
+            self._activate(chat_id, chat, now)
+
+            slot = False
+            task = asyncio.get_running_loop().create_task(self._execute(call))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, call: _Call) -> None:
+        name = call.priority.name
+        try:
+            if call.future.done():
+                return
+            OUTBOUND_QUEUE_SECONDS.labels(priority=name).observe(self.clock() - call.enqueued)
+            try:
+                result = await call.callback(*call.args, **call.kwargs)
+            except RetryAfter as e:
+                self._pause(e)
+                call.attempts += 1
+                if call.key is not None and call.key in self._keys:
+                    # a newer edit of the message is already queued
+                    self._drop(call)
+                    return
+                if call.attempts > self.max_retries:
+                    self.counts["failed"] += 1
+                    OUTBOUND_CALLS.labels(priority=name, outcome="failed").inc()
+                    if not call.future.done():
+                        call.future.set_exception(e)
+                    return
+                self.counts["retried"] += 1
+                OUTBOUND_CALLS.labels(priority=name, outcome="retry_after").inc()
+                self._submit(call)        # keeps its seq, so its place in line
+            except Exception as e:
+                self.counts["failed"] += 1
+                OUTBOUND_CALLS.labels(priority=name, outcome="failed").inc()
+                if not call.future.done():
+                    call.future.set_exception(e)
+            else:
+                self.counts["sent"] += 1
+                OUTBOUND_CALLS.labels(priority=name, outcome="sent").inc()
+                if not call.future.done():
+                    call.future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self._pending, "chats": len(self._chats), **self.counts}
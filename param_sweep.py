@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Strategy Parameter Sweep
+
+Grid or random search over StrategyParams (EMA periods, trend band, ATR%
+cutoffs, RSI levels, S/R bounce) on historical candles - the same
+sources as backtest.py: candle archives, CSV files or synthetic history.
+Parameter sets are ranked by win rate at expiry.
+
+Indicator series are computed once and shared by every point:
+
+- series that no parameter affects (SMA, RSI, ATR, average price,
+  support/resistance) once per history
+- one EMA series per distinct period in the search space
+
+They are written as .npy files to a scratch directory that every worker
+maps read-only, so evaluating a point costs only the threshold masks and
+the scoring pass (backtest.score_series). Points are spread over a
+process pool in chunks.
+
+The best point can be written as a config file the bot loads through
+STRATEGY_CONFIG (see trading_logic.StrategyParams).
+
+Usage:
+  python param_sweep.py archive/*.cndl --grid ema_fast=3,5,8 --grid trend_band=0.0005,0.001,0.002
+  python param_sweep.py --synthetic 200000 --random 50 --range rsi_bullish=55:70 --range rsi_bearish=30:45
+  python param_sweep.py data/*.csv --grid atr_high=0.4,0.5,0.6 --out strategy.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import vector_indicators
+from backtest import DEFAULT_WARMUP, BacktestJob, job_from_path, load_job, score_series
+from trading_logic import StrategyParams
+
+logger = logging.getLogger(__name__)
+
+PARAM_TYPES = {f.name: f.type for f in fields(StrategyParams)}
+# points per pool task
+CHUNK_POINTS = 8
+DEFAULT_MIN_SIGNALS = 100
+
+
+class SeriesInfo(NamedTuple):
+    """A prepared history: arrays live in ``directory`` as <key>_<name>.npy"""
+    key: str
+    pair: str
+    timeframe: str
+    candles: int
+
+
+def _is_int(name: str) -> bool:
+    return PARAM_TYPES[name] in (int, "int")
+
+
+def _check_name(name: str) -> None:
+    if name not in PARAM_TYPES:
+        raise ValueError(f"Unknown parameter {name!r} (expected one of {', '.join(PARAM_TYPES)})")
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[float]]:
+    """``name=v1,v2,...`` specs -> {name: values}"""
+    grid = {}
+    for spec in specs:
+        name, _, raw = spec.partition("=")
+        _check_name(name)
+        grid[name] = [int(v) if _is_int(name) else float(v) for v in raw.split(",") if v]
+    return grid
+
+
+def parse_ranges(specs: Sequence[str]) -> Dict[str, Tuple[float, float]]:
+    """``name=low:high`` specs -> {name: (low, high)}"""
+    ranges = {}
+    for spec in specs:
+        name, _, raw = spec.partition("=")
+        _check_name(name)
+        low, _, high = raw.partition(":")
+        ranges[name] = (float(low), float(high))
+    return ranges
+
+
+def grid_points(grid: Dict[str, List[float]], base: Optional[StrategyParams] = None) -> List[StrategyParams]:
+    """Every combination of the grid values; invalid combinations are left out"""
+    base = base or StrategyParams()
+    names = list(grid)
+    points = []
+    for combo in itertools.product(*(grid[name] for name in names)):
+        try:
+            points.append(replace(base, **dict(zip(names, combo))))
+        except ValueError:
+            continue
+    return points
+
+
+def random_points(
+    ranges: Dict[str, Tuple[float, float]],
+    count: int,
+    base: Optional[StrategyParams] = None,
+    seed: Optional[int] = None
+) -> List[StrategyParams]:
+    """``count`` valid points drawn uniformly from the ranges (ints inclusive)"""
+    base = base or StrategyParams()
+    rng = random.Random(seed)
+    points: List[StrategyParams] = []
+    attempts = 0
+    while len(points) < count and attempts < count * 100:
+        attempts += 1
+        values = {name: rng.randint(int(low), int(high)) if _is_int(name) else rng.uniform(low, high)
+                  for name, (low, high) in ranges.items()}
+        try:
+            points.append(replace(base, **values))
+        except ValueError:
+            continue
+    return points
+
+
+# ===== Shared indicator cache =====
+
+def prepare_series(jobs: List[BacktestJob], periods: Sequence[int], directory: str) -> List[SeriesInfo]:
+    """Compute each history's parameter-independent series and EMAs once and save them"""
+    prepared = []
+    for i, job in enumerate(jobs):
+        view = load_job(job)
+        key = f"s{i}"
+        values = vector_indicators.indicator_series(view.high, view.low, view.close)
+        for name, series in values.items():
+            if name not in ("ema_fast", "ema_slow"):
+                np.save(os.path.join(directory, f"{key}_{name}.npy"), series)
+        for period in sorted(set(periods)):
+            np.save(os.path.join(directory, f"{key}_ema{period}.npy"),
+                    vector_indicators.ema_series(values["last_close"], period))
+        prepared.append(SeriesInfo(key, job.pair, job.timeframe, len(values["last_close"])))
+    return prepared
+
+
+# per-process state set by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(directory: str, series: List[SeriesInfo], expiry: int, warmup: int) -> None:
+    _worker.update(directory=directory, series=series, expiry=expiry, warmup=warmup, arrays={})
+
+
+def _array(key: str, name: str) -> np.ndarray:
+    """Memory-mapped cached array, loaded on first use in this process"""
+    arrays = _worker["arrays"]
+    array = arrays.get((key, name))
+    if array is None:
+        array = arrays[(key, name)] = np.load(os.path.join(_worker["directory"], f"{key}_{name}.npy"), mmap_mode="r")
+    return array
+
+
+def _evaluate(point: StrategyParams) -> Dict[str, Any]:
+    """Score one point over every prepared history"""
+    totals = {"signals": 0, "wins": 0, "losses": 0, "ties": 0}
+    gap = 0.0
+    decided = 0
+    for info in _worker["series"]:
+        values = {name: _array(info.key, name) for name in
+                  ("sma_fast", "sma_slow", "atr", "avg_price", "rsi", "support", "resistance", "last_close")}
+        values["ema_fast"] = _array(info.key, f"ema{point.ema_fast}")
+        values["ema_slow"] = _array(info.key, f"ema{point.ema_slow}")
+        result = score_series(values, info.timeframe, _worker["expiry"], _worker["warmup"], point)
+        for name in totals:
+            totals[name] += result[name]
+        if result["calibration_error"] is not None:
+            gap += result["calibration_error"] * (result["wins"] + result["losses"])
+            decided += result["wins"] + result["losses"]
+    wins, losses = totals["wins"], totals["losses"]
+    return {
+        "params": point.to_dict(),
+        **totals,
+        "win_rate": round(wins / (wins + losses), 4) if wins + losses else None,
+        "calibration_error": round(gap / decided, 4) if decided else None,
+    }
+
+
+def _evaluate_chunk(points: List[StrategyParams]) -> List[Dict[str, Any]]:
+    return [_evaluate(point) for point in points]
+
+
+def rank(results: List[Dict[str, Any]], min_signals: int = DEFAULT_MIN_SIGNALS) -> List[Dict[str, Any]]:
+    """Best win rate first (more signals break ties); points under ``min_signals`` go last"""
+    def key(r):
+        eligible = r["signals"] >= min_signals and r["win_rate"] is not None
+        return (not eligible, -(r["win_rate"] or 0.0), -r["signals"])
+    return sorted(results, key=key)
+
+
+def run_sweep(
+    jobs: List[BacktestJob],
+    points: List[StrategyParams],
+    expiry: int = 1,
+    warmup: int = DEFAULT_WARMUP,
+    workers: Optional[int] = None,
+    min_signals: int = DEFAULT_MIN_SIGNALS
+) -> Dict[str, Any]:
+    """
+    Evaluate every point over every history.
+
+    Args:
+        jobs: Histories (see backtest.BacktestJob)
+        points: Parameter sets to evaluate
+        expiry: Candles until a signal's outcome is read
+        warmup: Candles of history before the first scored signal
+        workers: Pool size (defaults to the CPU count; 1 runs inline)
+        min_signals: Points with fewer signals are ranked last
+
+    Returns:
+        {"ranked": [...], "points", "series", "candles", "prepare_seconds", "wall_time", "points_per_sec"}
+    """
+    if not points:
+        raise ValueError("no valid parameter points to evaluate")
+    periods = {p.ema_fast for p in points} | {p.ema_slow for p in points}
+    chunks = [points[i:i + CHUNK_POINTS] for i in range(0, len(points), CHUNK_POINTS)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="param_sweep_") as directory:
+        series = prepare_series(jobs, periods, directory)
+        prepared = time.perf_counter()
+        if workers == 1:
+            _init_worker(directory, series, expiry, warmup)
+            try:
+                results = [r for chunk in chunks for r in _evaluate_chunk(chunk)]
+            finally:
+                _worker.clear()
+        else:
+            # spawn, like SignalExecutor; workers map the cached series read-only
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(directory, series, expiry, warmup)) as pool:
+                results = [r for batch in pool.map(_evaluate_chunk, chunks) for r in batch]
+    finished = time.perf_counter()
+
+    return {
+        "ranked": rank(results, min_signals),
+        "points": len(points),
+        "series": [info._asdict() for info in series],
+        "candles": sum(info.candles for info in series),
+        "workers": workers,
+        "expiry": expiry,
+        "min_signals": min_signals,
+        "prepare_seconds": round(prepared - started, 4),
+        "wall_time": round(finished - started, 4),
+        "points_per_sec": round(len(points) / (finished - prepared), 2) if finished > prepared else 0.0,
+    }
+
+
+def print_report(report: Dict[str, Any], names: List[str], top: int) -> None:
+    defaults = StrategyParams().to_dict()
+    names = names or [n for n in PARAM_TYPES if any(r["params"][n] != defaults[n] for r in report["ranked"])]
+    header = f"{'rank':>4}{'win rate':>10}{'signals':>10}{'calib err':>11}  " + "  ".join(f"{n:>12}" for n in names)
+    print("\n" + header)
+    for i, r in enumerate(report["ranked"][:top], 1):
+        rate = "-" if r["win_rate"] is None else f"{r['win_rate']:.1%}"
+        error = "-" if r["calibration_error"] is None else f"{r['calibration_error']:.3f}"
+        marker = " " if r["signals"] >= report["min_signals"] else "*"
+        cells = "  ".join(f"{r['params'][n]:>12.6g}" for n in names)
+        print(f"{i:>4}{rate:>10}{r['signals']:>9}{marker}{error:>11}  {cells}")
+    print(f"\n{report['points']} points x {len(report['series'])} series ({report['candles']} candles)  "
+          f"Workers: {report['workers']}  Prepare: {report['prepare_seconds']:.2f}s  "
+          f"Wall: {report['wall_time']:.2f}s  {report['points_per_sec']} points/s")
+    if any(r["signals"] < report["min_signals"] for r in report["ranked"][:top]):
+        print(f"* fewer than {report['min_signals']} signals")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="candle archives (.cndl) or PAIR_TIMEFRAME.csv files")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2", help="grid values")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=LOW:HIGH",
+                        help="random search range")
+    parser.add_argument("--random", type=int, default=0, help="random points to draw from --range")
+    parser.add_argument("--seed", type=int, default=None, help="random search seed")
+    parser.add_argument("--base", help="config file the unswept parameters come from (default: built-in)")
+    parser.add_argument("--expiry", type=int, default=1, help="candles until the outcome is read")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="history before the first signal")
+    parser.add_argument("--start", type=float, default=None, help="first candle timestamp (epoch seconds)")
+    parser.add_argument("--end", type=float, default=None, help="stop before this timestamp")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate this many candles per series")
+    parser.add_argument("--pairs", default="EURUSD,GBPUSD", help="pairs for --synthetic")
+    parser.add_argument("--timeframes", default="5s,1m", help="timeframes for --synthetic")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--min-signals", type=int, default=DEFAULT_MIN_SIGNALS,
+                        help="rank points with fewer signals last")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument("--out", help="write the best point as a strategy config file")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        base = StrategyParams.load(args.base) if args.base else StrategyParams()
+        grid = parse_grid(args.grid)
+        ranges = parse_ranges(args.range)
+        jobs = [job_from_path(path, args.start, args.end) for path in args.files]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.synthetic:
+        jobs += [BacktestJob(pair, tf, candles=args.synthetic, start=args.start, end=args.end)
+                 for pair in args.pairs.split(",") if pair
+                 for tf in args.timeframes.split(",") if tf]
+    if not jobs:
+        parser.error("give candle files or --synthetic N")
+    if args.random:
+        if not ranges or grid:
+            parser.error("--random draws from --range only (use --grid for a grid search)")
+        points = random_points(ranges, args.random, base, seed=args.seed)
+    else:
+        points = grid_points(grid, base) if grid else [base]
+
+    report = run_sweep(jobs, points, expiry=args.expiry, warmup=args.warmup,
+                       workers=args.workers, min_signals=args.min_signals)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, list(grid) + [n for n in ranges if n not in grid], args.top)
+
+    if args.out:
+        best = report["ranked"][0]
+        if best["signals"] < args.min_signals:
+            print(f"\nNo point reached {args.min_signals} signals; {args.out} not written")
+            return 1
+        metrics = {k: best[k] for k in ("signals", "wins", "losses", "ties", "win_rate", "calibration_error")}
+        StrategyParams.from_dict(best["params"]).save(
+            args.out,
+            metrics=metrics,
+            sweep={"series": [f"{s['pair']} {s['timeframe']}" for s in report["series"]],
+                   "candles": report["candles"], "expiry": args.expiry, "points": report["points"],
+                   "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        )
+        print(f"\nBest parameters written to {args.out} (load with STRATEGY_CONFIG={args.out})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
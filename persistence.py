@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+SQLite Session and State Persistence (write-behind)
+
+Keeps user sessions, signal subscriptions and small bot state (e.g. the
+market mode) across worker restarts. Writes never touch the disk on the caller's path: they
+are collected in memory (latest value per key wins) and written in one
+transaction by ``flush()``, which the bot runs periodically off the event
+loop and once at shutdown.
+
+The database is opened on first use in WAL mode with synchronous=NORMAL,
+so a flush costs one WAL append and readers are never blocked. Sessions
+are read back lazily, one primary-key lookup the first time an unknown
+user shows up after a restart.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    user_id    INTEGER PRIMARY KEY,
+    pair       TEXT,
+    timeframe  TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    chat_id   INTEGER NOT NULL,
+    pair      TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    PRIMARY KEY (chat_id, pair, timeframe)
+);
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# (pair, timeframe, updated_at: epoch seconds the user was last seen)
+SessionRow = Tuple[Optional[str], Optional[str], float]
+# (chat_id, pair, timeframe)
+SubscriptionRow = Tuple[int, str, str]
+
+
+class SQLitePersistence:
+    """
+    Write-behind SQLite store for sessions and key/value state.
+
+    Args:
+        path: Database file (created on first use)
+        clock: Wall-clock time source for session stamps (injectable for tests)
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # pending writes; None marks a delete
+        self._sessions: Dict[int, Optional[SessionRow]] = {}
+        self._state: Dict[str, Optional[str]] = {}
+        # True = subscribe, False = unsubscribe
+        self._subscriptions: Dict[SubscriptionRow, bool] = {}
+        self.flushes = 0
+        self.rows_written = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            logger.info("Session database opened: %s", self.path)
+        return self._conn
+
+    # ----- sessions -----
+
+    def load_session(self, user_id: int) -> Optional[SessionRow]:
+        """Latest known session row for the user (pending writes first)"""
+        with self._lock:
+            if user_id in self._sessions:
+                return self._sessions[user_id]
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT pair, timeframe, updated_at FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def save_session(self, user_id: int, pair: Optional[str], timeframe: Optional[str],
+                     updated_at: Optional[float] = None) -> None:
+        """Queue the user's session for the next flush, stamped as seen now by default"""
+        with self._lock:
+            self._sessions[user_id] = (pair, timeframe, self.clock() if updated_at is None else updated_at)
+
+    def delete_session(self, user_id: int) -> None:
+        """Queue removal of the user's session"""
+        with self._lock:
+            self._sessions[user_id] = None
+
+    # ----- subscriptions -----
+
+    def load_subscriptions(self) -> List[SubscriptionRow]:
+        """Every stored subscription with pending changes applied"""
+        with self._db_lock:
+            rows = {tuple(r) for r in self._connect().execute(
+                "SELECT chat_id, pair, timeframe FROM subscriptions"
+            )}
+        with self._lock:
+            for row, subscribed in self._subscriptions.items():
+                if subscribed:
+                    rows.add(row)
+                else:
+                    rows.discard(row)
+        return sorted(rows)
+
+    def save_subscription(self, chat_id: int, pair: str, timeframe: str, subscribed: bool = True) -> None:
+        """Queue adding (or with ``subscribed=False`` removing) a subscription"""
+        with self._lock:
+            self._subscriptions[(chat_id, pair, timeframe)] = subscribed
+
+    # ----- key/value state -----
+
+    def get_state(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            if key in self._state:
+                value = self._state[key]
+                return default if value is None else value
+        with self._db_lock:
+            row = self._connect().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key: str, value: Optional[str]) -> None:
+        """Queue a state value for the next flush (None deletes the key)"""
+        with self._lock:
+            self._state[key] = value
+
+    # ----- write-behind -----
+
+    @property
+    def pending(self) -> int:
+        return len(self._sessions) + len(self._state) + len(self._subscriptions)
+
+    def flush(self, max_age: Optional[float] = None) -> int:
+        """Write pending changes in one transaction; returns rows written.
+
+        With ``max_age`` (seconds), sessions not seen for longer are pruned too.
+        """
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+            state, self._state = self._state, {}
+            subscriptions, self._subscriptions = self._subscriptions, {}
+        if not sessions and not state and not subscriptions and max_age is None:
+            return 0
+
+        upserts = [(uid, *row) for uid, row in sessions.items() if row is not None]
+        deletes = [(uid,) for uid, row in sessions.items() if row is None]
+        started = time.perf_counter()
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                try:
+                    conn.executemany(
+                        "INSERT INTO sessions (user_id, pair, timeframe, updated_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(user_id) DO UPDATE SET pair = excluded.pair, "
+                        "timeframe = excluded.timeframe, updated_at = excluded.updated_at",
+                        upserts,
+                    )
+                    conn.executemany("DELETE FROM sessions WHERE user_id = ?", deletes)
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                        [(k, v) for k, v in state.items() if v is not None],
+                    )
+                    conn.executemany("DELETE FROM state WHERE key = ?", [(k,) for k, v in state.items() if v is None])
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO subscriptions (chat_id, pair, timeframe) VALUES (?, ?, ?)",
+                        [row for row, subscribed in subscriptions.items() if subscribed],
+                    )
+                    conn.executemany(
+                        "DELETE FROM subscriptions WHERE chat_id = ? AND pair = ? AND timeframe = ?",
+                        [row for row, subscribed in subscriptions.items() if not subscribed],
+                    )
+                    if max_age is not None:
+                        conn.execute("DELETE FROM sessions WHERE updated_at < ?", (self.clock() - max_age,))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            logger.exception(
+                "Session flush failed; %d changes will be retried", len(sessions) + len(state) + len(subscriptions)
+            )
+            with self._lock:
+                # newer writes queued meanwhile take precedence
+                for uid, row in sessions.items():
+                    self._sessions.setdefault(uid, row)
+                for key, value in state.items():
+                    self._state.setdefault(key, value)
+                for row, subscribed in subscriptions.items():
+                    self._subscriptions.setdefault(row, subscribed)
+            return 0
+
+        written = len(sessions) + len(state) + len(subscriptions)
+        self.flushes += 1
+        self.rows_written += written
+        if written:
+            logger.debug("Flushed %d session/state/subscription changes in %.1fms", written, (time.perf_counter() - started) * 1000)
+        return written
+
+    def close(self) -> None:
+        """Flush pending changes and close the database"""
+        self.flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, float]:
+        return {"pending": self.pending, "flushes": self.flushes, "rows_written": self.rows_written}
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Candle-Close Signal Precompute
+
+Keeps a signal for every active pair x timeframe ready before users ask
+for it. A job on the application's job_queue fires on every boundary of
+the shortest active timeframe; each run recomputes (with the vectorized
+batch API) the timeframes whose candle just closed and publishes the
+results into a shared SignalSnapshot.
+
+Handlers read from the snapshot, so their latency no longer depends on
+indicator computation. The snapshot is replaced as a whole on every
+publish (copy-on-write), so readers never see a half-updated state.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from executors import SignalExecutor
+from resampler import TIMEFRAME_SECONDS
+from signal_cache import candle_open
+from trading_logic import SignalResult, determine_entry_instruction, generate_trading_signals_batch
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "signal_precompute"
+
+
+class SignalSnapshot:
+    """Latest precomputed signal per (pair, timeframe), tagged with its candle"""
+
+    def __init__(self) -> None:
+        # (pair, timeframe) -> (candle open timestamp, signal)
+        self._signals: Dict[Tuple[str, str], Tuple[float, SignalResult]] = {}
+        self.published_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def get(self, pair: str, timeframe: str, now: Optional[float] = None) -> Optional[SignalResult]:
+        """Return the signal for the candle open right now, None if missing or stale"""
+        entry = self._signals.get((pair, timeframe))
+        if entry is None:
+            return None
+        opened, signal = entry
+        if opened != candle_open(timeframe, time.time() if now is None else now):
+            return None
+        return dataclasses.replace(signal, entry_instruction=determine_entry_instruction(timeframe))
+
+    def publish(self, updates: Dict[Tuple[str, str], Tuple[float, SignalResult]], replace: bool = False) -> None:
+        """Swap in a new snapshot containing ``updates``.
+
+        With ``replace`` the previous entries are dropped (used on mode switches).
+        """
+        signals = {} if replace else dict(self._signals)
+        signals.update(updates)
+        self._signals = signals
+        self.published_at = time.time()
+
+
+class PrecomputeScheduler:
+    """
+    Schedules snapshot refreshes on candle boundaries.
+
+    Args:
+        snapshot: SignalSnapshot to publish into
+        active_pairs: Callable returning the pairs to precompute
+        active_timeframes: Callable returning the timeframes to precompute
+        price_for: Callable returning the current price of a pair
+        executor: SignalExecutor to run the batch on (default: asyncio.to_thread)
+        prefetch: Optional coroutine function called with the pairs before
+            each batch, so market data for all of them is fetched at once
+        on_candle_close: Optional coroutine function called with the
+            {(pair, timeframe): signal} published at each candle close
+    """
+
+    def __init__(
+        self,
+        snapshot: SignalSnapshot,
+        active_pairs: Callable[[], List[str]],
+        active_timeframes: Callable[[], List[str]],
+        price_for: Callable[[str], float],
+        executor: Optional[SignalExecutor] = None,
+        prefetch: Optional[Callable[[List[str]], Awaitable[Any]]] = None,
+        on_candle_close: Optional[Callable[[Dict[Tuple[str, str], SignalResult]], Awaitable[Any]]] = None
+    ) -> None:
+        self.snapshot = snapshot
+        self.executor = executor
+        self.prefetch = prefetch
+        self.on_candle_close = on_candle_close
+        self.active_pairs = active_pairs
+        self.active_timeframes = active_timeframes
+        self.price_for = price_for
+        self.tick: Optional[int] = None
+        self.runs = 0
+        self.last_duration = 0.0
+        self._job = None
+
+    def due_timeframes(self, boundary: float, timeframes: List[str]) -> List[str]:
+        """Timeframes whose candle closes at ``boundary``"""
+        return [tf for tf in timeframes if boundary % TIMEFRAME_SECONDS[tf] == 0]
+
+    async def refresh(
+        self,
+        timeframes: Optional[List[str]] = None,
+        replace: bool = False,
+        at: Optional[float] = None,
+        notify: bool = False
+    ) -> int:
+        """Compute and publish signals for every active pair x ``timeframes``.
+
+        Defaults to all active timeframes. ``at`` is the candle boundary the
+        run belongs to (defaults to now). With ``notify`` the published
+        signals are passed to ``on_candle_close``. Returns the number of
+        signals published.
+        """
+        pairs = self.active_pairs()
+        if timeframes is None:
+            timeframes = self.active_timeframes()
+        if not pairs or not timeframes:
+            return 0
+
+        started = time.perf_counter()
+        now = time.time() if at is None else max(at, time.time())
+        if self.prefetch is not None:
+            await self.prefetch(pairs)
+        requests = [(pair, tf, self.price_for(pair)) for pair in pairs for tf in timeframes]
+        if self.executor is not None:
+            signals = await self.executor.run(generate_trading_signals_batch, requests)
+        else:
+            signals = await asyncio.to_thread(generate_trading_signals_batch, requests)
+
+        updates = {}
+        for (pair, tf, _), signal in zip(requests, signals):
+            # invalid/error results are left for the on-demand path to retry
+            if signal.entry_time != "N/A":
+                updates[(pair, tf)] = (candle_open(tf, now), signal)
+        self.snapshot.publish(updates, replace=replace)
+        if notify and self.on_candle_close is not None and updates:
+            try:
+                await self.on_candle_close({key: signal for key, (_, signal) in updates.items()})
+            except Exception:
+                logger.exception("Candle-close notification failed")
+
+        self.runs += 1
+        self.last_duration = time.perf_counter() - started
+        logger.debug("Precomputed %d signals (%s) in %.3fs", len(updates), ",".join(timeframes), self.last_duration)
+        return len(updates)
+
+    async def _job_callback(self, context) -> None:
+        timeframes = self.active_timeframes()
+        tick = min(TIMEFRAME_SECONDS[tf] for tf in timeframes)
+        # the job may fire a little late; snap to the boundary it was meant for
+        boundary = round(time.time() / tick) * tick
+        due = self.due_timeframes(boundary, timeframes)
+        if due:
+            await self.refresh(due, at=boundary, notify=True)
+
+    async def _warm_callback(self, context) -> None:
+        await self.refresh(replace=True)
+
+    def schedule(self, job_queue) -> None:
+        """(Re)schedule the refresh job for the current set of active timeframes."""
+        if self._job is not None:
+            self._job.schedule_removal()
+            self._job = None
+        timeframes = self.active_timeframes()
+        if not timeframes:
+            return
+        self.tick = min(TIMEFRAME_SECONDS[tf] for tf in timeframes)
+        now = time.time()
+        first = math.ceil(now / self.tick) * self.tick - now
+        self._job = job_queue.run_repeating(
+            self._job_callback, interval=self.tick, first=first, name=JOB_NAME
+        )
+        # warm the whole snapshot right away instead of waiting for boundaries
+        job_queue.run_once(self._warm_callback, when=0, name=f"{JOB_NAME}_warm")
+        logger.info("Signal precompute scheduled every %ds", self.tick)
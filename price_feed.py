@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Shared Live Price Feed
+
+One background task per process keeps the latest price of every pair.
+Prices are published as an immutable PriceSnapshot that is replaced as a
+whole on every tick (copy-on-write, like precompute.SignalSnapshot), so
+readers take no lock and do no I/O, and every reader between two ticks
+sees the same prices for every pair.
+
+Sources are pluggable async iterators of {pair: price} batches:
+
+- SimulatedSource: random walk around the configured base prices
+- ReplaySource:    replays a ``timestamp,pair,price`` CSV file
+- SocketSource:    newline-delimited JSON objects {pair: price, ...}
+                   read from a local TCP feed (reconnects on failure)
+
+Configured through PRICE_FEED (sim|replay|socket), PRICE_FEED_INTERVAL,
+PRICE_FEED_FILE and PRICE_FEED_ADDR (see PriceFeed.from_env).
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import time
+from typing import AsyncIterator, Dict, Mapping, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ("sim", "replay", "socket")
+# delay before a failed source is restarted
+RESTART_DELAY = 1.0
+
+PRICE_TICKS = metrics.counter("price_feed_ticks_total", "Price batches applied to the snapshot")
+
+Prices = Dict[str, float]
+
+
+class PriceSnapshot:
+    """Immutable view of the latest prices"""
+    __slots__ = ("prices", "updated_at", "version")
+
+    def __init__(self, prices: Mapping[str, float], updated_at: float, version: int) -> None:
+        self.prices = dict(prices)
+        self.updated_at = updated_at
+        self.version = version
+
+    def get(self, pair: str, default: Optional[float] = None) -> Optional[float]:
+        return self.prices.get(pair, default)
+
+
+# ===== Sources =====
+
+class SimulatedSource:
+    """
+    Independent random walk per pair (its own RNG, not the global one).
+
+    Args:
+        base_prices: Starting price per pair
+        interval: Seconds between ticks
+        volatility: Standard deviation of the relative move per tick
+        seed: RNG seed
+    """
+
+    def __init__(self, base_prices: Mapping[str, float], interval: float = 1.0,
+                 volatility: float = 0.0002, seed: Optional[int] = None) -> None:
+        self.prices = dict(base_prices)
+        self.interval = interval
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+
+    def step(self) -> Prices:
+        """Advance every pair by one tick"""
+        for pair, price in self.prices.items():
+            self.prices[pair] = price * (1 + self._rng.gauss(0.0, self.volatility))
+        return dict(self.prices)
+
+    async def ticks(self) -> AsyncIterator[Prices]:
+        while True:
+            yield self.step()
+            await asyncio.sleep(self.interval)
+
+
+class ReplaySource:
+    """
+    Replays recorded ticks from a CSV file with ``timestamp,pair,price`` rows.
+
+    Rows sharing a timestamp are published as one batch; the gaps between
+    timestamps are replayed divided by ``speed`` (0 = as fast as possible).
+
+    Args:
+        path: CSV file (header row required)
+        speed: Replay speed multiplier
+        loop: Start over at the end of the file
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True) -> None:
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+    def _batches(self):
+        batch: Prices = {}
+        stamp: Optional[float] = None
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    ts, pair, price = float(row["timestamp"]), row["pair"], float(row["price"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if stamp is not None and ts != stamp:
+                    yield stamp, batch
+                    batch = {}
+                stamp = ts
+                batch[pair] = price
+        if batch:
+            yield stamp, batch
+
+    async def ticks(self) -> AsyncIterator[Prices]:
+        while True:
+            previous: Optional[float] = None
+            for stamp, batch in self._batches():
+                if previous is not None and self.speed > 0:
+                    await asyncio.sleep(max(0.0, stamp - previous) / self.speed)
+                previous = stamp
+                yield batch
+            if not self.loop:
+                return
+            await asyncio.sleep(0)
+
+
+class SocketSource:
+    """
+    Reads {pair: price} JSON lines from a TCP feed.
+
+    Args:
+        host: Feed host
+        port: Feed port
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+
+    async def ticks(self) -> AsyncIterator[Prices]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        logger.info("Price feed connected to %s:%d", self.host, self.port)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("price feed closed the connection")
+                try:
+                    batch = {str(k): float(v) for k, v in json.loads(line).items()}
+                except (ValueError, AttributeError, TypeError):
+                    logger.warning("Ignoring malformed price feed line: %r", line[:100])
+                    continue
+                if batch:
+                    yield batch
+        finally:
+            writer.close()
+
+
+# ===== Feed =====
+
+class PriceFeed:
+    """
+    Background task applying source ticks to a shared snapshot.
+
+    Args:
+        source: Object with an async ``ticks()`` iterator of {pair: price}
+        initial: Prices served before the first tick
+        restart_delay: Seconds to wait before restarting a failed source
+    """
+
+    def __init__(self, source, initial: Optional[Mapping[str, float]] = None,
+                 restart_delay: float = RESTART_DELAY) -> None:
+        self.source = source
+        self.restart_delay = restart_delay
+        self.snapshot = PriceSnapshot(initial or {}, time.time(), 0)
+        self.restarts = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, base_prices: Mapping[str, float]) -> "PriceFeed":
+        """Feed for PRICE_FEED (default: simulator around ``base_prices``)"""
+        kind = os.getenv("PRICE_FEED", "sim").strip().lower()
+        if kind not in SOURCES:
+            raise ValueError(f"PRICE_FEED must be one of {', '.join(SOURCES)}, got {kind!r}")
+        interval = float(os.getenv("PRICE_FEED_INTERVAL", "1"))
+        if kind == "replay":
+            source = ReplaySource(os.environ["PRICE_FEED_FILE"], speed=float(os.getenv("PRICE_FEED_SPEED", "1")))
+        elif kind == "socket":
+            host, _, port = os.getenv("PRICE_FEED_ADDR", "127.0.0.1:9100").rpartition(":")
+            source = SocketSource(host or "127.0.0.1", int(port))
+        else:
+            source = SimulatedSource(base_prices, interval=interval)
+        logger.info("Price feed source: %s", kind)
+        return cls(source, initial=base_prices)
+
+    def price(self, pair: str, default: Optional[float] = None) -> Optional[float]:
+        """Latest price of ``pair`` (no lock, no I/O)"""
+        return self.snapshot.prices.get(pair, default)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last tick"""
+        return time.time() - self.snapshot.updated_at
+
+    def apply(self, batch: Mapping[str, float]) -> PriceSnapshot:
+        """Publish a new snapshot with ``batch`` merged into the latest prices"""
+        current = self.snapshot
+        prices = dict(current.prices)
+        prices.update(batch)
+        self.snapshot = PriceSnapshot(prices, time.time(), current.version + 1)
+        PRICE_TICKS.inc()
+        return self.snapshot
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async for batch in self.source.ticks():
+                    self.apply(batch)
+                logger.info("Price feed source finished")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.restarts += 1
+                logger.warning("Price feed failed (%s); restarting in %.1fs", e, self.restart_delay)
+                await asyncio.sleep(self.restart_delay)
+
+    def start(self) -> None:
+        """Start the feed task on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="price_feed")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, float]:
+        return {"pairs": len(self.snapshot.prices), "version": self.snapshot.version,
+                "age": round(self.age, 3), "restarts": self.restarts}
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Sampling Profiler for Signal Generation
+
+Runs 1 in N calls under cProfile and aggregates the samples into a
+pstats file, so production can be profiled by flipping an environment
+variable instead of redeploying:
+
+  SIGNAL_PROFILE_SAMPLE=100          profile every 100th signal (unset/0 = off)
+  SIGNAL_PROFILE_DIR=profiles        where aggregated profiles are written
+  SIGNAL_PROFILE_FLUSH=20            write the file every N samples
+
+Each process writes its own file (signal_<pid>.prof); inspect with
+``python -m pstats profiles/signal_<pid>.prof``. When disabled the only
+cost per call is one attribute check.
+"""
+
+import atexit
+import cProfile
+import itertools
+import logging
+import os
+import pstats
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SignalProfiler:
+    """
+    Profiles every ``sample_every``-th call and aggregates the results.
+
+    Args:
+        sample_every: Sampling interval (0 disables profiling)
+        output_dir: Directory for the aggregated .prof files
+        flush_every: Samples between writes to disk
+    """
+
+    def __init__(self, sample_every: int = 0, output_dir: str = "profiles", flush_every: int = 20) -> None:
+        self.sample_every = max(0, sample_every)
+        self.output_dir = output_dir
+        self.flush_every = max(1, flush_every)
+        self.samples = 0
+        self._calls = itertools.count(1)
+        self._stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+        # cProfile cannot run in two threads at once; overlapping samples are skipped
+        self._active = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SignalProfiler":
+        """Build a profiler from SIGNAL_PROFILE_SAMPLE / _DIR / _FLUSH"""
+        profiler = cls(
+            int(os.getenv("SIGNAL_PROFILE_SAMPLE", "0") or 0),
+            os.getenv("SIGNAL_PROFILE_DIR", "profiles"),
+            int(os.getenv("SIGNAL_PROFILE_FLUSH", "20") or 20),
+        )
+        if profiler.enabled:
+            atexit.register(profiler.flush)
+            logger.info("Profiling 1 in %d signal requests into %s", profiler.sample_every, profiler.output_dir)
+        return profiler
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_every > 0
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.output_dir, f"signal_{os.getpid()}.prof")
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call ``fn(*args)``, under cProfile if this call is sampled"""
+        if not self.sample_every or next(self._calls) % self.sample_every:
+            return fn(*args)
+        if not self._active.acquire(blocking=False):
+            return fn(*args)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                return fn(*args)
+            finally:
+                profile.disable()
+        finally:
+            self._active.release()
+            self._add(profile)
+
+    def _add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.samples += 1
+            due = self.samples % self.flush_every == 0
+        if due:
+            self.flush()
+
+    def flush(self) -> Optional[str]:
+        """Write the aggregated profile to disk; returns its path"""
+        with self._lock:
+            if self._stats is None:
+                return None
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                tmp = self.path + ".tmp"
+                self._stats.dump_stats(tmp)
+                os.replace(tmp, self.path)
+            except OSError:
+                logger.exception("Could not write profile to %s", self.path)
+                return None
+        return self.path
+
+
+# Shared profiler configured from the environment
+signal_profiler = SignalProfiler.from_env()
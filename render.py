@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Precompiled Keyboards and Message Templates
+
+Everything the handlers send that depends only on the market mode (pair
+and timeframe keyboards, menu texts, per-pair / per-timeframe headers)
+is built once per mode into an immutable ModeRender. RenderCache holds
+one per mode and swaps the active one with a single reference
+assignment when market_mode_job detects a switch, so a handler always
+sees one consistent set.
+
+Signal messages are formatted from precompiled templates; the output
+matches the previous ``format_signal_message`` exactly.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+BADGES = {"NORMAL": "🟢 NORMAL", "OTC": "🟠 OTC"}
+START_TEMPLATE = "📈 *Trading Signal Bot* ({badge})\n\nSelect a trading pair:\n━━━━━━━━━━━━━━━━━"
+PAIR_TEMPLATE = "✅ *Selected Pair:* {pair}\n\nNow select a timeframe:\n━━━━━━━━━━━━━━━━━"
+GENERATING_TEMPLATE = "⏳ Generating signal for {pair} ({timeframe})..."
+SIGNAL_HEADER_TEMPLATE = "*Pair:* {pair} | *Timeframe:* {timeframe}"
+SIGNAL_BODY_TEMPLATE = "{header}\n*Signal:* {action}\n*Confidence:* {confidence}% {marker}\n\n*Analysis:*\n{reasoning}"
+LEVELS_TEMPLATE = "\n\n*Key Levels:*\nS: {support:.6f} | R: {resistance:.6f}"
+# prepended to signals pushed to /subscribe'd chats at candle close
+SUBSCRIPTION_HEADER = "🔔 *Candle closed*\n\n"
+
+NEW_SIGNAL_KEYBOARD = InlineKeyboardMarkup([[InlineKeyboardButton("🔄 New Signal", callback_data="restart")]])
+
+
+def confidence_marker(confidence: int) -> str:
+    """Traffic-light emoji for a confidence score"""
+    if confidence >= 75:
+        return "🟢"  # high confidence
+    if confidence >= 50:
+        return "🟡"  # moderate confidence
+    return "🔴"  # low confidence
+
+
+def pair_keyboard(pairs: Sequence[str]) -> InlineKeyboardMarkup:
+    """Two pair buttons per row"""
+    rows = []
+    for i in range(0, len(pairs), 2):
+        rows.append([InlineKeyboardButton(p, callback_data=f"pair_{p}") for p in pairs[i:i + 2]])
+    return InlineKeyboardMarkup(rows)
+
+
+def timeframe_keyboard(timeframes: Sequence[str]) -> InlineKeyboardMarkup:
+    """Three timeframe buttons per row"""
+    rows = []
+    for i in range(0, len(timeframes), 3):
+        rows.append([InlineKeyboardButton(tf, callback_data=f"tf_{tf}") for tf in timeframes[i:i + 3]])
+    return InlineKeyboardMarkup(rows)
+
+
+@dataclass(frozen=True)
+class ModeRender:
+    """Prebuilt keyboards and texts for one market mode"""
+    mode: str
+    pairs: Tuple[str, ...]
+    timeframes: Tuple[str, ...]
+    pair_set: FrozenSet[str]
+    timeframe_set: FrozenSet[str]
+    start_text: str
+    pair_keyboard: InlineKeyboardMarkup
+    timeframe_keyboard: InlineKeyboardMarkup
+    pair_texts: Dict[str, str]
+    generating_texts: Dict[Tuple[str, str], str]
+    signal_headers: Dict[Tuple[str, str], str]
+
+    @classmethod
+    def build(cls, mode: str, pairs: Sequence[str], timeframes: Sequence[str]) -> "ModeRender":
+        combos = [(p, tf) for p in pairs for tf in timeframes]
+        return cls(
+            mode=mode,
+            pairs=tuple(pairs),
+            timeframes=tuple(timeframes),
+            pair_set=frozenset(pairs),
+            timeframe_set=frozenset(timeframes),
+            start_text=START_TEMPLATE.format(badge=BADGES.get(mode, mode)),
+            pair_keyboard=pair_keyboard(pairs),
+            timeframe_keyboard=timeframe_keyboard(timeframes),
+            pair_texts={p: PAIR_TEMPLATE.format(pair=p) for p in pairs},
+            generating_texts={(p, tf): GENERATING_TEMPLATE.format(pair=p, timeframe=tf) for p, tf in combos},
+            signal_headers={(p, tf): SIGNAL_HEADER_TEMPLATE.format(pair=p, timeframe=tf) for p, tf in combos},
+        )
+
+    def generating_text(self, pair: str, timeframe: str) -> str:
+        text = self.generating_texts.get((pair, timeframe))
+        return text if text is not None else GENERATING_TEMPLATE.format(pair=pair, timeframe=timeframe)
+
+    def format_signal(self, signal) -> str:
+        """Render a SignalResult (or any object with the same attributes)"""
+        action = getattr(signal, "action", "UNKNOWN")
+        action = getattr(action, "value", action)
+        confidence = getattr(signal, "confidence", 0)
+        pair = getattr(signal, "pair", "N/A")
+        timeframe = getattr(signal, "timeframe", "N/A")
+        header = self.signal_headers.get((pair, timeframe))
+        if header is None:
+            header = SIGNAL_HEADER_TEMPLATE.format(pair=pair, timeframe=timeframe)
+        text = SIGNAL_BODY_TEMPLATE.format(
+            header=header,
+            action=action,
+            confidence=confidence,
+            marker=confidence_marker(confidence),
+            reasoning=getattr(signal, "reasoning", "No reasoning provided."),
+        )
+        support = getattr(signal, "support", None)
+        resistance = getattr(signal, "resistance", None)
+        if support is not None and resistance is not None:
+            try:
+                text += LEVELS_TEMPLATE.format(support=support, resistance=resistance)
+            except (TypeError, ValueError):
+                pass
+        return text
+
+
+class RenderCache:
+    """
+    One ModeRender per market mode with an atomically swapped active one.
+
+    Args:
+        modes: mode -> (pairs, timeframes)
+        active: Initially active mode
+    """
+
+    def __init__(self, modes: Dict[str, Tuple[List[str], List[str]]], active: str) -> None:
+        self._renders = {mode: ModeRender.build(mode, *spec) for mode, spec in modes.items()}
+        self.current: ModeRender = self._renders[active]
+        self.switches = 0
+
+    def get(self, mode: Optional[str] = None) -> ModeRender:
+        """The active render, or the one for ``mode``"""
+        return self.current if mode is None else self._renders[mode]
+
+    def activate(self, mode: str) -> ModeRender:
+        """Make ``mode`` the active render (a single reference swap)"""
+        render = self._renders[mode]
+        if render is not self.current:
+            self.current = render
+            self.switches += 1
+        return render
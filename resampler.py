@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Multi-Timeframe Resampler
+
+Keeps only the finest-granularity (5s) candles per pair and derives every
+other timeframe in VALID_TIMEFRAMES from them. Higher-timeframe bars are
+built incrementally as base candles arrive and written to the shared
+CandleStore registry, so ``get_market_data`` is called once per pair
+instead of once per (pair, timeframe).
+
+Bars are aligned to epoch multiples of the timeframe (1h bars start on
+the hour, UTC). The newest base candle may still be forming; revisions of
+it are folded into the derived bars exactly, without rescanning history.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from candle_store import CandleStoreRegistry, CandleView, candle_stores
+
+logger = logging.getLogger(__name__)
+
+# timeframe -> seconds, finest first
+TIMEFRAME_SECONDS: Dict[str, int] = {
+    "5s": 5,
+    "10s": 10,
+    "15s": 15,
+    "30s": 30,
+    "1m": 60,
+    "3m": 180,
+    "5m": 300,
+    "10m": 600,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+}
+
+BASE_TIMEFRAME = "5s"
+
+# (open, high, low, close)
+_OHLC = Tuple[float, float, float, float]
+
+
+def _combine(first: Optional[_OHLC], second: _OHLC) -> _OHLC:
+    """Merge two consecutive OHLC spans into one"""
+    if first is None:
+        return second
+    return (first[0], max(first[1], second[1]), min(first[2], second[2]), second[3])
+
+
+class _BarState:
+    """Aggregation state of the current bar of one derived timeframe"""
+    __slots__ = ("start", "committed")
+
+    def __init__(self) -> None:
+        self.start: Optional[float] = None
+        # OHLC of the closed base candles in the bar (excludes the forming one)
+        self.committed: Optional[_OHLC] = None
+
+
+class TimeframeResampler:
+    """
+    Builds derived timeframe bars from one base series per pair.
+
+    ``ingest`` accepts base-timeframe market data records; ``refresh``
+    fetches them through ``get_market_data`` at most once per base candle.
+    """
+
+    def __init__(
+        self,
+        stores: Optional[CandleStoreRegistry] = None,
+        base_timeframe: str = BASE_TIMEFRAME,
+        timeframes: Optional[List[str]] = None
+    ) -> None:
+        self.stores = stores if stores is not None else candle_stores
+        self.base_timeframe = base_timeframe
+        base_secs = TIMEFRAME_SECONDS[base_timeframe]
+        if timeframes is None:
+            timeframes = [tf for tf, secs in TIMEFRAME_SECONDS.items() if secs > base_secs]
+        for tf in timeframes:
+            if TIMEFRAME_SECONDS[tf] % base_secs:
+                raise ValueError(f"{tf} is not a multiple of {base_timeframe}")
+        self.timeframes = [(tf, TIMEFRAME_SECONDS[tf]) for tf in timeframes]
+        self._bars: Dict[Tuple[str, str], _BarState] = {}
+        self._forming: Dict[str, Tuple[float, _OHLC]] = {}
+        self._last_refresh: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def _lock(self, pair: str) -> threading.Lock:
+        lock = self._locks.get(pair)
+        if lock is None:
+            with self._registry_lock:
+                lock = self._locks.setdefault(pair, threading.Lock())
+        return lock
+
+    def _parse(self, rec: Dict) -> Optional[Tuple[float, _OHLC]]:
+        try:
+            return float(rec["timestamp"]), (
+                float(rec["open"]), float(rec["high"]), float(rec["low"]), float(rec["close"])
+            )
+        except Exception:
+            return None
+
+    def _emit(self, pair: str, ts: float, ohlc: _OHLC, revision: bool) -> None:
+        """Fold one base candle (new or revised) into every derived timeframe"""
+        forming = self._forming.get(pair)
+        for tf, secs in self.timeframes:
+            state = self._bars.get((pair, tf))
+            if state is None:
+                state = self._bars[(pair, tf)] = _BarState()
+            start = ts - ts % secs
+
+            if not revision and forming is not None and state.start is not None:
+                # the previous base candle is final now
+                if forming[0] - forming[0] % secs == state.start:
+                    state.committed = _combine(state.committed, forming[1])
+
+            store = self.stores.get(pair, tf)
+            with store.lock:
+                if state.start != start:
+                    state.start = start
+                    state.committed = None
+                    bar = ohlc
+                    last = store.last_timestamp
+                    if last is not None and start == last:
+                        store.update_last(start, *bar)
+                    elif last is None or start > last:
+                        store.append(start, *bar)
+                    continue
+                bar = _combine(state.committed, ohlc)
+                store.update_last(start, *bar)
+
+        self._forming[pair] = (ts, ohlc)
+
+    def ingest(self, pair: str, records: List[Dict]) -> int:
+        """
+        Ingest base-timeframe records for ``pair``.
+
+        Writes the base candles to their own store and updates every derived
+        timeframe. Returns the number of new base candles.
+        """
+        added = 0
+        base_store = self.stores.get(pair, self.base_timeframe)
+        with self._lock(pair):
+            for rec in records:
+                parsed = self._parse(rec)
+                if parsed is None:
+                    continue
+                ts, ohlc = parsed
+                forming = self._forming.get(pair)
+                if forming is None or ts > forming[0]:
+                    with base_store.lock:
+                        base_store.append(ts, *ohlc)
+                    self._emit(pair, ts, ohlc, revision=False)
+                    added += 1
+                elif ts == forming[0]:
+                    with base_store.lock:
+                        base_store.update_last(ts, *ohlc)
+                    self._emit(pair, ts, ohlc, revision=True)
+        return added
+
+    def load_history(self, pair: str, history: CandleView) -> int:
+        """
+        Replace ``pair``'s state with a base-candle history (oldest first).
+
+        Vectorized equivalent of ``ingest`` on an empty pair, for bulk
+        warm-up from archived candles: every store receives its newest
+        bars and the aggregation state continues from the last candle, so
+        live records can be ingested right after. Returns the candle count.
+        """
+        stamps = np.asarray(history.timestamp, dtype=np.float64)
+        if len(stamps) == 0:
+            return 0
+        opens, highs, lows, closes = history.open, history.high, history.low, history.close
+        last_ohlc = (float(opens[-1]), float(highs[-1]), float(lows[-1]), float(closes[-1]))
+        self.reset(pair)
+        with self._lock(pair):
+            base_store = self.stores.get(pair, self.base_timeframe)
+            with base_store.lock:
+                base_store.assign(stamps, opens, highs, lows, closes)
+            for tf, secs in self.timeframes:
+                starts = stamps - stamps % secs
+                first = np.flatnonzero(np.diff(starts, prepend=np.nan))
+                last = np.append(first[1:] - 1, len(stamps) - 1)
+                store = self.stores.get(pair, tf)
+                with store.lock:
+                    store.assign(starts[first], opens[first], np.maximum.reduceat(highs, first),
+                                 np.minimum.reduceat(lows, first), closes[last])
+                state = self._bars[(pair, tf)] = _BarState()
+                state.start = float(starts[-1])
+                begin = int(first[-1])
+                if begin < len(stamps) - 1:
+                    state.committed = (float(opens[begin]), float(np.max(highs[begin:-1])),
+                                       float(np.min(lows[begin:-1])), float(closes[-2]))
+            self._forming[pair] = (float(stamps[-1]), last_ohlc)
+        return len(stamps)
+
+    def refresh(self, pair: str, fetch, min_interval: Optional[float] = None) -> bool:
+        """
+        Fetch base candles for ``pair`` with ``fetch(pair, timeframe)`` and ingest them.
+
+        Fetches at most once per ``min_interval`` seconds (default: the base
+        timeframe). Returns True when the pair has timestamped base data.
+        """
+        if min_interval is None:
+            min_interval = TIMEFRAME_SECONDS[self.base_timeframe]
+        now = time.monotonic()
+        last = self._last_refresh.get(pair)
+        if last is not None and now - last < min_interval:
+            return pair in self._forming
+
+        self._last_refresh[pair] = now
+        records = fetch(pair, self.base_timeframe)
+        if not records or "timestamp" not in records[-1]:
+            return pair in self._forming
+        self.ingest(pair, records)
+        logger.debug("Resampled %s from %d base records", pair, len(records))
+        return pair in self._forming
+
+    def reset(self, pair: Optional[str] = None) -> None:
+        """Forget aggregation state for one pair, or for all pairs"""
+        with self._registry_lock:
+            pairs = [pair] if pair is not None else list(self._forming)
+            for p in pairs:
+                self._forming.pop(p, None)
+                self._last_refresh.pop(p, None)
+                for tf, _ in self.timeframes:
+                    self._bars.pop((p, tf), None)
+
+
+# shared resampler used by trading_logic
+resampler = TimeframeResampler()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Declarative Strategy Rules
+
+A strategy is an ordered table of Rules: the first rule whose conditions
+all hold decides the signal (action, confidence rule, reasoning template
+and entry time), and the last rule, with no conditions, is the default.
+Conditions are named predicates with two forms - a scalar one over a
+single indicator record and a vector one over whole indicator arrays -
+so one table drives both live signals and batch/backtest evaluation.
+
+compile_rules checks a table against its conditions and returns a
+CompiledRules:
+- ``decide`` walks a precomputed chain of (rule, scalar predicates) and
+  returns the first Rule whose predicates all hold
+- ``decide_arrays`` returns the matching rule index per row; conditions
+  are evaluated once each and the rules are folded into one uint8 array
+  with in-place ufuncs, so a batch costs a few passes over bytes per rule
+
+The strategy tables themselves live in trading_logic.py.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# rule indices are evaluated as uint8 in decide_arrays
+MAX_RULES = 255
+
+
+@dataclass(frozen=True)
+class Condition:
+    """
+    Named predicate with a scalar and a vector form.
+
+    Args:
+        scalar: (indicators, params) -> bool for one indicator record
+        vector: (values, masks, params) -> bool array, where ``values`` and
+            ``masks`` are the indicator arrays and threshold masks of a batch
+    """
+    scalar: Callable[[Any, Any], bool]
+    vector: Callable[[Dict[str, np.ndarray], Dict[str, np.ndarray], Any], np.ndarray]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One row of a strategy table.
+
+    Args:
+        action: signal action when the rule matches
+        when: names of the conditions that must all hold (empty = always)
+        reasoning: str.format template filled from the indicator record
+        entry_time: entry timing text shown with the signal
+        confidence: name of the confidence rule scoring the signal
+    """
+    action: Any
+    when: Tuple[str, ...] = ()
+    reasoning: str = ""
+    entry_time: str = ""
+    confidence: str = "score"
+
+
+class CompiledRules:
+    """
+    A validated strategy table with scalar and vector evaluators.
+
+    Args:
+        name: strategy name
+        rules: the table, first match wins; the last rule must have no conditions
+        conditions: condition name -> Condition
+        codes: optional action -> integer code map for ``codes``
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rules: Sequence[Rule],
+        conditions: Mapping[str, Condition],
+        codes: Optional[Mapping[Any, int]] = None,
+    ):
+        self.name = name
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        self.conditions = dict(conditions)
+        self.used = tuple(dict.fromkeys(c for rule in self.rules for c in rule.when))
+        self.codes = None if codes is None else np.array([codes[r.action] for r in self.rules], dtype=np.int8)
+        # conditional rules with their scalar predicates; the default comes last
+        self._chain: Tuple[Tuple[Rule, Tuple[Callable[[Any, Any], bool], ...]], ...] = tuple(
+            (rule, tuple(self.conditions[name].scalar for name in rule.when)) for rule in self.rules[:-1]
+        )
+        self._default = self.rules[-1]
+
+    def decide(self, indicators: Any, params: Any) -> Rule:
+        """The first rule whose conditions all hold for one indicator record"""
+        for rule, predicates in self._chain:
+            for predicate in predicates:
+                if not predicate(indicators, params):
+                    break
+            else:
+                return rule
+        return self._default
+
+    def decide_arrays(
+        self,
+        values: Dict[str, np.ndarray],
+        masks: Dict[str, np.ndarray],
+        params: Any,
+    ) -> np.ndarray:
+        """Index of the first matching rule per row (uint8)"""
+        evaluated = {name: np.asarray(self.conditions[name].vector(values, masks, params), dtype=bool)
+                     for name in self.used}
+        rows = len(next(iter(values.values())))
+        default = len(self.rules) - 1
+        # rule i writes weight default - i where it matches; the largest
+        # weight in a row is its first match (0 = no match = the default)
+        best = np.zeros(rows, dtype=np.uint8)
+        hit = np.empty(rows, dtype=bool)
+        weight = np.empty(rows, dtype=np.uint8)
+        for i, rule in enumerate(self.rules[:-1]):
+            np.copyto(hit, evaluated[rule.when[0]])
+            for name in rule.when[1:]:
+                np.logical_and(hit, evaluated[name], out=hit)
+            np.multiply(hit.view(np.uint8), np.uint8(default - i), out=weight)
+            np.maximum(best, weight, out=best)
+        return np.subtract(np.uint8(default), best, out=best)
+
+    def column(self, attribute: str) -> np.ndarray:
+        """One entry per rule, e.g. ``column("confidence")[decide_arrays(...)]``"""
+        return np.array([getattr(rule, attribute) for rule in self.rules])
+
+    def __repr__(self) -> str:
+        return f"<CompiledRules {self.name}: {len(self.rules)} rules>"
+
+
+def compile_rules(
+    name: str,
+    rules: Sequence[Rule],
+    conditions: Mapping[str, Condition],
+    confidence_rules: Collection[str] = ("score", "none"),
+    codes: Optional[Mapping[Any, int]] = None,
+) -> CompiledRules:
+    """Validate a strategy table and compile it; mistakes raise ValueError"""
+    if not rules or rules[-1].when:
+        raise ValueError(f"{name}: the last rule must be an unconditional default")
+    if len(rules) > MAX_RULES:
+        raise ValueError(f"{name}: at most {MAX_RULES} rules per strategy")
+    for i, rule in enumerate(rules):
+        if i < len(rules) - 1 and not rule.when:
+            raise ValueError(f"{name}: rule {i} has no conditions, so later rules never match")
+        unknown = [c for c in rule.when if c not in conditions]
+        if unknown:
+            raise ValueError(f"{name}: rule {i} uses unknown conditions: {', '.join(unknown)}")
+        if rule.confidence not in confidence_rules:
+            raise ValueError(f"{name}: rule {i} uses unknown confidence rule {rule.confidence!r}")
+        if codes is not None and rule.action not in codes:
+            raise ValueError(f"{name}: rule {i} has an action without a code: {rule.action!r}")
+    return CompiledRules(name, rules, conditions, codes)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Bounded User Session Store
+
+Replaces the unbounded ``user_sessions`` dict. Sessions are compact
+``__slots__`` records kept in least-recently-used order; a session is
+dropped after ``ttl`` seconds without activity or when the store grows
+past ``max_size`` (oldest first). A user whose session was dropped just
+gets the "Session expired. Use /start" path.
+
+With a persistence backend (see persistence.py) session changes are
+queued for write-behind, and a user missing from memory (after a
+restart or an LRU eviction) is reloaded on first access. Handlers use
+``aget`` / ``aget_or_start``, which run that database read in a worker
+thread so the event loop never waits on disk I/O. Reads queue the
+session again once its stored stamp is TOUCH_FRACTION of the TTL old,
+so the database keeps a last-seen time that the flush purge and the
+reload idle check go by, without a write per request.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from persistence import SQLitePersistence
+
+DEFAULT_MAX_SIZE = 100_000
+DEFAULT_TTL = 3600.0
+# a read re-persists the session when its stored last-seen stamp is this
+# fraction of the TTL old (bounds both the writes and the stamp's lag)
+TOUCH_FRACTION = 0.1
+
+
+class Session:
+    """Per-user flow state"""
+    __slots__ = ("pair", "timeframe", "last_seen", "saved_at")
+
+    def __init__(self, last_seen: float) -> None:
+        self.pair: Optional[str] = None
+        self.timeframe: Optional[str] = None
+        self.last_seen = last_seen
+        # store clock time of the last-seen stamp queued for persistence
+        self.saved_at = last_seen
+
+
+class SessionStore:
+    """
+    LRU map of user id -> Session with an idle TTL.
+
+    Args:
+        max_size: Maximum number of sessions before LRU eviction
+        ttl: Seconds of inactivity after which a session expires
+        clock: Monotonic time source (injectable for tests)
+        persistence: Optional write-behind backend for sessions
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+        persistence: Optional[SQLitePersistence] = None
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.persistence = persistence
+        # touched sessions move to the end, so oldest-idle is always first
+        self._sessions: "OrderedDict[int, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.reloaded = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, user_id: int) -> bool:
+        return self.get(user_id) is not None
+
+    def get(self, user_id: int) -> Optional[Session]:
+        """Return the user's live session (refreshing it), or None.
+
+        May read the database for a user missing from memory; on the event
+        loop use ``aget`` instead.
+        """
+        now = self.clock()
+        session, found = self._cached(user_id, now)
+        if found or self.persistence is None:
+            return session
+        return self._reload(user_id, now)
+
+    async def aget(self, user_id: int) -> Optional[Session]:
+        """``get`` for async handlers: a reload from the database runs in a worker thread"""
+        now = self.clock()
+        session, found = self._cached(user_id, now)
+        if found or self.persistence is None:
+            return session
+        return await asyncio.to_thread(self._reload, user_id, now)
+
+    def _cached(self, user_id: int, now: float) -> Tuple[Optional[Session], bool]:
+        """(session, found in memory); an expired session is found and dropped"""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return None, False
+            if now - session.last_seen >= self.ttl:
+                del self._sessions[user_id]
+                self.expirations += 1
+                if self.persistence is not None:
+                    self.persistence.delete_session(user_id)
+                return None, True
+            self._touch(user_id, session, now)
+            self._sessions.move_to_end(user_id)
+            return session, True
+
+    def _touch(self, user_id: int, session: Session, now: float) -> None:
+        """Mark the session seen; queue its last-seen stamp when the stored one is stale"""
+        session.last_seen = now
+        if self.persistence is not None and now - session.saved_at >= self.ttl * TOUCH_FRACTION:
+            session.saved_at = now
+            self.persistence.save_session(user_id, session.pair, session.timeframe)
+
+    def _reload(self, user_id: int, now: float) -> Optional[Session]:
+        row = self.persistence.load_session(user_id)
+        if row is None:
+            return None
+        pair, timeframe, last_seen = row
+        idle = self.persistence.clock() - last_seen
+        if idle >= self.ttl:
+            self.persistence.delete_session(user_id)
+            return None
+        session = Session(now)
+        # the stored stamp's age on our monotonic clock
+        session.saved_at = now - max(0.0, idle)
+        session.pair = pair
+        session.timeframe = timeframe
+        with self._lock:
+            self._touch(user_id, session, now)
+            self._insert(user_id, session, now)
+            self.reloaded += 1
+        return session
+
+    def start(self, user_id: int) -> Session:
+        """Begin a fresh session for the user (replacing any existing one)"""
+        now = self.clock()
+        session = Session(now)
+        with self._lock:
+            self._insert(user_id, session, now)
+        if self.persistence is not None:
+            self.persistence.save_session(user_id, None, None)
+        return session
+
+    def _insert(self, user_id: int, session: Session, now: float) -> None:
+        self._sessions[user_id] = session
+        self._sessions.move_to_end(user_id)
+        if len(self._sessions) > self.max_size:
+            self._purge_expired(now)
+        # evicted sessions stay persisted and can be reloaded later
+        while len(self._sessions) > self.max_size:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def changed(self, user_id: int) -> None:
+        """Queue the user's session for persistence after a field was set"""
+        if self.persistence is None:
+            return
+        session = self._sessions.get(user_id)
+        if session is not None:
+            session.saved_at = self.clock()
+            self.persistence.save_session(user_id, session.pair, session.timeframe)
+
+    def get_or_start(self, user_id: int) -> Session:
+        """Return the live session or begin a new one"""
+        return self.get(user_id) or self.start(user_id)
+
+    async def aget_or_start(self, user_id: int) -> Session:
+        """``get_or_start`` for async handlers (see ``aget``)"""
+        return await self.aget(user_id) or self.start(user_id)
+
+    def discard(self, user_id: int) -> None:
+        with self._lock:
+            self._sessions.pop(user_id, None)
+        if self.persistence is not None:
+            self.persistence.delete_session(user_id)
+
+    def _purge_expired(self, now: float) -> int:
+        removed = 0
+        while self._sessions:
+            user_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen < self.ttl:
+                break
+            del self._sessions[user_id]
+            removed += 1
+        self.expirations += removed
+        return removed
+
+    def purge_expired(self) -> int:
+        """Drop every idle session; returns how many were removed"""
+        with self._lock:
+            return self._purge_expired(self.clock())
+
+    def clear(self) -> None:
+        """Drop every session (counters are kept)"""
+        with self._lock:
+            self._sessions.clear()
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the store (map, keys and records).
+
+        Walks every session under the lock (~170 ms at 100k sessions), so
+        call it on demand, not from metrics or the event loop.
+        """
+        with self._lock:
+            total = sys.getsizeof(self._sessions)
+            for user_id, session in self._sessions.items():
+                total += sys.getsizeof(user_id) + sys.getsizeof(session)
+                total += sum(sys.getsizeof(v) for v in (session.pair, session.timeframe) if v is not None)
+        return total
+
+    def stats(self) -> Dict[str, float]:
+        """Size, limits and eviction/expiry/reload counters (O(1); see ``nbytes``)"""
+        return {
+            "size": len(self._sessions),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "reloaded": self.reloaded,
+        }
@@ -16,15 +16,17 @@ Usage:
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import os
 import sys
-from typing import Optional, Dict, List, Tuple
-import random
-from datetime import datetime
+import time
+from typing import Optional, Dict, List, Set, Tuple
+from datetime import datetime, timezone
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update
 from telegram.constants import ParseMode
+from telegram.request import HTTPXRequest
 from telegram.ext import (
     ApplicationBuilder,
     CallbackQueryHandler,
@@ -44,6 +46,23 @@ except Exception as e:
     print("FATAL: could not import trading_logic:", e)
     raise
 
+from executors import SignalExecutor
+from candle_archive import warm_from_archives
+from market_data import market_data_client
+from market_calendar import NORMAL, MarketCalendar
+from metrics import MetricsServer, metrics
+from outbound import OutboundScheduler, Priority
+from precompute import PrecomputeScheduler, SignalSnapshot
+from price_feed import PriceFeed
+from resampler import BASE_TIMEFRAME, resampler
+from render import NEW_SIGNAL_KEYBOARD, SUBSCRIPTION_HEADER, RenderCache
+from persistence import SQLitePersistence
+from session_store import SessionStore
+from signal_cache import SignalCache
+from single_flight import SingleFlight
+from subscriptions import SubscriptionRegistry, broadcast
+from webhook import PerUserUpdateProcessor, TimedUpdateQueue, WebhookConfig, serve_webhook
+
 # Logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -73,8 +92,8 @@ NORMAL_PAIRS = [
     # note: EUR/JPY listed twice in original requirements but deduped here
 ]
 
-# OTC pairs simply append " OTC" to each normal pair when active
-# (list generated dynamically)
+# OTC pairs simply append " OTC" to each forex pair (BTCUSD stays unchanged)
+OTC_PAIRS = [p if "/" not in p else p + " OTC" for p in NORMAL_PAIRS]
 
 # timeframes available depending on mode
 TIMEFRAMES_NORMAL = ["1m", "3m", "5m", "10m", "15m", "30m", "1h"]  # 15m or higher allowed
@@ -83,16 +102,103 @@ TIMEFRAMES_OTC = ["5s", "10s", "15s", "30s", "1m", "3m", "5m"]
 # the union is used by validation later
 VALID_TIMEFRAMES = set(TIMEFRAMES_NORMAL + TIMEFRAMES_OTC + ["5s", "10s", "15s", "30s"])  # include all possible
 
+# case-insensitive lookup of every pair either mode offers (used by /subscribe)
+KNOWN_PAIRS = {p.upper(): p for p in NORMAL_PAIRS + OTC_PAIRS}
+
 # global state for market mode (NORMAL or OTC)
 MARKET_MODE: Optional[str] = None
 
 
-# User session state
-user_sessions: Dict = {}
+# Optional SQLite persistence for sessions and market mode (SESSION_DB=path)
+SESSION_DB = os.getenv("SESSION_DB")
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "5"))
+session_db: Optional[SQLitePersistence] = SQLitePersistence(SESSION_DB) if SESSION_DB else None
+
+# User session state: bounded LRU with an idle TTL
+user_sessions = SessionStore(
+    max_size=int(os.getenv("SESSION_MAX_SIZE", "100000")),
+    ttl=float(os.getenv("SESSION_TTL", "3600")),
+    persistence=session_db,
+)
+
+# Chats subscribed to candle-close signals, indexed by (pair, timeframe)
+subscriptions = SubscriptionRegistry(
+    max_per_chat=int(os.getenv("SUBSCRIPTIONS_PER_CHAT", "20")),
+    persistence=session_db,
+)
+# Every Bot API call goes through one scheduler: token buckets, priorities, RetryAfter
+outbound = OutboundScheduler.from_env()
+# fan-outs still being delivered (kept referenced until done)
+_broadcasts: Set[asyncio.Future] = set()
+
+# Signals shared by every user asking for the same pair/timeframe within a candle
+signal_cache = SignalCache(max_size=int(os.getenv("SIGNAL_CACHE_SIZE", "1024")))
+
+# Concurrent requests for the same pair/timeframe share one computation
+signal_flights = SingleFlight()
+
+# Backend for CPU-bound signal generation (SIGNAL_EXECUTOR=thread|process|inline)
+signal_executor = SignalExecutor.from_env()
+
+# Signals precomputed at every candle close for all active pairs/timeframes
+signal_snapshot = SignalSnapshot()
+PRECOMPUTE_SIGNALS = os.getenv("PRECOMPUTE_SIGNALS", "1") != "0"
+
+# Directory of base-timeframe candle archives to warm the resampler from (see candle_archive.py)
+CANDLE_ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR")
 
-# Simulated market prices
-random.seed(42)
+# Prometheus-format /metrics endpoint (disabled unless METRICS_PORT is set)
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+metrics_server: Optional[MetricsServer] = None
+
+# Updates handled at once across users; each user's updates always run in
+# order, one at a time (see PerUserUpdateProcessor)
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "32"))
+
+HANDLER_LATENCY = metrics.histogram(
+    "bot_handler_latency_seconds", "Update handler duration", ["handler"]
+)
+HANDLER_ERRORS = metrics.counter(
+    "bot_handler_errors_total", "Update handlers that raised", ["handler"]
+)
+SIGNAL_REQUESTS = metrics.counter(
+    "bot_signal_requests_total", "Signal lookups by where the signal came from", ["source"]
+)
+TELEGRAM_API_LATENCY = metrics.histogram(
+    "telegram_api_latency_seconds", "Bot API HTTP request duration", ["method"]
+)
+TELEGRAM_API_ERRORS = metrics.counter(
+    "telegram_api_errors_total", "Failed Bot API requests by status (or 'network')", ["method", "status"]
+)
+for _stat in ("hits", "misses", "evictions", "size"):
+    metrics.gauge(f"signal_cache_{_stat}", f"Signal cache {_stat}").set_function(
+        lambda stat=_stat: signal_cache.stats()[stat]
+    )
+metrics.gauge("signal_flights_in_flight", "Signal computations currently running").set_function(
+    lambda: len(signal_flights)
+)
+metrics.gauge("signal_flights_coalesced", "Requests that joined a running computation").set_function(
+    lambda: signal_flights.stats()["coalesced"]
+)
+metrics.gauge("signal_snapshot_size", "Precomputed signals in the snapshot").set_function(
+    lambda: len(signal_snapshot)
+)
+metrics.gauge("bot_subscriptions", "Active candle-close subscriptions").set_function(
+    lambda: len(subscriptions)
+)
+metrics.gauge("bot_outbound_pending", "Outbound Bot API calls waiting in the scheduler").set_function(
+    lambda: outbound.pending
+)
+metrics.gauge("user_sessions_size", "User session store size").set_function(
+    lambda: len(user_sessions)
+)
+for _stat in ("evictions", "expirations"):
+    metrics.gauge(f"user_sessions_{_stat}", f"User session store {_stat}").set_function(
+        lambda stat=_stat: getattr(user_sessions, stat)
+    )
 
+# Reference prices (starting points of the simulated price feed)
 MARKET_PRICES = {
     # normal pairs (arbitrary sample prices)
     "BTCUSD": 30000.0,
@@ -115,17 +221,26 @@ MARKET_PRICES = {
 for p, price in list(MARKET_PRICES.items()):
     if "/" in p:
         MARKET_PRICES[p + " OTC"] = price
- 
+
+# Latest price per pair, kept by one background task (PRICE_FEED=sim|replay|socket)
+price_feed = PriceFeed.from_env(MARKET_PRICES)
+metrics.gauge("price_feed_age_seconds", "Seconds since the last price feed tick").set_function(
+    lambda: price_feed.age
+)
+
+
+# Trading sessions (timezone, hours, weekdays, holidays); see market_calendar.py
+market_calendar = MarketCalendar.from_env()
 
 
 def is_market_hours() -> bool:
-    """Return True if current local time is within normal market hours.
+    """Return True if the market session calendar is in a trading session.
 
-    Normal hours are 07:00 (inclusive) to 17:00 (exclusive) local server time.
-    Outside that window the bot will run in OTC mode.
+    Defaults to 07:00 (inclusive) to 17:00 (exclusive) UTC, Monday to Friday.
+    Outside sessions the bot runs in OTC mode. Answered from a cached value
+    that only changes at session boundaries.
     """
-    now = datetime.now()
-    return 7 <= now.hour < 17
+    return market_calendar.current_mode() == NORMAL
 
 
 def get_active_pairs() -> Tuple[List[str], str]:
@@ -136,9 +251,7 @@ def get_active_pairs() -> Tuple[List[str], str]:
     if is_market_hours():
         return NORMAL_PAIRS, "NORMAL"
     else:
-        # append OTC suffix to forex pairs only (leave BTCUSD unchanged)
-        otc_pairs = [p if "/" not in p else p + " OTC" for p in NORMAL_PAIRS]
-        return otc_pairs, "OTC"
+        return OTC_PAIRS, "OTC"
 
 
 def get_active_timeframes() -> List[str]:
@@ -147,71 +260,59 @@ def get_active_timeframes() -> List[str]:
 
 
 
+# Keyboards and texts prebuilt per mode; market_mode_job swaps the active set
+render_cache = RenderCache(
+    {"NORMAL": (NORMAL_PAIRS, TIMEFRAMES_NORMAL), "OTC": (OTC_PAIRS, TIMEFRAMES_OTC)},
+    active="NORMAL" if is_market_hours() else "OTC",
+)
+
+
 def get_current_price(pair: str) -> float:
-    """Get current price with slight randomness for demo."""
-    base = MARKET_PRICES.get(pair, 1.0)
-    change = random.uniform(-0.005, 0.005)
-    return base * (1 + change)
+    """Latest price of ``pair`` from the shared price feed (no I/O)."""
+    return price_feed.price(pair, MARKET_PRICES.get(pair, 1.0))
 
 
-def format_signal_message(signal) -> str:
-    """Format signal with detailed indicator info."""
-    action = getattr(signal, "action", "UNKNOWN")
-    if hasattr(action, "value"):
-        action = action.value
-    
-    confidence = getattr(signal, "confidence", 0)
-    reasoning = getattr(signal, "reasoning", "No reasoning provided.")
-    support = getattr(signal, "support", None)
-    resistance = getattr(signal, "resistance", None)
-    pair = getattr(signal, "pair", "N/A")
-    timeframe = getattr(signal, "timeframe", "N/A")
-
-    # add emoji marker based on confidence
-    if confidence >= 75:
-        conf_marker = "🟢"  # high confidence
-    elif confidence >= 50:
-        conf_marker = "🟡"  # moderate confidence
-    else:
-        conf_marker = "🔴"  # low confidence
+async def get_signal(pair: str, timeframe: str, current_price: float):
+    """Return the signal for pair/timeframe, computing it at most once per candle.
 
-    lines = [
-        f"*Pair:* {pair} | *Timeframe:* {timeframe}",
-        f"*Signal:* {action}",
-        f"*Confidence:* {confidence}% {conf_marker}",
-        "",
-        f"*Analysis:*\n{reasoning}"
-    ]
+    Served from the precomputed snapshot or the candle cache when possible;
+    otherwise concurrent callers share a single computation on the signal executor.
+    """
+    signal = signal_snapshot.get(pair, timeframe)
+    if signal is not None:
+        SIGNAL_REQUESTS.labels(source="snapshot").inc()
+        return signal
+    signal = signal_cache.get(pair, timeframe)
+    if signal is not None:
+        SIGNAL_REQUESTS.labels(source="cache").inc()
+        return signal
+    SIGNAL_REQUESTS.labels(source="computed").inc()
+
+    async def compute():
+        signal = await signal_executor.run(generate_trading_signal, pair, timeframe, current_price)
+        # invalid/error results carry entry_time "N/A" and are not worth pinning for a candle
+        if signal.entry_time != "N/A":
+            signal_cache.put(pair, timeframe, signal)
+        return signal
+
+    return await signal_flights.do((pair, timeframe), compute)
 
-    if support is not None and resistance is not None:
-        try:
-            lines.append(f"\n*Key Levels:*\nS: {support:.6f} | R: {resistance:.6f}")
-        except Exception:
-            pass
 
-    return "\n".join(lines)
+def format_signal_message(signal) -> str:
+    """Format signal with detailed indicator info (precompiled templates)."""
+    return render_cache.current.format_signal(signal)
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show pair selection menu based on current market mode."""
     user_id = update.effective_user.id
-    user_sessions[user_id] = {}
-    
-    active_pairs, mode = get_active_pairs()
-    badge = "🟢 NORMAL" if mode == "NORMAL" else "🟠 OTC"
-
-    keyboard = []
-    for i in range(0, len(active_pairs), 2):
-        row = [InlineKeyboardButton(active_pairs[i], callback_data=f"pair_{active_pairs[i]}")]
-        if i + 1 < len(active_pairs):
-            row.append(InlineKeyboardButton(active_pairs[i+1], callback_data=f"pair_{active_pairs[i+1]}"))
-        keyboard.append(row)
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    user_sessions.start(user_id)
+    render = render_cache.current
     
-    await update.message.reply_text(
-        f"📈 *Trading Signal Bot* ({badge})\n\nSelect a trading pair:\n━━━━━━━━━━━━━━━━━",
-        reply_markup=reply_markup,
+    # effective_message: also reached from the "New Signal" button (no update.message)
+    await update.effective_message.reply_text(
+        render.start_text,
+        reply_markup=render.pair_keyboard,
         parse_mode=ParseMode.MARKDOWN
     )
 
@@ -224,35 +325,23 @@ async def pair_selection(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     user_id = update.effective_user.id
     pair = query.data.replace("pair_", "")
 
-    # re-fetch active pairs in case mode changed while user was interacting
-    active_pairs, mode = get_active_pairs()
-    if pair not in active_pairs:
+    # re-check active pairs in case mode changed while user was interacting
+    render = render_cache.current
+    if pair not in render.pair_set:
         await query.edit_message_text(
             "⚠️ Selected pair is no longer available for the current market mode. Please use /start to refresh.",
             parse_mode=ParseMode.MARKDOWN
         )
         return
 
-    if user_id not in user_sessions:
-        user_sessions[user_id] = {}
-    user_sessions[user_id]["pair"] = pair
+    # a user missing from memory is reloaded off the event loop
+    (await user_sessions.aget_or_start(user_id)).pair = pair
+    user_sessions.changed(user_id)
     
     # Show timeframe buttons for current mode
-    tfs = get_active_timeframes()
-    keyboard = []
-    for i in range(0, len(tfs), 3):
-        row = []
-        for j in range(3):
-            if i + j < len(tfs):
-                tf = tfs[i + j]
-                row.append(InlineKeyboardButton(tf, callback_data=f"tf_{tf}"))
-        keyboard.append(row)
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     await query.edit_message_text(
-        f"✅ *Selected Pair:* {pair}\n\nNow select a timeframe:\n━━━━━━━━━━━━━━━━━",
-        reply_markup=reply_markup,
+        render.pair_texts[pair],
+        reply_markup=render.timeframe_keyboard,
         parse_mode=ParseMode.MARKDOWN
     )
 
@@ -263,17 +352,19 @@ async def timeframe_selection(update: Update, context: ContextTypes.DEFAULT_TYPE
     await query.answer()
     
     user_id = update.effective_user.id
-    if user_id not in user_sessions or "pair" not in user_sessions[user_id]:
+    session = await user_sessions.aget(user_id)
+    if session is None or session.pair is None:
         await query.edit_message_text("Session expired. Use /start to begin.")
         return
     
     timeframe = query.data.replace("tf_", "")
-    pair = user_sessions[user_id]["pair"]
+    pair = session.pair
+    session.timeframe = timeframe
+    user_sessions.changed(user_id)
 
     # validate that pair/timeframe still valid for current mode
-    active_pairs, mode = get_active_pairs()
-    active_tfs = get_active_timeframes()
-    if pair not in active_pairs or timeframe not in active_tfs:
+    render = render_cache.current
+    if pair not in render.pair_set or timeframe not in render.timeframe_set:
         await query.edit_message_text(
             "⚠️ Market mode changed while you were selecting. Please /start again to get updated pairs/timeframes.",
             parse_mode=ParseMode.MARKDOWN
@@ -283,23 +374,20 @@ async def timeframe_selection(update: Update, context: ContextTypes.DEFAULT_TYPE
     current_price = get_current_price(pair)
     
     await query.edit_message_text(
-        f"⏳ Generating signal for {pair} ({timeframe})...",
+        render.generating_text(pair, timeframe),
         parse_mode=ParseMode.MARKDOWN
     )
     
     try:
-        signal = await asyncio.to_thread(generate_trading_signal, pair, timeframe, current_price)
-        message = format_signal_message(signal)
+        signal = await get_signal(pair, timeframe, current_price)
+        message = render.format_signal(signal)
     except Exception as e:
         logger.exception("Error generating signal")
         message = f"❌ Error: {e}"
     
-    keyboard = [[InlineKeyboardButton("🔄 New Signal", callback_data="restart")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     await query.edit_message_text(
         message,
-        reply_markup=reply_markup,
+        reply_markup=NEW_SIGNAL_KEYBOARD,
         parse_mode=ParseMode.MARKDOWN
     )
 
@@ -311,11 +399,98 @@ async def restart_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     await start(update, context)
 
 
+def _parse_subscription(args: List[str]) -> Optional[Tuple[str, str]]:
+    """(pair, timeframe) from command arguments like ``EUR/USD OTC 5m``, or None"""
+    if len(args) < 2:
+        return None
+    pair = KNOWN_PAIRS.get(" ".join(args[:-1]).upper())
+    timeframe = args[-1].lower()
+    if pair is None or timeframe not in VALID_TIMEFRAMES:
+        return None
+    return pair, timeframe
+
+
+async def subscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Subscribe the chat to a signal at every candle close: /subscribe PAIR TF."""
+    chat_id = update.effective_chat.id
+    if not context.args:
+        current = "\n".join(f"• {p} {tf}" for p, tf in subscriptions.of_chat(chat_id)) or "none"
+        await update.effective_message.reply_text(
+            f"Usage: /subscribe PAIR TF (e.g. /subscribe EUR/USD 5m)\n\nYour subscriptions:\n{current}"
+        )
+        return
+    parsed = _parse_subscription(context.args)
+    if parsed is None:
+        await update.effective_message.reply_text(
+            "⚠️ Unknown pair or timeframe. Example: /subscribe EUR/USD 5m"
+        )
+        return
+    pair, timeframe = parsed
+    try:
+        added = subscriptions.subscribe(chat_id, pair, timeframe)
+    except ValueError as e:
+        await update.effective_message.reply_text(f"⚠️ Cannot subscribe: {e}.")
+        return
+    if added:
+        text = f"🔔 Subscribed to {pair} {timeframe}. A signal is sent at every candle close while the pair is active."
+    else:
+        text = f"Already subscribed to {pair} {timeframe}."
+    await update.effective_message.reply_text(text)
+
+
+async def unsubscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Remove one subscription (/unsubscribe PAIR TF) or all of them (/unsubscribe)."""
+    chat_id = update.effective_chat.id
+    if not context.args:
+        removed = subscriptions.unsubscribe(chat_id)
+        await update.effective_message.reply_text(f"🔕 Removed {removed} subscription(s).")
+        return
+    parsed = _parse_subscription(context.args)
+    removed = subscriptions.unsubscribe(chat_id, *parsed) if parsed else 0
+    if removed:
+        await update.effective_message.reply_text(f"🔕 Unsubscribed from {parsed[0]} {parsed[1]}.")
+    else:
+        await update.effective_message.reply_text("No such subscription. Send /subscribe to list yours.")
+
+
+async def broadcast_candle_close(bot, signals: Dict[Tuple[str, str], object]) -> Optional[asyncio.Future]:
+    """Fan each just-closed candle's signal out to the chats subscribed to it.
+
+    Delivery runs in the background at broadcast priority, so the precompute
+    job is not held up; returns the delivery future (None if nobody is subscribed).
+    """
+    if not len(subscriptions):
+        return None
+    render = render_cache.current
+    deliveries = []
+    queued = 0
+    for (pair, timeframe), signal in signals.items():
+        chats = subscriptions.subscribers(pair, timeframe)
+        if not chats:
+            continue
+        # formatted once, shared by every subscriber
+        text = SUBSCRIPTION_HEADER + render.format_signal(signal)
+        deliveries.append(broadcast(
+            bot.send_message, chats, text, on_blocked=subscriptions.unsubscribe,
+            parse_mode=ParseMode.MARKDOWN, rate_limit_args=Priority.BROADCAST,
+        ))
+        queued += len(chats)
+    if not deliveries:
+        return None
+    logger.info("Broadcasting %d subscription messages", queued)
+    future = asyncio.gather(*deliveries)
+    _broadcasts.add(future)
+    future.add_done_callback(_broadcasts.discard)
+    return future
+
+
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show help."""
     await update.message.reply_text(
         "*Commands:*\n"
         "/start - Begin signal generation\n"
+        "/subscribe PAIR TF - Get a signal at every candle close\n"
+        "/unsubscribe [PAIR TF] - Stop one or all subscriptions\n"
         "/help - Show this message\n\n"
         "Use inline buttons to select pairs and timeframes.",
         parse_mode=ParseMode.MARKDOWN
@@ -332,34 +507,199 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
         logger.exception("Failed to send error message")
 
 
-def build_application(token: str):
-    """Build and configure the Telegram bot application."""
-    app = ApplicationBuilder().token(token).build()
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that records Bot API latency and errors per method."""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        started = time.perf_counter()
+        try:
+            status, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception:
+            TELEGRAM_API_ERRORS.labels(method=api_method, status="network").inc()
+            raise
+        finally:
+            TELEGRAM_API_LATENCY.labels(method=api_method).observe(time.perf_counter() - started)
+        if status >= 400:
+            TELEGRAM_API_ERRORS.labels(method=api_method, status=str(status)).inc()
+        return status, payload
+
+
+def _instrumented(callback):
+    """Wrap a handler callback to record its latency and errors."""
+    name = callback.__name__
+
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        started = time.perf_counter()
+        queue = context.application.update_queue
+        if isinstance(queue, TimedUpdateQueue):
+            queue.handler_started(update)
+        try:
+            return await callback(update, context)
+        except Exception:
+            HANDLER_ERRORS.labels(handler=name).inc()
+            raise
+        finally:
+            HANDLER_LATENCY.labels(handler=name).observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+async def _post_init(app) -> None:
+    """Start the metrics endpoint and price feed, load archived candles and warm the signal executor before updates are processed."""
+    global metrics_server
+    if METRICS_PORT and metrics_server is None:
+        metrics_server = MetricsServer(metrics, int(METRICS_PORT), METRICS_HOST)
+        metrics_server.start()
+    price_feed.start()
+    if CANDLE_ARCHIVE_DIR:
+        # in-process stores only: process-backend workers keep their own
+        loaded = await asyncio.to_thread(warm_from_archives, CANDLE_ARCHIVE_DIR, KNOWN_PAIRS.values(), resampler)
+        logger.info("Loaded archived candles for %d pairs from %s", len(loaded), CANDLE_ARCHIVE_DIR)
+    await asyncio.to_thread(signal_executor.start)
+
+
+async def _post_shutdown(app) -> None:
+    """Stop the price feed, signal executor and metrics endpoint, logging final latency stats."""
+    global metrics_server
+    logger.info("Signal executor stats: %s", signal_executor.stats())
+    await price_feed.stop()
+    logger.info("Outbound scheduler stats: %s", outbound.stats())
+    await asyncio.to_thread(signal_executor.shutdown)
+    if market_data_client is not None:
+        logger.info("Market data stats: %s", market_data_client.stats())
+        await asyncio.to_thread(market_data_client.close)
+    if session_db is not None:
+        # write out everything still queued before the worker exits
+        await asyncio.to_thread(session_db.close)
+    if metrics_server is not None:
+        metrics_server.stop()
+        metrics_server = None
+
+
+async def _prefetch_market_data(pairs: List[str]) -> None:
+    """One batched base-timeframe fetch for every pair before a precompute run"""
+    await market_data_client.prefetch(pairs, BASE_TIMEFRAME)
+
+
+def build_application(token: str, base_url: Optional[str] = None):
+    """Build and configure the Telegram bot application.
+
+    ``base_url`` points the bot at another Bot API server (e.g. the fake
+    one used by loadtest.py) instead of api.telegram.org.
+    """
+    builder = (
+        ApplicationBuilder()
+        .token(token)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .rate_limiter(outbound)
+        .update_queue(TimedUpdateQueue())
+        .concurrent_updates(PerUserUpdateProcessor(CONCURRENT_UPDATES))
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    app = builder.build()
     
     # initialize market mode state
     global MARKET_MODE
     MARKET_MODE = "NORMAL" if is_market_hours() else "OTC"
+    render_cache.activate(MARKET_MODE)
     logger.info("Initial market mode: %s", MARKET_MODE)
+    if session_db is not None:
+        previous = session_db.get_state("market_mode")
+        if previous and previous != MARKET_MODE:
+            logger.info("Market mode switched from %s to %s while offline", previous, MARKET_MODE)
+        session_db.set_state("market_mode", MARKET_MODE)
+
+    # precompute signals for the active pairs/timeframes at every candle close
+    precompute = PrecomputeScheduler(
+        signal_snapshot,
+        active_pairs=lambda: get_active_pairs()[0],
+        active_timeframes=get_active_timeframes,
+        price_for=get_current_price,
+        executor=signal_executor,
+        prefetch=_prefetch_market_data if market_data_client is not None else None,
+        on_candle_close=functools.partial(broadcast_candle_close, app.bot),
+    )
+    if PRECOMPUTE_SIGNALS:
+        precompute.schedule(app.job_queue)
+    else:
+        logger.warning("PRECOMPUTE_SIGNALS=0: subscriptions will not receive candle-close signals")
+
+    loaded = subscriptions.load()
+    if loaded:
+        logger.info("Restored %d subscriptions", loaded)
+
+    # one timer at the next session boundary (re-armed after every switch)
+    def schedule_mode_switch(job_queue) -> None:
+        boundary = market_calendar.valid_until
+        if boundary == float("inf"):
+            logger.warning("No upcoming market session boundary; mode stays %s", MARKET_MODE)
+            return
+        job_queue.run_once(
+            market_mode_job,
+            when=datetime.fromtimestamp(boundary, timezone.utc),
+            data=boundary,
+            name="market_mode_switch",
+        )
+        logger.info(
+            "Next market mode check at %s", datetime.fromtimestamp(boundary, timezone.utc).isoformat()
+        )
 
-    # schedule periodic check to update mode and log switches
-    def market_mode_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    async def market_mode_job(context: ContextTypes.DEFAULT_TYPE) -> None:
         global MARKET_MODE
-        new_mode = "NORMAL" if is_market_hours() else "OTC"
+        # the job may fire a hair early; evaluate the boundary it was scheduled for
+        market_calendar.refresh(max(time.time(), context.job.data))
+        new_mode = market_calendar.current_mode()
         if new_mode != MARKET_MODE:
             MARKET_MODE = new_mode
+            render_cache.activate(MARKET_MODE)
             logger.info("Market mode switched to %s", MARKET_MODE)
+            if session_db is not None:
+                session_db.set_state("market_mode", MARKET_MODE)
+            if PRECOMPUTE_SIGNALS:
+                # new pair/timeframe set and possibly a different candle tick
+                precompute.schedule(context.job_queue)
+        schedule_mode_switch(context.job_queue)
 
-    # first run after a few seconds to catch startup boundary
-    app.job_queue.run_repeating(market_mode_job, interval=30, first=5)
+    schedule_mode_switch(app.job_queue)
+
+    # periodic executor latency report for comparing backends
+    async def executor_stats_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+        logger.info("Signal executor stats: %s", signal_executor.stats())
+
+    app.job_queue.run_repeating(executor_stats_job, interval=300, first=300)
+
+    # drop idle sessions so memory follows active users, not all users ever seen
+    async def session_purge_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+        removed = user_sessions.purge_expired()
+        if removed:
+            logger.info("Expired %d idle sessions; store: %s", removed, user_sessions.stats())
+
+    app.job_queue.run_repeating(session_purge_job, interval=60, first=60)
+
+    # write-behind: batch session changes to SQLite off the event loop
+    if session_db is not None:
+        async def session_flush_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+            await asyncio.to_thread(session_db.flush, user_sessions.ttl)
+
+        app.job_queue.run_repeating(
+            session_flush_job, interval=SESSION_FLUSH_INTERVAL, first=SESSION_FLUSH_INTERVAL
+        )
 
     # Commands
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("help", help_command))
+    app.add_handler(CommandHandler("start", _instrumented(start)))
+    app.add_handler(CommandHandler("help", _instrumented(help_command)))
+    app.add_handler(CommandHandler("subscribe", _instrumented(subscribe_command)))
+    app.add_handler(CommandHandler("unsubscribe", _instrumented(unsubscribe_command)))
     
     # Callback handlers for interactive buttons
-    app.add_handler(CallbackQueryHandler(pair_selection, pattern="^pair_"))
-    app.add_handler(CallbackQueryHandler(timeframe_selection, pattern="^tf_"))
-    app.add_handler(CallbackQueryHandler(restart_handler, pattern="^restart$"))
+    app.add_handler(CallbackQueryHandler(_instrumented(pair_selection), pattern="^pair_"))
+    app.add_handler(CallbackQueryHandler(_instrumented(timeframe_selection), pattern="^tf_"))
+    app.add_handler(CallbackQueryHandler(_instrumented(restart_handler), pattern="^restart$"))
     
     # Error handler
     app.add_error_handler(error_handler)
@@ -377,6 +717,20 @@ def main() -> None:
     logger.info("Starting Interactive Trading Signal Bot")
     app = build_application(token)
 
+    # webhook mode when WEBHOOK_URL is set; polling otherwise or if it fails
+    webhook = WebhookConfig.from_env()
+    if webhook is not None:
+        try:
+            logger.info("Bot is now running in webhook mode...")
+            asyncio.run(serve_webhook(app, webhook))
+            return
+        except KeyboardInterrupt:
+            logger.info("Bot stopped by user")
+            return
+        except Exception:
+            logger.exception("Webhook mode failed; falling back to polling")
+            asyncio.set_event_loop(asyncio.new_event_loop())
+
     # let operator know when the polling loop has started
     logger.info("Bot is now running and polling...")
     try:
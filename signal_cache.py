@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Candle-Aligned Signal Cache
+
+Stores SignalResults keyed by (pair, timeframe, candle-open timestamp).
+Every user who asks for the same pair and timeframe inside one candle
+gets the same signal; the entry stops matching exactly when the candle
+closes because the next request maps to a new candle-open key.
+
+Only ``entry_instruction`` depends on the wall clock, so it is recomputed
+on every hit. The cached ``current_price`` is the price seen by the
+request that computed the signal.
+"""
+
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from resampler import TIMEFRAME_SECONDS
+from trading_logic import SignalResult, determine_entry_instruction
+
+DEFAULT_MAX_SIZE = 1024
+
+
+def candle_open(timeframe: str, now: float) -> float:
+    """Open timestamp of the candle containing ``now`` (epoch-aligned)"""
+    secs = TIMEFRAME_SECONDS[timeframe]
+    return now - now % secs
+
+
+class SignalCache:
+    """
+    LRU cache of SignalResults that expire at the next candle close.
+
+    Args:
+        max_size: Maximum number of entries before LRU eviction
+        clock: Time source returning epoch seconds (injectable for tests)
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, clock: Callable[[], float] = time.time) -> None:
+        self.max_size = max_size
+        self.clock = clock
+        # key -> (expires_at, signal)
+        self._entries: "OrderedDict[Tuple[str, str, float], Tuple[float, SignalResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, pair: str, timeframe: str) -> Optional[SignalResult]:
+        """Return the signal for the current candle, or None on a miss"""
+        if timeframe not in TIMEFRAME_SECONDS:
+            self.misses += 1
+            return None
+        now = self.clock()
+        key = (pair, timeframe, candle_open(timeframe, now))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry[0]:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            signal = entry[1]
+        return dataclasses.replace(signal, entry_instruction=determine_entry_instruction(timeframe))
+
+    def put(self, pair: str, timeframe: str, signal: SignalResult) -> None:
+        """Store a signal for the candle that is open right now"""
+        if timeframe not in TIMEFRAME_SECONDS:
+            return
+        now = self.clock()
+        opened = candle_open(timeframe, now)
+        expires_at = opened + TIMEFRAME_SECONDS[timeframe]
+        with self._lock:
+            self._entries[(pair, timeframe, opened)] = (expires_at, signal)
+            self._entries.move_to_end((pair, timeframe, opened))
+            if len(self._entries) > self.max_size:
+                self._purge_expired(now)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [key for key, (expires_at, _) in self._entries.items() if now >= expires_at]
+        for key in expired:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
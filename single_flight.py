@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Request Coalescing
+
+When many coroutines ask for the same key at once, only the first one
+starts the computation; the rest await the same task. The computation
+runs as its own task, so a caller that is cancelled (e.g. a handler
+timing out) does not cancel it for everyone else.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent async computations that share a key"""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.started = 0      # computations actually run
+        self.coalesced = 0    # callers that joined an in-flight computation
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the result of ``fn()`` for ``key``.
+
+        If a computation for ``key`` is already running, wait for it instead
+        of starting another one. Exceptions are re-raised to every waiter.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.started += 1
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Started/coalesced counters and in-flight count"""
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Signal Subscriptions and Rate-Limited Fan-Out
+
+``/subscribe PAIR TF`` registers a chat for a push at every candle close
+of that pair and timeframe. SubscriptionRegistry indexes chats by
+(pair, timeframe), so a candle-close dispatch only touches the chats
+subscribed to the signals that were just computed, and each signal is
+computed (by precompute.py) and formatted once however many chats get it.
+
+``broadcast`` fans a message out through the bot's outbound scheduler
+(outbound.py) at broadcast priority, which keeps it within Telegram's
+global and per-chat limits behind interactive traffic. Chats that
+blocked the bot are reported through ``on_blocked`` and unsubscribed.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from telegram.error import BadRequest, Forbidden
+
+from metrics import metrics
+from persistence import SQLitePersistence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PER_CHAT = 20
+
+BROADCAST_MESSAGES = metrics.counter(
+    "bot_broadcast_messages_total", "Subscription messages by outcome", ["outcome"]
+)
+
+Key = Tuple[str, str]
+
+
+class SubscriptionRegistry:
+    """
+    Chats subscribed per (pair, timeframe), with the reverse index per chat.
+
+    Args:
+        max_per_chat: Subscriptions allowed per chat
+        persistence: Optional write-behind backend
+    """
+
+    def __init__(self, max_per_chat: int = DEFAULT_MAX_PER_CHAT,
+                 persistence: Optional[SQLitePersistence] = None) -> None:
+        self.max_per_chat = max_per_chat
+        self.persistence = persistence
+        self._by_key: Dict[Key, Set[int]] = {}
+        self._by_chat: Dict[int, Set[Key]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._by_chat.values())
+
+    def load(self) -> int:
+        """Restore persisted subscriptions; returns how many were loaded"""
+        if self.persistence is None:
+            return 0
+        rows = self.persistence.load_subscriptions()
+        for chat_id, pair, timeframe in rows:
+            self._add(chat_id, (pair, timeframe))
+        return len(rows)
+
+    def _add(self, chat_id: int, key: Key) -> None:
+        self._by_key.setdefault(key, set()).add(chat_id)
+        self._by_chat.setdefault(chat_id, set()).add(key)
+
+    def subscribe(self, chat_id: int, pair: str, timeframe: str) -> bool:
+        """Add a subscription; False if it already existed.
+
+        Raises ValueError when the chat is at ``max_per_chat``.
+        """
+        key = (pair, timeframe)
+        keys = self._by_chat.get(chat_id, set())
+        if key in keys:
+            return False
+        if len(keys) >= self.max_per_chat:
+            raise ValueError(f"at most {self.max_per_chat} subscriptions per chat")
+        self._add(chat_id, key)
+        if self.persistence is not None:
+            self.persistence.save_subscription(chat_id, pair, timeframe)
+        return True
+
+    def unsubscribe(self, chat_id: int, pair: Optional[str] = None, timeframe: Optional[str] = None) -> int:
+        """Remove one subscription, or all of the chat's without ``pair``; returns how many"""
+        keys = self._by_chat.get(chat_id)
+        if not keys:
+            return 0
+        targets = list(keys) if pair is None else [k for k in [(pair, timeframe)] if k in keys]
+        for key in targets:
+            keys.discard(key)
+            chats = self._by_key[key]
+            chats.discard(chat_id)
+            if not chats:
+                del self._by_key[key]
+            if self.persistence is not None:
+                self.persistence.save_subscription(chat_id, key[0], key[1], subscribed=False)
+        if not keys:
+            del self._by_chat[chat_id]
+        return len(targets)
+
+    def subscribers(self, pair: str, timeframe: str) -> Tuple[int, ...]:
+        """Chats subscribed to (pair, timeframe)"""
+        return tuple(self._by_key.get((pair, timeframe), ()))
+
+    def of_chat(self, chat_id: int) -> List[Key]:
+        """The chat's subscriptions, sorted"""
+        return sorted(self._by_chat.get(chat_id, ()))
+
+    def keys(self) -> List[Key]:
+        """Every (pair, timeframe) with at least one subscriber"""
+        return list(self._by_key)
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscriptions": len(self), "chats": len(self._by_chat), "keys": len(self._by_key)}
+
+
+async def broadcast(
+    send: Callable[..., Awaitable[Any]],
+    chats: Iterable[int],
+    text: str,
+    on_blocked: Optional[Callable[[int], Any]] = None,
+    **kwargs: Any
+) -> Dict[str, int]:
+    """Send ``text`` to every chat; returns counts by outcome.
+
+    Pacing, priorities and RetryAfter are handled by the bot's outbound
+    scheduler (see outbound.py); pass ``rate_limit_args=Priority.BROADCAST``
+    in ``kwargs`` so interactive replies overtake the fan-out.
+    """
+    chats = list(chats)
+    results = await asyncio.gather(*(send(chat_id, text, **kwargs) for chat_id in chats), return_exceptions=True)
+    counts = {"sent": 0, "blocked": 0, "failed": 0}
+    for chat_id, result in zip(chats, results):
+        if not isinstance(result, BaseException):
+            outcome = "sent"
+        elif isinstance(result, Forbidden) or (isinstance(result, BadRequest) and "chat not found" in str(result).lower()):
+            outcome = "blocked"
+            logger.info("Chat %s cannot receive broadcasts (%s)", chat_id, result)
+            if on_blocked is not None:
+                on_blocked(chat_id)
+        else:
+            outcome = "failed"
+            logger.warning("Broadcast to chat %s failed: %s", chat_id, result)
+        counts[outcome] += 1
+        BROADCAST_MESSAGES.labels(outcome=outcome).inc()
+    return counts
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test file for backtest.py
+Checks the indicator series and vectorized strategy against the scalar
+code paths, outcome scoring at expiry, and the per-pair process pool.
+Run: python test_backtest.py
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import vector_indicators
+from backtest import BacktestJob, backtest_series, job_from_path, run_backtest, synthetic_candles
+from trading_logic import (
+    ACTION_CODES,
+    Candle,
+    _apply_strategy,
+    apply_strategy_arrays,
+    calculate_indicators,
+    indicator_masks,
+    simulate_price_history,
+)
+
+FIELDS = ("sma_fast", "sma_slow", "ema_fast", "ema_slow", "atr", "rsi", "support", "resistance")
+
+
+def to_candles(view):
+    return [Candle(open=o, high=h, low=l, close=c) for o, h, l, c in zip(view.open, view.high, view.low, view.close)]
+
+
+def scalar_signals(candles, timeframe):
+    """(action code, confidence) per candle from the bot's own strategy functions"""
+    out = []
+    for i in range(len(candles)):
+        price = candles[i].close
+        signal = _apply_strategy(calculate_indicators(candles[:i + 1]), "EUR/USD", timeframe, price)
+        out.append((ACTION_CODES[signal.action], signal.confidence))
+    return out
+
+
+def test_indicator_series_matches_full_history():
+    """Test: Entry i of every series equals calculate_indicators over candles 0..i"""
+    candles = simulate_price_history(1.0850, 300, 0.001, "uptrend", seed=5)
+    highs, lows, closes = (np.array([getattr(c, f) for c in candles]) for f in ("high", "low", "close"))
+    series = vector_indicators.indicator_series(highs, lows, closes)
+    for i in (0, 1, 4, 13, 14, 15, 19, 20, 255, 256, 257, 299):
+        expected = calculate_indicators(candles[:i + 1])
+        for name in FIELDS:
+            assert np.isclose(series[name][i], getattr(expected, name), rtol=1e-9, atol=1e-12), (i, name)
+
+    # block boundaries of the blocked EMA
+    small_blocks = vector_indicators.ema_series(closes, 20, block=8)
+    assert np.allclose(small_blocks, series["ema_slow"], rtol=1e-12)
+    print("✓ Indicator series match the scalar indicators at every checked candle")
+
+
+def test_vector_strategy_matches_scalar_strategies():
+    """Test: Vectorized actions and confidences equal generate_signal_short/ultra_short"""
+    checked = 0
+    for seed, volatility in ((1, 0.001), (2, 0.003), (3, 0.0004)):
+        view = synthetic_candles(160, seed=seed, volatility=volatility)
+        candles = to_candles(view)
+        values = vector_indicators.indicator_series(view.high, view.low, view.close)
+        masks = indicator_masks(values)
+        for timeframe in ("5s", "1m"):
+            action, confidence = apply_strategy_arrays(values, masks, timeframe, view.close)
+            expected = scalar_signals(candles, timeframe)
+            assert list(zip(action.tolist(), confidence.tolist())) == expected, (seed, timeframe)
+            checked += int(np.count_nonzero(action))
+    assert checked > 0, "Some rows must produce trades"
+    print(f"✓ Vectorized strategy agrees with the scalar strategies ({checked} trades)")
+
+
+def test_backtest_matches_live_store_window():
+    """Test: Past the store window, backtest signals equal the live ones over the last AVG_PRICE_WINDOW candles"""
+    window = vector_indicators.AVG_PRICE_WINDOW
+    candles = simulate_price_history(1.0850, window * 3, 0.001, "uptrend", seed=13)
+    highs, lows, closes = (np.array([getattr(c, f) for c in candles]) for f in ("high", "low", "close"))
+    values = vector_indicators.indicator_series(highs, lows, closes)
+    masks = indicator_masks(values)
+    rows = range(window - 1, len(candles), 7)
+    for i in rows:
+        assert np.isclose(values["avg_price"][i], closes[i + 1 - window:i + 1].mean(), rtol=1e-12), i
+    for timeframe in ("5s", "1m"):
+        action, confidence = apply_strategy_arrays(values, masks, timeframe, closes)
+        for i in rows:
+            signal = _apply_strategy(calculate_indicators(candles[i + 1 - window:i + 1]), "EUR/USD",
+                                     timeframe, candles[i].close)
+            assert (int(action[i]), int(confidence[i])) == (ACTION_CODES[signal.action], signal.confidence), \
+                (timeframe, i)
+    # an all-time mean trails the trend; the window mean must not
+    assert not np.isclose(closes.mean(), values["avg_price"][-1], rtol=1e-3)
+    print(f"✓ Backtest signals match the live store window on {len(rows)} rows past {window} candles")
+
+
+def test_outcomes_scored_at_expiry():
+    """Test: Wins, losses, ties and calibration match a plain scoring loop"""
+    view = synthetic_candles(400, seed=9, volatility=0.002)
+    # flat stretch so some outcomes are ties
+    view.close[300:320] = view.close[300]
+    expiry, warmup = 3, 20
+    expected = {"wins": 0, "losses": 0, "ties": 0}
+    per_level = {}
+    for i, (code, confidence) in enumerate(scalar_signals(to_candles(view), "1m")):
+        if code == 0 or i < warmup or i + expiry >= len(view.close):
+            continue
+        move = np.sign(view.close[i + expiry] - view.close[i]) * code
+        key = {1: "wins", -1: "losses", 0: "ties"}[int(move)]
+        expected[key] += 1
+        per_level.setdefault(confidence, []).append(key)
+
+    result = backtest_series(view.high, view.low, view.close, "1m", expiry=expiry, warmup=warmup)
+    assert {k: result[k] for k in expected} == expected
+    assert result["signals"] == sum(expected.values()) == result["buy"] + result["sell"]
+    assert result["win_rate"] == round(expected["wins"] / (expected["wins"] + expected["losses"]), 4)
+    levels = {c["confidence"]: (c["signals"], c["wins"]) for c in result["calibration"]}
+    assert levels == {k: (len(v), v.count("wins")) for k, v in per_level.items()}
+    print(f"✓ {result['signals']} signals scored at expiry: {expected}")
+
+
+def test_run_backtest_over_files_in_process_pool():
+    """Test: CSV files are grouped per pair and the pool matches an inline run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = []
+        for pair in ("EURUSD", "GBPJPY"):
+            for timeframe in ("5s", "1m"):
+                view = synthetic_candles(2000, seed=len(jobs))
+                path = os.path.join(tmp, f"{pair}_{timeframe}.csv")
+                np.savetxt(path, np.column_stack(view), delimiter=",", header="timestamp,open,high,low,close",
+                           comments="", fmt="%.10f")
+                jobs.append(job_from_path(path))
+        assert jobs[0] == BacktestJob("EURUSD", "5s", path=jobs[0].path)
+
+        inline = run_backtest(jobs, workers=1)
+        pooled = run_backtest(jobs, workers=2)
+
+    timing = ("seconds", "load_seconds")
+    strip = lambda report: [{k: v for k, v in r.items() if k not in timing} for r in report["results"]]
+    assert pooled["workers"] == 2 and strip(pooled) == strip(inline)
+    assert [(r["pair"], r["timeframe"]) for r in inline["results"]] == [
+        ("EURUSD", "5s"), ("EURUSD", "1m"), ("GBPJPY", "5s"), ("GBPJPY", "1m")
+    ]
+    assert inline["candles"] == 8000 and inline["candles_per_sec"] > 0
+
+    try:
+        job_from_path("eurusd.csv")
+        raise AssertionError("File names without a timeframe must be rejected")
+    except ValueError:
+        pass
+    print(f"✓ 4 series over 2 workers match the inline run ({inline['candles_per_sec']:,} candles/s inline)")
+
+
+if __name__ == "__main__":
+    test_indicator_series_matches_full_history()
+    test_vector_strategy_matches_scalar_strategies()
+    test_backtest_matches_live_store_window()
+    test_outcomes_scored_at_expiry()
+    test_run_backtest_over_files_in_process_pool()
+    print("\nAll backtest tests passed")
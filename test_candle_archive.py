@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test file for candle_archive.py
+Checks the on-disk format, index lookups, the streaming CSV importer and
+warming the resampler from archived base candles.
+Run: python test_candle_archive.py
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import vector_indicators
+from backtest import backtest_series, job_from_path, load_job, run_backtest, synthetic_candles
+from candle_archive import (
+    ArchiveError,
+    CandleArchive,
+    CandleArchiveWriter,
+    archive_path,
+    import_csv,
+    warm_from_archives,
+)
+from candle_store import CandleStoreRegistry, CandleView
+from resampler import TimeframeResampler
+
+START = 1_700_000_003
+
+
+def history(count, seed=0):
+    """Synthetic 5s candles with epoch timestamps"""
+    view = synthetic_candles(count, seed=seed)
+    return CandleView(START + 5 * np.arange(count, dtype=np.float64), *view[1:])
+
+
+def test_roundtrip_index_and_zero_copy_views():
+    """Test: Appends survive reopening, range lookups use the index, views are memmap slices"""
+    candles = history(1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = archive_path(tmp, "EUR/USD OTC", "5s")
+        assert os.path.basename(path) == "EURUSD-OTC_5s.cndl"
+        with CandleArchiveWriter(path, "EUR/USD OTC", "5s", index_stride=64) as writer:
+            assert writer.append(*(c[:700] for c in candles)) == 700
+        # reopen and continue; older and duplicate timestamps are skipped
+        with CandleArchiveWriter(path, "EUR/USD OTC", "5s") as writer:
+            stale = CandleView(*(c[690:700] for c in candles))
+            assert writer.append(*stale) == 0 and writer.skipped == 10
+            assert writer.append(*(c[700:] for c in candles)) == 300
+
+        archive = CandleArchive(path)
+        assert (archive.pair, archive.timeframe, len(archive)) == ("EUR/USD OTC", "5s", 1000)
+        assert archive.index.tolist() == candles.timestamp[::64].astype(np.int64).tolist()
+        for column, expected in zip(archive.view(), candles):
+            assert np.array_equal(column, expected)
+
+        stamps = candles.timestamp
+        for start, end in ((START, START + 50), (START + 2, START + 4000), (START + 320 * 5, None), (0, START)):
+            view = archive.view(start, end)
+            keep = (stamps >= start) & (stamps < (np.inf if end is None else end))
+            assert np.array_equal(view.close, candles.close[keep]), (start, end)
+        assert np.array_equal(archive.tail(5).timestamp, stamps[-5:])
+
+        view = archive.view(START + 100)
+        assert isinstance(view.close, np.memmap) and not view.close.flags.owndata
+        # series functions read the mapped columns without copying them first
+        series = vector_indicators.indicator_series(view.high, view.low, view.close)
+        copied = vector_indicators.indicator_series(*(np.array(c) for c in (view.high, view.low, view.close)))
+        assert all(np.array_equal(series[k], copied[k]) for k in series)
+
+        # a stale index sidecar is rebuilt on open
+        np.zeros(3, dtype="<i8").tofile(path + ".idx")
+        assert CandleArchive(path).index.tolist() == archive.index.tolist()
+
+        try:
+            CandleArchiveWriter(path, "GBP/USD", "5s")
+            raise AssertionError("Appending another series must be refused")
+        except ArchiveError:
+            pass
+    print("✓ Archive round-trips, range lookups match a full scan, views are zero-copy")
+
+
+def test_streaming_csv_import():
+    """Test: The importer converts chunk by chunk and skips malformed or unordered rows"""
+    candles = history(500, seed=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "EURUSD_5s.csv")
+        with open(csv_path, "w") as f:
+            f.write("timestamp,open,high,low,close,volume\n")
+            for i, row in enumerate(zip(*candles)):
+                f.write(",".join(f"{v:.10f}" for v in row) + ",0\n")
+                if i == 100:
+                    f.write("oops,1,2,3\n")
+                    f.write(",".join(f"{v:.10f}" for v in row) + ",0\n")
+        out = archive_path(tmp, "EURUSD", "5s")
+        result = import_csv(csv_path, out, "EURUSD", "5s", chunk_rows=64)
+        assert result == {"rows": 502, "written": 500, "skipped": 2}
+        with CandleArchive(out) as archive:
+            assert np.allclose(archive.view().close, candles.close)
+            assert archive.view().timestamp.dtype == np.int64
+
+        # archives backtest straight from the mapped columns
+        (result_archive,) = run_backtest([job_from_path(out)], workers=1)["results"]
+        expected = backtest_series(candles.high, candles.low, candles.close, "5s")
+        assert result_archive["pair"] == "EURUSD"
+        assert {k: result_archive[k] for k in expected} == expected
+        assert len(load_job(job_from_path(out, start=START + 500))) == 5
+
+        bad = os.path.join(tmp, "bad.csv")
+        with open(bad, "w") as f:
+            f.write("time,price\n1,2\n")
+        bad_out = os.path.join(tmp, "bad.cndl")
+        try:
+            import_csv(bad, bad_out, "EURUSD", "5s")
+            raise AssertionError("A CSV without OHLC columns must be rejected")
+        except ArchiveError:
+            pass
+        assert not os.path.exists(bad_out) and not os.path.exists(bad_out + ".idx"), "No empty archive is left"
+    print(f"✓ Streaming import wrote {result['written']} candles and skipped {result['skipped']} rows")
+
+
+def test_warm_resampler_from_archive():
+    """Test: load_history matches record-by-record ingest, and live candles continue it"""
+    candles = history(3000, seed=4)
+    records = [dict(timestamp=t, open=o, high=h, low=l, close=c) for t, o, h, l, c in zip(*candles)]
+    with tempfile.TemporaryDirectory() as tmp:
+        with CandleArchiveWriter(archive_path(tmp, "EUR/USD", "5s"), "EUR/USD", "5s") as writer:
+            writer.append(*(c[:2500] for c in candles))
+
+        streamed = TimeframeResampler(CandleStoreRegistry(100))
+        warmed = TimeframeResampler(CandleStoreRegistry(100))
+        streamed.ingest("EUR/USD", records[:2500])
+        assert warm_from_archives(tmp, ["EUR/USD", "GBP/USD"], warmed) == {"EUR/USD": 2500}
+
+        # live candles (and a revision of the forming one) after the warm-up
+        revised = dict(records[-1], close=records[-1]["close"] * 1.001)
+        for target in (streamed, warmed):
+            target.ingest("EUR/USD", records[2500:])
+            target.ingest("EUR/USD", [revised])
+
+    for timeframe in ["5s"] + [tf for tf, _ in streamed.timeframes]:
+        a = streamed.stores.get("EUR/USD", timeframe).view()
+        b = warmed.stores.get("EUR/USD", timeframe).view()
+        assert all(np.array_equal(x, y) for x, y in zip(a, b)), timeframe
+    print("✓ Archive warm-up leaves every timeframe exactly as streaming ingest would")
+
+
+if __name__ == "__main__":
+    test_roundtrip_index_and_zero_copy_views()
+    test_streaming_csv_import()
+    test_warm_resampler_from_archive()
+    print("\nAll candle archive tests passed")
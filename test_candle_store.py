@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test file for candle_store.py
+Checks ring-buffer wrap-around, forming-candle updates and zero-copy views.
+Run: python test_candle_store.py
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from candle_store import CandleStore
+from trading_logic import calculate_indicators, calculate_indicators_from_arrays, simulate_price_history
+
+
+def make_records(candles, step=5):
+    return [
+        {"timestamp": i * step, "open": c.open, "high": c.high, "low": c.low, "close": c.close}
+        for i, c in enumerate(candles)
+    ]
+
+
+def test_ring_buffer_wraps():
+    """Test: Only the newest `capacity` candles are kept, in order"""
+    store = CandleStore(capacity=8)
+    for i in range(20):
+        store.append(i, i, i + 1, i - 1, i + 0.5)
+
+    view = store.view()
+    assert len(store) == 8
+    assert view.timestamp.tolist() == list(range(12, 20))
+    assert view.close.tolist() == [i + 0.5 for i in range(12, 20)]
+    assert store.view(3).timestamp.tolist() == [17, 18, 19]
+    assert store.last_timestamp == 19
+    assert store.nbytes == 2 * 5 * 8 * 8
+    print("✓ Ring buffer keeps the newest candles")
+
+
+def test_views_are_zero_copy():
+    """Test: Views share memory with the store"""
+    store = CandleStore(capacity=16)
+    for i in range(40):
+        store.append(i, 1.0, 2.0, 0.5, float(i))
+
+    view = store.view()
+    assert np.shares_memory(view.close, store._data)
+    assert view.close.flags["C_CONTIGUOUS"], "Window must be contiguous after wrap"
+    print("✓ Views are contiguous and zero-copy")
+
+
+def test_extend_records():
+    """Test: Records are appended once, forming candle is overwritten"""
+    candles = simulate_price_history(1.0850, 60, 0.001, "neutral")
+    records = make_records(candles)
+    store = CandleStore(capacity=100)
+
+    assert store.extend_records(records[:30]) == 30
+    assert store.extend_records(records[:30]) == 0, "Replayed records are ignored"
+    assert store.extend_records(records) == 30
+
+    forming = dict(records[-1], close=records[-1]["close"] * 1.01)
+    assert store.extend_records([forming, {"timestamp": "bad"}]) == 0
+    assert store.view().close[-1] == forming["close"]
+    assert len(store) == 60
+    print("✓ extend_records ingests new candles only")
+
+
+def test_indicators_from_views():
+    """Test: Array indicators over store views agree with calculate_indicators"""
+    candles = simulate_price_history(162.50, 80, 0.001, "downtrend")
+    store = CandleStore(capacity=50)
+    store.extend_records(make_records(candles))
+
+    view = store.view()
+    from_views = calculate_indicators_from_arrays(view.high, view.low, view.close)
+    expected = calculate_indicators(candles[-50:])
+    assert from_views.trend == expected.trend
+    assert from_views.volatility_level == expected.volatility_level
+    assert from_views.momentum_signal == expected.momentum_signal
+    assert abs(from_views.rsi - expected.rsi) < 1e-9
+    assert abs(from_views.ema_slow - expected.ema_slow) < 1e-9 * expected.ema_slow
+    print("✓ Indicators from views match candle-based calculation")
+
+
+if __name__ == "__main__":
+    test_ring_buffer_wraps()
+    test_views_are_zero_copy()
+    test_extend_records()
+    test_indicators_from_views()
+    print("\nAll candle store tests passed")
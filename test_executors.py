@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test file for executors.py
+Runs the same signals on every backend and checks results and latency stats.
+Run: python test_executors.py
+"""
+
+import sys
+import os
+import asyncio
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from executors import SignalExecutor
+from trading_logic import generate_trading_signal
+
+REQUESTS = [("GBP/JPY", "5m", 190.50), ("EUR/GBP", "1m", 0.8580), ("CAD/JPY", "15s", 90.20)]
+
+
+def run_on(backend):
+    executor = SignalExecutor(backend, workers=2)
+    executor.start()
+
+    async def run_all():
+        return await asyncio.gather(*(executor.run(generate_trading_signal, *req) for req in REQUESTS))
+
+    try:
+        return asyncio.run(run_all()), executor.stats()
+    finally:
+        executor.shutdown()
+
+
+def test_backends_agree():
+    """Test: inline, thread and process backends return the same signals"""
+    expected = [generate_trading_signal(*req) for req in REQUESTS]
+    for backend in ("inline", "thread", "process"):
+        signals, stats = run_on(backend)
+        assert [s.action for s in signals] == [e.action for e in expected], backend
+        assert [s.confidence for s in signals] == [e.confidence for e in expected], backend
+        assert stats["backend"] == backend and stats["count"] == len(REQUESTS)
+        assert stats["max"] >= stats["p50"] > 0
+        print(f"✓ {backend} backend: p50 {stats['p50'] * 1000:.2f} ms")
+
+
+def test_unknown_backend_rejected():
+    """Test: Misconfigured backends fail fast"""
+    try:
+        SignalExecutor("gpu")
+    except ValueError:
+        print("✓ Unknown backend rejected")
+        return
+    raise AssertionError("Expected ValueError")
+
+
+if __name__ == "__main__":
+    test_backends_agree()
+    test_unknown_backend_rejected()
+    print("\nAll executor tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test file for loadtest.py
+Runs short loads of the real handlers against the fake Bot API
+(direct, webhook and polling modes).
+Run: python test_loadtest.py
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import signal_bot
+from loadtest import run_load
+
+HANDLERS = {"start", "pair_selection", "timeframe_selection", "restart_handler"}
+
+
+def load_args(**overrides):
+    args = dict(mode="direct", rate=20.0, duration=0.5, users=50, think_time=0.0, api_latency=0.0,
+                slow_rate=0.0, slow_delay=0.05, error_rate=0.0, retry_after=1, seed=7)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def test_flows_drive_every_handler():
+    """Test: Every flow step reaches its handler without errors"""
+    result = asyncio.run(run_load(load_args()))
+    assert result["flows"] == 10
+    assert set(result["handlers"]) == HANDLERS
+    assert result["handlers"]["timeframe_selection"]["count"] == 20
+    assert all(h["errors"] == 0 for h in result["handlers"].values()), result["handlers"]
+    assert result["api_calls"]["getMe"] == 1
+    print(f"✓ 10 flows, {result['updates_per_sec']:.0f} updates/s, no handler errors")
+
+
+def test_webhook_and_polling_modes():
+    """Test: Updates POSTed to the webhook or served via getUpdates are all handled"""
+    for mode in ("webhook", "polling"):
+        result = asyncio.run(run_load(load_args(mode=mode, duration=0.25)))
+        assert result["flows"] == 5, (mode, result)
+        assert all(h["errors"] == 0 for h in result["handlers"].values()), (mode, result["handlers"])
+        print(f"✓ {mode}: {result['updates']} updates, {result['updates_per_sec']:.0f} updates/s")
+    assert result["api_calls"]["getUpdates"] >= 1
+
+
+def test_injected_faults_are_reported():
+    """Test: Injected 429s are retried by the outbound scheduler, slow responses show as latency"""
+    result = asyncio.run(run_load(load_args(error_rate=0.2, slow_rate=0.2)))
+    errors = sum(h["errors"] for h in result["handlers"].values())
+    injected = result["api_injected"]["429"]
+    assert injected > 0 and result["outbound"]["retried"] > 0
+    # a call only fails after max_retries + 1 consecutive 429s
+    assert errors * (signal_bot.outbound.max_retries + 1) <= injected
+    assert result["api_injected"]["slow"] > 0
+    assert max(h["max"] for h in result["handlers"].values()) >= 50.0
+    print(f"✓ {injected} injected 429s -> {result['outbound']['retried']} retried, {errors} handler errors")
+
+
+if __name__ == "__main__":
+    test_flows_drive_every_handler()
+    test_webhook_and_polling_modes()
+    test_injected_faults_are_reported()
+    print("\nAll load test harness tests passed")
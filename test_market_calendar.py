@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test file for market_calendar.py
+Checks sessions across weekends, holidays and DST, and the cached mode.
+Run: python test_market_calendar.py
+"""
+
+import sys
+import os
+from datetime import date, datetime, time, timezone
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from market_calendar import NORMAL, OTC, MarketCalendar
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_sessions_weekends_and_holidays():
+    """Test: NORMAL only inside weekday sessions that are not holidays"""
+    cal = MarketCalendar(holidays=[date(2026, 12, 25)])
+    assert cal.mode_at(utc(2026, 12, 21, 6, 59)) == OTC        # Monday before open
+    assert cal.mode_at(utc(2026, 12, 21, 7, 0)) == NORMAL      # open is inclusive
+    assert cal.mode_at(utc(2026, 12, 21, 17, 0)) == OTC        # close is exclusive
+    assert cal.mode_at(utc(2026, 12, 25, 12, 0)) == OTC        # holiday (Friday)
+    assert cal.mode_at(utc(2026, 12, 26, 12, 0)) == OTC        # Saturday
+
+    # Thursday close -> skip holiday Friday and the weekend -> Monday open
+    assert cal.next_boundary(utc(2026, 12, 24, 17, 0)) == utc(2026, 12, 28, 7, 0)
+    assert cal.next_boundary(utc(2026, 12, 28, 7, 0)) == utc(2026, 12, 28, 17, 0)
+    print("✓ Weekends and holidays stay OTC; boundaries skip them")
+
+
+def test_timezone_and_dst():
+    """Test: Hours are local to the configured zone across a DST change"""
+    cal = MarketCalendar(tz="America/New_York", open_time=time(8), close_time=time(17))
+    # EDT (UTC-4) before 1 Nov 2026, EST (UTC-5) after
+    assert cal.next_boundary(utc(2026, 10, 30, 0, 0)) == utc(2026, 10, 30, 12, 0)
+    assert cal.next_boundary(utc(2026, 11, 1, 0, 0)) == utc(2026, 11, 2, 13, 0)
+    assert cal.mode_at(utc(2026, 11, 2, 12, 30)) == OTC
+    assert cal.mode_at(utc(2026, 11, 2, 13, 0)) == NORMAL
+    print("✓ Session boundaries follow the zone's DST offset")
+
+
+def test_cached_mode_changes_exactly_at_boundary():
+    """Test: current_mode is served from cache and flips at the boundary"""
+    now = [utc(2026, 12, 21, 16, 59, 59).timestamp()]
+    cal = MarketCalendar(clock=lambda: now[0])
+    calls = []
+    refresh = cal.refresh
+    cal.refresh = lambda at=None: calls.append(at) or refresh(at)
+
+    assert cal.current_mode() == NORMAL
+    assert cal.valid_until == utc(2026, 12, 21, 17, 0).timestamp()
+    for _ in range(1000):
+        cal.current_mode()
+    assert len(calls) == 1, "Cached until the boundary"
+
+    now[0] = cal.valid_until
+    assert cal.current_mode() == OTC and len(calls) == 2
+    assert cal.valid_until == utc(2026, 12, 22, 7, 0).timestamp()
+    print("✓ Mode cached between boundaries and flipped exactly at 17:00")
+
+
+if __name__ == "__main__":
+    test_sessions_weekends_and_holidays()
+    test_timezone_and_dst()
+    test_cached_mode_changes_exactly_at_boundary()
+    print("\nAll market calendar tests passed")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test file for market_data.py
+Checks connection reuse, batching, retries, per-host limits and the sync bridge.
+Run: python test_market_data.py
+"""
+
+import sys
+import os
+import asyncio
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import trading_logic
+from market_data import HTTPMarketDataProvider, MarketDataClient, MarketDataError, StubMarketDataServer
+
+PAIRS = ["EUR/USD", "GBP/USD", "USD/JPY", "AUD/CAD", "EUR/GBP", "CAD/JPY", "BTCUSD"]
+
+
+def test_pooled_and_batched_fetch():
+    """Test: Requests reuse one connection and fetch_many batches pairs"""
+    async def scenario():
+        server = StubMarketDataServer()
+        provider = HTTPMarketDataProvider(await server.start(), batch_size=3)
+        for _ in range(10):
+            records = await provider.fetch("EUR/USD", "1m", limit=50)
+        assert len(records) == 50 and records[-1]["timestamp"] % 60 == 0
+        assert server.connections == 1, "Sequential requests share a kept-alive connection"
+
+        before = server.requests
+        batch = await provider.fetch_many(PAIRS, "5s", limit=20)
+        assert sorted(batch) == sorted(PAIRS) and all(len(r) == 20 for r in batch.values())
+        assert server.requests - before == 3, "7 pairs in batches of 3"
+        await provider.aclose()
+        await server.stop()
+
+    asyncio.run(scenario())
+    print("✓ One pooled connection; 7 pairs fetched in 3 batched requests")
+
+
+def test_retries_with_backoff():
+    """Test: 503s are retried (honouring Retry-After), 404s are not"""
+    async def scenario():
+        server = StubMarketDataServer(fail_first=2, retry_after=0.05)
+        provider = HTTPMarketDataProvider(await server.start(), retries=3, backoff=0.01, seed=1)
+        started = asyncio.get_running_loop().time()
+        assert await provider.fetch("EUR/USD", "1m", limit=10)
+        assert provider.retried == 2 and server.requests == 3
+        assert asyncio.get_running_loop().time() - started >= 0.1, "Waited for Retry-After"
+
+        try:
+            await provider.fetch("EUR/USD", "2h")
+            raise AssertionError("Unknown timeframe should fail")
+        except MarketDataError as e:
+            assert "404" in str(e)
+        assert server.requests == 4, "Client errors are not retried"
+        await provider.aclose()
+        await server.stop()
+
+        down = HTTPMarketDataProvider("http://127.0.0.1:9", retries=2, backoff=0.001, timeout=1.0)
+        try:
+            await down.fetch("EUR/USD", "1m")
+            raise AssertionError("Unreachable server should fail")
+        except MarketDataError:
+            assert down.requests == 3 and down.failed == 1
+        await down.aclose()
+
+    asyncio.run(scenario())
+    print("✓ Transient errors retried with backoff; permanent ones fail fast")
+
+
+def test_per_host_limit():
+    """Test: No more than max_per_host requests are in flight per host"""
+    async def scenario():
+        server = StubMarketDataServer(latency=0.02)
+        provider = HTTPMarketDataProvider(await server.start(), max_per_host=2)
+        await asyncio.gather(*(provider.fetch(p, "1m", limit=5) for p in PAIRS))
+        assert server.requests == len(PAIRS) and server.max_in_flight == 2
+        await provider.aclose()
+        await server.stop()
+
+    asyncio.run(scenario())
+    print("✓ Per-host concurrency capped at 2")
+
+
+def test_client_prefetch_feeds_signal_generation():
+    """Test: Prefetched records are served to trading_logic from the cache"""
+    async def scenario():
+        server = StubMarketDataServer()
+        client = MarketDataClient(HTTPMarketDataProvider(await server.start()), ttl=60.0, limit=300)
+        # base-timeframe candles, as the precompute job prefetches them
+        assert await client.prefetch(["STUB/A", "STUB/B"], "5s") == 2
+        requests = server.requests
+
+        original = trading_logic.get_market_data
+        trading_logic.get_market_data = client.get
+        try:
+            signal = await asyncio.to_thread(trading_logic.generate_trading_signal, "STUB/A", "1m", 1.2)
+        finally:
+            trading_logic.get_market_data = original
+        assert signal.entry_time != "N/A"
+        assert client.hits == 1 and client.misses == 0 and server.requests == requests, "1m resampled from cache"
+
+        await asyncio.to_thread(client.close)
+        await server.stop()
+
+        down = MarketDataClient(HTTPMarketDataProvider("http://127.0.0.1:9", retries=0, timeout=1.0))
+        assert await asyncio.to_thread(down.get, "STUB/A", "5s") == [], "Failures degrade to no data"
+        assert down.errors == 1
+        await asyncio.to_thread(down.close)
+
+    asyncio.run(scenario())
+    print("✓ Signals computed from prefetched stub candles; outages return no data")
+
+
+def test_client_reusable_after_close():
+    """Test: get/prefetch after close() open a new loop and connection pool"""
+    async def scenario():
+        server = StubMarketDataServer()
+        client = MarketDataClient(HTTPMarketDataProvider(await server.start()), ttl=0.0, limit=50)
+        assert len(await asyncio.to_thread(client.get, "STUB/A", "5s")) == 50
+        first_pool = client.provider.client
+        # webhook setup failed: post_shutdown closes, polling's post_init runs again
+        await asyncio.to_thread(client.close)
+        assert first_pool.is_closed
+
+        assert len(await asyncio.to_thread(client.get, "STUB/A", "5s")) == 50
+        assert await client.prefetch(["STUB/A", "STUB/B"], "5s") == 2
+        assert client.errors == 0 and client.provider.client is not first_pool
+        await asyncio.to_thread(client.close)
+        await server.stop()
+
+    asyncio.run(scenario())
+    print("✓ Client keeps working after close() with a fresh connection pool")
+
+
+if __name__ == "__main__":
+    test_pooled_and_batched_fetch()
+    test_retries_with_backoff()
+    test_per_host_limit()
+    test_client_prefetch_feeds_signal_generation()
+    test_client_reusable_after_close()
+    print("\nAll market data tests passed")
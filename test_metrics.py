@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test file for metrics.py
+Checks Prometheus text rendering, the HTTP endpoint and bot instrumentation.
+Run: python test_metrics.py
+"""
+
+import sys
+import os
+import urllib.request
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from metrics import MetricsRegistry, MetricsServer, _Metric, metrics
+
+
+def test_prometheus_text_format():
+    """Test: Counters, gauges and histograms render in exposition format"""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["handler"])
+    requests.labels(handler="start").inc()
+    requests.labels(handler="start").inc(2)
+    registry.gauge("queue_depth", "Queued calls").set_function(lambda: 7)
+    latency = registry.histogram("latency_seconds", "Latency", ["handler"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.labels(handler='say "hi"').observe(value)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{handler="start"} 3' in text
+    assert "queue_depth 7" in text
+    assert 'latency_seconds_bucket{handler="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{handler="say \\"hi\\"",le="1"} 3' in text
+    assert 'latency_seconds_bucket{handler="say \\"hi\\"",le="+Inf"} 4' in text
+    assert 'latency_seconds_sum{handler="say \\"hi\\""} 4.05' in text
+    assert 'latency_seconds_count{handler="say \\"hi\\""} 4' in text
+    assert registry.counter("requests_total", "Requests", ["handler"]) is requests
+    try:
+        _Metric("base", "No value type")
+        raise AssertionError("The metric base class must be abstract")
+    except TypeError:
+        pass
+    print("✓ Registry renders Prometheus text format")
+
+
+def test_http_endpoint():
+    """Test: /metrics serves the registry, other paths 404"""
+    registry = MetricsRegistry()
+    registry.counter("served_total", "Served").inc()
+    server = MetricsServer(registry, port=0)
+    port = server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "served_total 1" in resp.read().decode()
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other", timeout=5)
+            assert False, "expected 404"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.stop()
+    print(f"✓ /metrics served on port {port}")
+
+
+def test_bot_instrumentation():
+    """Test: A load run records handler, stage, executor and Bot API metrics"""
+    import asyncio
+    from test_loadtest import load_args
+    from loadtest import run_load
+
+    asyncio.run(run_load(load_args(duration=0.25)))
+    text = metrics.render()
+    for expected in (
+        'bot_handler_latency_seconds_count{handler="timeframe_selection"}',
+        'signal_stage_seconds_count{stage="indicators"}',
+        'signal_executor_wait_seconds_count{backend="thread"}',
+        'telegram_api_latency_seconds_count{method="editMessageText"}',
+        "signal_cache_hits",
+        "bot_signal_requests_total",
+    ):
+        assert expected in text, expected
+    print("✓ Bot run populated handler, stage, executor and API metrics")
+
+
+if __name__ == "__main__":
+    test_prometheus_text_format()
+    test_http_endpoint()
+    test_bot_instrumentation()
+    print("\nAll metrics tests passed")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test file for outbound.py
+Checks priority ordering, token buckets, obsolete-edit dropping and RetryAfter.
+Run: python test_outbound.py
+"""
+
+import sys
+import os
+import asyncio
+import time
+from datetime import timedelta
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from telegram.error import RetryAfter
+
+from outbound import OutboundScheduler, Priority
+
+
+class Recorder:
+    """Callback standing in for the Bot API request"""
+
+    def __init__(self, fail=None):
+        self.calls = []
+        self.fail = fail or {}
+
+    async def __call__(self, name):
+        self.calls.append((time.monotonic(), name))
+        error = self.fail.pop(name, None)
+        if error is not None:
+            raise error
+        return {"ok": name}
+
+
+def request(scheduler, recorder, name, endpoint="sendMessage", chat_id=1, message_id=None, priority=None):
+    data = {"chat_id": chat_id}
+    if message_id is not None:
+        data["message_id"] = message_id
+    return asyncio.ensure_future(scheduler.process_request(recorder, (name,), {}, endpoint, data, priority))
+
+
+def test_priorities_and_answers_bypass():
+    """Test: Answers go out at once; edits overtake replies overtake broadcasts"""
+    async def scenario():
+        scheduler = OutboundScheduler(rate=1000, chat_rate=1000, chat_burst=1000, max_in_flight=1)
+        await scheduler.initialize()
+        recorder = Recorder()
+        calls = [
+            request(scheduler, recorder, "broadcast", chat_id=3, priority=Priority.BROADCAST),
+            request(scheduler, recorder, "reply", chat_id=2),
+            request(scheduler, recorder, "edit", "editMessageText", chat_id=1, message_id=7),
+        ]
+        answer = asyncio.ensure_future(scheduler.process_request(
+            recorder, ("answer",), {}, "answerCallbackQuery", {"callback_query_id": "1"}, None))
+        results = await asyncio.gather(answer, *calls)
+        await scheduler.shutdown()
+        return [name for _, name in recorder.calls], results
+
+    order, results = asyncio.run(scenario())
+    assert order == ["answer", "edit", "reply", "broadcast"], order
+    assert results[0] == {"ok": "answer"}
+    print("✓ answer -> edit -> reply -> broadcast")
+
+
+def test_token_buckets():
+    """Test: Per-chat burst then rate, and a global rate across chats"""
+    async def scenario():
+        scheduler = OutboundScheduler(rate=100, chat_rate=10, chat_burst=2)
+        await scheduler.initialize()
+        recorder = Recorder()
+        started = time.monotonic()
+        await asyncio.gather(*(request(scheduler, recorder, f"m{i}", chat_id=1) for i in range(4)))
+        chat_elapsed = time.monotonic() - started
+
+        scheduler.rate = 20
+        scheduler._bucket.rate = scheduler._bucket.capacity = 20
+        scheduler._bucket.tokens = 0
+        started = time.monotonic()
+        await asyncio.gather(*(request(scheduler, recorder, f"c{c}", chat_id=c) for c in range(100, 106)))
+        global_elapsed = time.monotonic() - started
+        await scheduler.shutdown()
+        return chat_elapsed, global_elapsed
+
+    chat_elapsed, global_elapsed = asyncio.run(scenario())
+    # 2 immediately, then 2 more at 10/s
+    assert 0.18 <= chat_elapsed < 1.0, chat_elapsed
+    # 6 calls at 20/s from an empty bucket
+    assert 0.28 <= global_elapsed < 1.0, global_elapsed
+    print(f"✓ per-chat burst+rate ({chat_elapsed:.2f}s) and global rate ({global_elapsed:.2f}s)")
+
+
+def test_obsolete_edits_dropped():
+    """Test: A queued edit is dropped when a newer edit of the same message arrives"""
+    async def scenario():
+        scheduler = OutboundScheduler(rate=1000, chat_rate=1, chat_burst=1)
+        await scheduler.initialize()
+        recorder = Recorder()
+        first = request(scheduler, recorder, "edit 1", "editMessageText", message_id=5)
+        await asyncio.sleep(0.01)
+        # chat bucket is empty now: these two queue, and the second replaces the first
+        second = request(scheduler, recorder, "edit 2", "editMessageText", message_id=5)
+        await asyncio.sleep(0)
+        third = request(scheduler, recorder, "edit 3", "editMessageText", message_id=5)
+        other = request(scheduler, recorder, "other msg", "editMessageText", message_id=6)
+        results = await asyncio.gather(first, second, third, other)
+        stats = scheduler.stats()
+        await scheduler.shutdown()
+        return [name for _, name in recorder.calls], results, stats
+
+    order, results, stats = asyncio.run(scenario())
+    assert order == ["edit 1", "edit 3", "other msg"], order
+    assert results[1] is True and stats["dropped"] == 1 and stats["pending"] == 0
+    print("✓ superseded edit dropped, newer edit and other messages delivered")
+
+
+def test_retry_after_pauses_and_retries():
+    """Test: RetryAfter pauses all queued calls and retries in place"""
+    async def scenario():
+        scheduler = OutboundScheduler(rate=1000, chat_rate=1000, chat_burst=1000, max_in_flight=1)
+        await scheduler.initialize()
+        recorder = Recorder(fail={"a": RetryAfter(timedelta(milliseconds=150))})
+        results = await asyncio.gather(
+            request(scheduler, recorder, "a", chat_id=1),
+            request(scheduler, recorder, "b", chat_id=2),
+        )
+        stats = scheduler.stats()
+        await scheduler.shutdown()
+        return recorder.calls, results, stats
+
+    calls, results, stats = asyncio.run(scenario())
+    names = [name for _, name in calls]
+    assert names == ["a", "a", "b"], names
+    assert calls[1][0] - calls[0][0] >= 0.14, "Waited for the flood-control pause"
+    assert results == [{"ok": "a"}, {"ok": "b"}] and stats["retried"] == 1
+    print("✓ RetryAfter pause honoured and the call retried first")
+
+
+if __name__ == "__main__":
+    test_priorities_and_answers_bypass()
+    test_token_buckets()
+    test_obsolete_edits_dropped()
+    test_retry_after_pauses_and_retries()
+    print("\nAll outbound tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test file for param_sweep.py
+Checks point generation, that the shared indicator cache scores points
+exactly like a direct backtest, and the process-pool split.
+Run: python test_param_sweep.py
+"""
+
+import sys
+import os
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backtest import BacktestJob, backtest_series, load_job
+from param_sweep import grid_points, parse_grid, parse_ranges, random_points, rank, run_sweep
+from trading_logic import StrategyParams
+
+JOBS = [BacktestJob("EURUSD", "5s", candles=4000), BacktestJob("EURUSD", "1m", candles=4000),
+        BacktestJob("GBPUSD", "1m", candles=3000)]
+
+
+def test_point_generation():
+    """Test: Grids skip invalid combinations, random points stay in range"""
+    grid = parse_grid(["ema_fast=3,5", "atr_medium=0.2,0.6", "atr_high=0.5"])
+    assert grid == {"ema_fast": [3, 5], "atr_medium": [0.2, 0.6], "atr_high": [0.5]}
+    points = grid_points(grid)
+    # atr_medium 0.6 > atr_high 0.5 is not a valid parameter set
+    assert len(points) == 2 and all(p.atr_medium == 0.2 for p in points)
+    assert {p.ema_fast for p in points} == {3, 5}
+
+    ranges = parse_ranges(["ema_slow=10:30", "rsi_bullish=55:70"])
+    drawn = random_points(ranges, 20, seed=3)
+    assert drawn == random_points(ranges, 20, seed=3), "Seeded draws repeat"
+    assert len(drawn) == 20
+    assert all(isinstance(p.ema_slow, int) and 10 <= p.ema_slow <= 30 for p in drawn)
+    assert all(55 <= p.rsi_bullish <= 70 and p.rsi_bearish == 40 for p in drawn)
+
+    try:
+        parse_grid(["ema_medium=3"])
+        raise AssertionError("Unknown parameter names must be rejected")
+    except ValueError:
+        pass
+    print(f"✓ {len(points)} valid grid points, {len(drawn)} random points in range")
+
+
+def test_shared_cache_matches_direct_backtest():
+    """Test: Points scored from the cached series equal full backtests"""
+    points = grid_points(parse_grid(["ema_fast=3,5", "ema_slow=20,30", "trend_band=0.0005,0.002"]))
+    points += [StrategyParams(rsi_bullish=55, rsi_bearish=45, rsi_oversold=50, sr_bounce=0.003)]
+    report = run_sweep(JOBS, points, expiry=2, workers=1, min_signals=1)
+    assert report["points"] == 9 and report["candles"] == 11000
+
+    views = [load_job(job) for job in JOBS]
+    for result in report["ranked"]:
+        params = StrategyParams.from_dict(result["params"])
+        direct = [backtest_series(v.high, v.low, v.close, job.timeframe, expiry=2, params=params)
+                  for v, job in zip(views, JOBS)]
+        for name in ("signals", "wins", "losses", "ties"):
+            assert result[name] == sum(d[name] for d in direct), (params, name)
+
+    rates = [r["win_rate"] for r in report["ranked"]]
+    assert rates == sorted(rates, reverse=True), "Ranked by win rate"
+    print(f"✓ {len(points)} points from cached series match direct backtests")
+
+    pooled = run_sweep(JOBS, points, expiry=2, workers=2, min_signals=1)
+    assert pooled["workers"] == 2 and pooled["ranked"] == report["ranked"]
+    print("✓ Pool of 2 workers ranks the points identically")
+
+
+def test_rank_puts_thin_points_last():
+    """Test: Points under min_signals rank after every eligible one"""
+    results = [
+        {"params": {}, "signals": 5, "win_rate": 0.9},
+        {"params": {}, "signals": 500, "win_rate": 0.55},
+        {"params": {}, "signals": 800, "win_rate": 0.55},
+        {"params": {}, "signals": 0, "win_rate": None},
+    ]
+    ranked = rank(results, min_signals=100)
+    assert [r["signals"] for r in ranked] == [800, 500, 5, 0]
+    print("✓ Thin points are ranked last")
+
+
+if __name__ == "__main__":
+    test_point_generation()
+    test_shared_cache_matches_direct_backtest()
+    test_rank_puts_thin_points_last()
+    print("\nAll parameter sweep tests passed")
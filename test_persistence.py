@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test file for persistence.py
+Checks write-behind batching, WAL mode and lazy session reload after a
+restart, off the event loop for async handlers.
+Run: python test_persistence.py
+"""
+
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from persistence import SQLitePersistence
+from session_store import TOUCH_FRACTION, SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_write_behind_batches_changes():
+    """Test: Clicks only queue changes; one flush writes the latest values"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        db = SQLitePersistence(path)
+        store = SessionStore(persistence=db)
+        for user_id in range(100):
+            store.start(user_id).pair = "EUR/USD"
+            store.changed(user_id)
+            store.get(user_id).timeframe = "1m"
+            store.changed(user_id)
+
+        assert not os.path.exists(path), "Nothing touches the disk before a flush"
+        assert db.pending == 100
+        assert db.flush() == 100 and db.pending == 0
+        assert count_rows(path) == 100
+
+        conn = sqlite3.connect(path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+        db.close()
+    print("✓ 400 session changes written as 100 rows in one flush (WAL)")
+
+
+def test_sessions_survive_restart():
+    """Test: A new process reloads sessions and state lazily on first access"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        db = SQLitePersistence(path)
+        store = SessionStore(ttl=600, persistence=db)
+        store.start(42).pair = "GBP/JPY"
+        store.changed(42)
+        db.save_session(7, "EUR/USD", None, updated_at=time.time() - 3600)
+        db.set_state("market_mode", "OTC")
+        db.close()
+
+        # restart: fresh objects over the same file
+        db = SQLitePersistence(path)
+        store = SessionStore(ttl=600, persistence=db)
+        assert len(store) == 0
+        session = store.get(42)
+        assert session is not None and session.pair == "GBP/JPY"
+        assert store.stats()["reloaded"] == 1
+        assert store.get(7) is None, "Sessions idle past the TTL are not revived"
+        assert db.get_state("market_mode") == "OTC"
+
+        db.flush(max_age=600)
+        assert count_rows(path) == 1
+        db.close()
+    print("✓ Session and market mode reloaded after restart; stale session dropped")
+
+
+def test_used_sessions_outlive_flush_purge():
+    """Test: A session that is read but never changed keeps its row across TTLs of flushes"""
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        db = SQLitePersistence(path, clock=clock)
+        store = SessionStore(ttl=600, clock=clock, persistence=db)
+        store.start(1).pair = "EUR/USD"
+        store.changed(1)
+        store.start(2).pair = "GBP/JPY"
+        store.changed(2)
+        writes = db.rows_written
+
+        # two hours of signal requests from user 1 only, flushing every 10s
+        for _ in range(720):
+            clock.now += 10
+            assert asyncio.run(store.aget(1)).pair == "EUR/USD"
+            db.flush(max_age=store.ttl)
+        assert db.load_session(1) is not None, "Row of a live session was purged"
+        assert db.load_session(2) is None, "Idle session is purged"
+        touches = db.rows_written - writes
+        assert touches <= 7200 / (600 * TOUCH_FRACTION) + 2, touches
+
+        # restart 5 minutes later: the reload goes by the last-seen stamp
+        db.close()
+        clock.now += 300
+        db = SQLitePersistence(path, clock=clock)
+        store = SessionStore(ttl=600, clock=clock, persistence=db)
+        assert store.get(1).pair == "EUR/USD"
+        db.close()
+    print(f"✓ Session used for 2h without changes kept its row ({touches} last-seen writes)")
+
+
+def test_async_reload_stays_off_event_loop():
+    """Test: aget reads the database in a worker thread, memory hits never touch it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        db = SQLitePersistence(path)
+        db.save_session(42, "GBP/JPY", "1m")
+        db.flush()
+        db.close()
+
+        db = SQLitePersistence(path)
+        store = SessionStore(ttl=600, persistence=db)
+        reads = []
+        load_session = db.load_session
+
+        def traced_load(user_id):
+            reads.append(threading.get_ident())
+            return load_session(user_id)
+
+        db.load_session = traced_load
+
+        async def handler():
+            loop_thread = threading.get_ident()
+            session = await store.aget(42)
+            assert session is not None and session.timeframe == "1m"
+            assert (await store.aget_or_start(42)) is session, "Second access is a memory hit"
+            assert (await store.aget(99)) is None
+            assert (await store.aget_or_start(99)).pair is None
+            return loop_thread
+
+        loop_thread = asyncio.run(handler())
+        assert len(reads) == 3 and loop_thread not in reads, "Database reads ran on the event loop"
+        assert store.stats()["reloaded"] == 1
+        db.close()
+    print("✓ Session reloads run in worker threads; memory hits skip the database")
+
+
+if __name__ == "__main__":
+    test_write_behind_batches_changes()
+    test_sessions_survive_restart()
+    test_used_sessions_outlive_flush_purge()
+    test_async_reload_stays_off_event_loop()
+    print("\nAll persistence tests passed")
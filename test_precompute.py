@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test file for precompute.py
+Checks snapshot publishing, staleness and candle-close due timeframes.
+Run: python test_precompute.py
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from precompute import PrecomputeScheduler, SignalSnapshot
+from trading_logic import generate_trading_signal
+
+PAIRS = ["EUR/USD", "GBP/JPY", "USD/CNH"]
+TIMEFRAMES = ["1m", "3m", "5m", "10m", "15m", "30m", "1h"]
+
+
+def make_scheduler(snapshot, prefetch=None):
+    return PrecomputeScheduler(
+        snapshot,
+        active_pairs=lambda: PAIRS,
+        active_timeframes=lambda: TIMEFRAMES,
+        price_for=lambda pair: 1.2,
+        prefetch=prefetch,
+    )
+
+
+def test_refresh_publishes_every_pair_and_timeframe():
+    """Test: A refresh fills the snapshot with signals for the current candle"""
+    snapshot = SignalSnapshot()
+    prefetched = []
+
+    async def prefetch(pairs):
+        prefetched.append(list(pairs))
+
+    published = asyncio.run(make_scheduler(snapshot, prefetch).refresh())
+    assert published == len(PAIRS) * len(TIMEFRAMES)
+    assert prefetched == [PAIRS], "Market data prefetched once for all pairs"
+
+    signal = snapshot.get("GBP/JPY", "5m")
+    expected = generate_trading_signal("GBP/JPY", "5m", 1.2)
+    assert signal is not None and signal.action == expected.action
+    assert snapshot.get("GBP/JPY", "5m", now=time.time() + 300) is None, "Stale after candle close"
+    assert snapshot.get("AUD/CAD", "5m") is None
+    print("✓ Snapshot holds a fresh signal per pair x timeframe")
+
+
+def test_due_timeframes():
+    """Test: Only timeframes whose candle closes at the boundary are due"""
+    scheduler = make_scheduler(SignalSnapshot())
+    hour = 1_699_999_200          # a whole hour (UTC)
+    assert scheduler.due_timeframes(hour, TIMEFRAMES) == TIMEFRAMES
+    assert scheduler.due_timeframes(hour + 60, TIMEFRAMES) == ["1m"]
+    assert scheduler.due_timeframes(hour + 900, TIMEFRAMES) == ["1m", "3m", "5m", "15m"]
+    print("✓ Due timeframes follow candle boundaries")
+
+
+if __name__ == "__main__":
+    test_refresh_publishes_every_pair_and_timeframe()
+    test_due_timeframes()
+    print("\nAll precompute tests passed")
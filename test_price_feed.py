@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test file for price_feed.py
+Checks snapshot publishing and the simulator, replay and socket sources.
+Run: python test_price_feed.py
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from price_feed import PriceFeed, ReplaySource, SimulatedSource, SocketSource
+
+BASE = {"EUR/USD": 1.0850, "GBP/JPY": 190.50}
+
+
+def test_snapshot_is_replaced_not_mutated():
+    """Test: Readers holding a snapshot keep a consistent view across ticks"""
+    feed = PriceFeed(SimulatedSource(BASE, seed=1), initial=BASE)
+    before = feed.snapshot
+    assert feed.price("EUR/USD") == 1.0850 and feed.price("XAU/USD", 2.0) == 2.0
+
+    after = feed.apply({"EUR/USD": 1.09})
+    assert before.prices == BASE and before.version == 0, "Old snapshot untouched"
+    assert after.version == 1 and feed.price("EUR/USD") == 1.09 and feed.price("GBP/JPY") == 190.50
+    print("✓ Ticks publish a new snapshot; old readers are unaffected")
+
+
+def test_simulator_is_deterministic_and_isolated():
+    """Test: The simulator uses its own RNG and moves every pair"""
+    a = SimulatedSource(BASE, seed=7)
+    b = SimulatedSource(BASE, seed=7)
+    first = a.step()
+    assert first == b.step() and all(first[p] != BASE[p] for p in BASE)
+    print("✓ Simulator random walk is seeded per source")
+
+
+def test_replay_source_runs_through_feed():
+    """Test: Replayed rows sharing a timestamp arrive as one batch"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ticks.csv")
+        with open(path, "w") as f:
+            f.write("timestamp,pair,price\n100,EUR/USD,1.10\n100,GBP/JPY,191\n101,EUR/USD,1.11\nbad,row,x\n")
+
+        async def scenario():
+            feed = PriceFeed(ReplaySource(path, speed=0, loop=False), initial=BASE)
+            feed.start()
+            await asyncio.wait_for(feed._task, 5)
+            return feed
+
+        feed = asyncio.run(scenario())
+    assert feed.snapshot.version == 2
+    assert feed.price("EUR/USD") == 1.11 and feed.price("GBP/JPY") == 191.0
+    print("✓ Replay source applies grouped ticks in order")
+
+
+def test_socket_source_reconnects():
+    """Test: JSON lines are applied and a dropped feed is reconnected"""
+    async def scenario():
+        connections = []
+
+        async def serve(reader, writer):
+            connections.append(writer)
+            writer.write(b'{"EUR/USD": 1.2}\nnot json\n' if len(connections) == 1 else b'{"EUR/USD": 1.3}\n')
+            await writer.drain()
+            if len(connections) == 1:
+                writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        feed = PriceFeed(SocketSource("127.0.0.1", port), initial=BASE, restart_delay=0.01)
+        feed.start()
+        for _ in range(200):
+            if feed.price("EUR/USD") == 1.3:
+                break
+            await asyncio.sleep(0.01)
+        await feed.stop()
+        for writer in connections:
+            writer.close()
+        server.close()
+        await server.wait_closed()
+        return feed
+
+    feed = asyncio.run(scenario())
+    assert feed.price("EUR/USD") == 1.3 and feed.restarts == 1 and feed.snapshot.version == 2
+    print("✓ Socket feed applied, malformed lines skipped, reconnect after drop")
+
+
+if __name__ == "__main__":
+    test_snapshot_is_replaced_not_mutated()
+    test_simulator_is_deterministic_and_isolated()
+    test_replay_source_runs_through_feed()
+    test_socket_source_reconnects()
+    print("\nAll price feed tests passed")
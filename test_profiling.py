@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test file for profiling.py and the per-stage signal timers
+Run: python test_profiling.py
+"""
+
+import sys
+import os
+import pstats
+import tempfile
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from profiling import SignalProfiler
+from trading_logic import generate_trading_signal, generate_trading_signals_batch
+
+
+def test_signals_carry_stage_timings():
+    """Test: Single and batch signals report where their time went"""
+    signal = generate_trading_signal("EUR/USD", "1m", 1.0850)
+    assert set(signal.timings) == {"fetch", "convert", "indicators", "strategy"}
+    assert all(seconds >= 0 for seconds in signal.timings.values())
+
+    batch = generate_trading_signals_batch([("EUR/USD", "1m", 1.0850), ("GBP/JPY", "5m", 190.5)])
+    assert all(set(s.timings) == {"fetch", "indicators", "strategy"} for s in batch)
+    # timings are diagnostics, not part of the signal's identity
+    assert batch[0] == generate_trading_signal("EUR/USD", "1m", 1.0850)
+    print(f"✓ Stage timings attached: {', '.join(signal.timings)}")
+
+
+def test_sampled_profiles_are_aggregated():
+    """Test: 1 in N calls is profiled and the aggregate is written to disk"""
+    def work(n):
+        return sum(i * i for i in range(n))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = SignalProfiler(sample_every=3, output_dir=tmp, flush_every=2)
+        results = [profiler.call(work, 1000) for _ in range(12)]
+        assert results == [work(1000)] * 12
+        assert profiler.samples == 4
+        assert os.path.exists(profiler.path)
+
+        stats = pstats.Stats(profiler.path)
+        calls = [v[1] for k, v in stats.stats.items() if k[2] == "work"]
+        assert calls == [4], calls
+
+        disabled = SignalProfiler(sample_every=0, output_dir=tmp)
+        disabled.call(work, 10)
+        assert disabled.samples == 0 and disabled.flush() is None
+    print("✓ Every 3rd call profiled, 4 samples aggregated into one pstats file")
+
+
+if __name__ == "__main__":
+    test_signals_carry_stage_timings()
+    test_sampled_profiles_are_aggregated()
+    print("\nAll profiling tests passed")
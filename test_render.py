@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test file for render.py
+Checks prebuilt keyboards/texts per mode and template-formatted signals.
+Run: python test_render.py
+"""
+
+import sys
+import os
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from render import ModeRender, RenderCache
+from trading_logic import SignalAction, SignalResult, generate_trading_signal
+
+NORMAL = (["BTCUSD", "EUR/USD", "GBP/JPY"], ["1m", "3m", "5m", "10m"])
+OTC = (["BTCUSD", "EUR/USD OTC", "GBP/JPY OTC"], ["5s", "10s", "15s"])
+
+
+def reference_format(signal) -> str:
+    """The pre-template implementation, kept as the expected output"""
+    action = signal.action.value
+    confidence = signal.confidence
+    marker = "🟢" if confidence >= 75 else "🟡" if confidence >= 50 else "🔴"
+    lines = [
+        f"*Pair:* {signal.pair} | *Timeframe:* {signal.timeframe}",
+        f"*Signal:* {action}",
+        f"*Confidence:* {confidence}% {marker}",
+        "",
+        f"*Analysis:*\n{signal.reasoning}",
+        f"\n*Key Levels:*\nS: {signal.support:.6f} | R: {signal.resistance:.6f}",
+    ]
+    return "\n".join(lines)
+
+
+def test_keyboards_and_texts_per_mode():
+    """Test: Each mode has its own prebuilt keyboards; activate swaps them"""
+    cache = RenderCache({"NORMAL": NORMAL, "OTC": OTC}, active="NORMAL")
+    normal = cache.current
+    rows = normal.pair_keyboard.inline_keyboard
+    assert [[b.callback_data for b in row] for row in rows] == [["pair_BTCUSD", "pair_EUR/USD"], ["pair_GBP/JPY"]]
+    assert [len(row) for row in normal.timeframe_keyboard.inline_keyboard] == [3, 1]
+    assert "🟢 NORMAL" in normal.start_text
+    assert normal.pair_texts["EUR/USD"].startswith("✅ *Selected Pair:* EUR/USD")
+
+    otc = cache.activate("OTC")
+    assert cache.current is otc and cache.switches == 1
+    assert "🟠 OTC" in otc.start_text and "EUR/USD" not in otc.pair_set
+    assert cache.activate("OTC") is otc and cache.switches == 1
+    # the same objects are handed out on every click
+    assert cache.get("NORMAL").pair_keyboard is normal.pair_keyboard
+    print("✓ Keyboards and texts prebuilt per mode and swapped on switch")
+
+
+def test_signal_templates_match_reference():
+    """Test: Template formatting is identical to the original formatter"""
+    render = ModeRender.build("NORMAL", *NORMAL)
+    for pair, tf, price in [("EUR/USD", "5m", 1.085), ("GBP/JPY", "1m", 190.5), ("AUD/CAD", "1h", 0.91)]:
+        signal = generate_trading_signal(pair, tf, price)
+        assert render.format_signal(signal) == reference_format(signal), pair
+
+    wait = SignalResult(SignalAction.WAIT, 10, "3m", "EUR/USD", 1.0, 0.99, 1.01, "Flat market", "Wait for setup")
+    assert render.format_signal(wait) == reference_format(wait)
+    assert render.generating_text("EUR/USD", "1m") == "⏳ Generating signal for EUR/USD (1m)..."
+    print("✓ Template-formatted signals match the original output")
+
+
+if __name__ == "__main__":
+    test_keyboards_and_texts_per_mode()
+    test_signal_templates_match_reference()
+    print("\nAll render tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test file for resampler.py
+Compares incrementally resampled bars against a brute-force aggregation.
+Run: python test_resampler.py
+"""
+
+import sys
+import os
+import random
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from candle_store import CandleStoreRegistry
+from resampler import TimeframeResampler, TIMEFRAME_SECONDS
+
+
+def make_base_records(count, start=1_700_000_000, seed=7):
+    rng = random.Random(seed)
+    price = 1.0850
+    records = []
+    for i in range(count):
+        open_ = price
+        price *= 1 + rng.gauss(0, 0.0005)
+        records.append({
+            "timestamp": start + i * 5,
+            "open": open_,
+            "high": max(open_, price) * (1 + rng.random() * 0.0003),
+            "low": min(open_, price) * (1 - rng.random() * 0.0003),
+            "close": price,
+        })
+    return records
+
+
+def aggregate(records, secs):
+    bars = {}
+    for rec in records:
+        start = rec["timestamp"] - rec["timestamp"] % secs
+        bar = bars.get(start)
+        if bar is None:
+            bars[start] = [rec["open"], rec["high"], rec["low"], rec["close"]]
+        else:
+            bar[1] = max(bar[1], rec["high"])
+            bar[2] = min(bar[2], rec["low"])
+            bar[3] = rec["close"]
+    return [(ts, *bar) for ts, bar in sorted(bars.items())]
+
+
+def stored_bars(store):
+    view = store.view()
+    return list(zip(*(col.tolist() for col in view)))
+
+
+def test_resampled_bars_match_aggregation():
+    """Test: Every derived timeframe equals a full aggregation of base candles"""
+    records = make_base_records(1500)
+    stores = CandleStoreRegistry(capacity=2000)
+    resampler = TimeframeResampler(stores)
+
+    # feed in uneven chunks, like repeated provider polls
+    for i in range(0, len(records), 37):
+        resampler.ingest("EUR/USD", records[:i + 37])
+
+    for tf, secs in TIMEFRAME_SECONDS.items():
+        assert stored_bars(stores.get("EUR/USD", tf)) == aggregate(records, secs), f"Mismatch on {tf}"
+    print("✓ All timeframes match brute-force aggregation")
+
+
+def test_forming_candle_revisions():
+    """Test: Revising the forming base candle updates derived bars exactly"""
+    records = make_base_records(100, seed=11)
+    stores = CandleStoreRegistry()
+    resampler = TimeframeResampler(stores, timeframes=["1m", "5m"])
+
+    resampler.ingest("GBP/USD", records)
+    final = dict(records[-1], high=records[-1]["high"] * 1.01, close=records[-1]["close"] * 1.005)
+    # a spike that is later revised away must not leave a stale high behind
+    spike = dict(records[-1], high=records[-1]["high"] * 1.05)
+    resampler.ingest("GBP/USD", [spike])
+    resampler.ingest("GBP/USD", [final])
+
+    expected = records[:-1] + [final]
+    for tf in ("1m", "5m"):
+        assert stored_bars(stores.get("GBP/USD", tf)) == aggregate(expected, TIMEFRAME_SECONDS[tf])
+    print("✓ Forming candle revisions are folded exactly")
+
+
+def test_refresh_fetches_base_timeframe_once():
+    """Test: refresh asks the provider for the base timeframe only, throttled"""
+    records = make_base_records(50)
+    calls = []
+
+    def fetch(pair, timeframe):
+        calls.append((pair, timeframe))
+        return records
+
+    resampler = TimeframeResampler(CandleStoreRegistry())
+    assert resampler.refresh("EUR/USD", fetch)
+    assert resampler.refresh("EUR/USD", fetch)
+    assert calls == [("EUR/USD", "5s")], "Second refresh within 5s must not refetch"
+    assert not resampler.refresh("USD/JPY", lambda pair, tf: [])
+    print("✓ Refresh fetches one base series per pair")
+
+
+if __name__ == "__main__":
+    test_resampled_bars_match_aggregation()
+    test_forming_candle_revisions()
+    test_refresh_fetches_base_timeframe_once()
+    print("\nAll resampler tests passed")
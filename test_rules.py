@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test file for rules.py
+Checks first-match evaluation of rule tables, table validation, and that
+the strategy tables pick the same rule per row in scalar and vector mode.
+Run: python test_rules.py
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from rules import Condition, Rule, compile_rules
+from trading_logic import (
+    SHORT_STRATEGY,
+    ULTRA_SHORT_STRATEGY,
+    SIGNAL_CONDITIONS,
+    StrategyParams,
+    _apply_strategy,
+    apply_strategy_arrays,
+    build_indicators,
+    indicator_masks,
+)
+
+# toy conditions over plain numbers
+NUMBERS = {
+    "positive": Condition(lambda x, p: x > 0, lambda v, m, p: v["x"] > 0),
+    "even": Condition(lambda x, p: x % 2 == 0, lambda v, m, p: v["x"] % 2 == 0),
+    "big": Condition(lambda x, p: x > p, lambda v, m, p: v["x"] > p),
+}
+
+
+def random_values(rows, seed):
+    """Indicator arrays spread across every threshold, with exact ties on RSI"""
+    rng = np.random.default_rng(seed)
+    rsi = rng.uniform(0, 100, rows)
+    rsi[::7] = rng.choice([35.0, 40.0, 50.0, 60.0, 65.0], len(rsi[::7]))
+    return {
+        "sma_fast": 1 + rng.uniform(-0.01, 0.01, rows),
+        "sma_slow": np.ones(rows),
+        "ema_fast": 1 + rng.uniform(-0.003, 0.003, rows),
+        "ema_slow": np.ones(rows),
+        "atr": rng.uniform(0, 0.008, rows),
+        "avg_price": np.ones(rows),
+        "rsi": rsi,
+        "support": 1 - rng.uniform(0, 0.002, rows),
+        "resistance": 1 + rng.uniform(0, 0.002, rows),
+        "last_close": 1 + rng.uniform(-0.005, 0.005, rows),
+    }
+
+
+def test_first_match_wins():
+    """Test: Both evaluators pick the first matching rule, else the default"""
+    table = compile_rules("numbers", [
+        Rule("big-even", ("big", "even")),
+        Rule("positive", ("positive",)),
+        Rule("even", ("even",)),
+        Rule("other"),
+    ], NUMBERS)
+    xs = np.arange(-6, 13)
+    expected = ["big-even" if x > 8 and x % 2 == 0 else "positive" if x > 0 else "even" if x % 2 == 0
+                else "other" for x in xs]
+    assert [table.decide(int(x), 8).action for x in xs] == expected
+    index = table.decide_arrays({"x": xs}, {}, 8)
+    assert [table.rules[i].action for i in index] == expected
+    print(f"✓ Scalar and vector evaluation agree on {len(xs)} inputs")
+
+
+def test_invalid_tables_rejected():
+    """Test: Tables with unreachable rules or unknown names do not compile"""
+    bad_tables = [
+        [Rule("a", ("positive",))],                        # no default
+        [Rule("a"), Rule("b")],                            # default shadows a rule
+        [Rule("a", ("negative",)), Rule("b")],             # unknown condition
+        [Rule("a", ("positive",), confidence="max"), Rule("b")],
+    ]
+    for rules in bad_tables:
+        try:
+            compile_rules("bad", rules, NUMBERS)
+            raise AssertionError(f"Table must be rejected: {rules}")
+        except ValueError:
+            pass
+    try:
+        compile_rules("codes", [Rule("a", ("even",)), Rule("b")], NUMBERS, codes={"a": 1})
+        raise AssertionError("Actions without a code must be rejected")
+    except ValueError:
+        pass
+    print(f"✓ {len(bad_tables) + 1} invalid tables rejected")
+
+
+def test_strategy_tables_scalar_matches_vector():
+    """Test: Per row, the scalar strategies and apply_strategy_arrays pick the same rule"""
+    rows = 3000
+    prices = 1 + np.random.default_rng(7).uniform(-0.002, 0.002, rows)
+    exercised = {SHORT_STRATEGY.name: set(), ULTRA_SHORT_STRATEGY.name: set()}
+    param_sets = (
+        StrategyParams(),
+        # rsi_bullish under 50 makes the ultra-short default reachable
+        StrategyParams(trend_band=0.0005, rsi_bullish=45, rsi_oversold=30, rsi_overbought=55),
+        # oversold/overbought overlapping the momentum bands reach STRONG BUY/SELL
+        StrategyParams(rsi_oversold=70, rsi_overbought=30),
+    )
+    for seed, params in enumerate(param_sets):
+        values = random_values(rows, seed)
+        masks = indicator_masks(values, params)
+        for strategy, timeframe in ((SHORT_STRATEGY, "5m"), (ULTRA_SHORT_STRATEGY, "10s")):
+            index = strategy.decide_arrays(values, masks, params)
+            action, confidence = apply_strategy_arrays(values, masks, timeframe, prices, params)
+            for i in range(rows):
+                indicators = build_indicators(**{k: float(v[i]) for k, v in values.items()}, params=params)
+                rule = strategy.decide(indicators, params)
+                assert strategy.rules[index[i]] is rule, (strategy, i)
+                signal = _apply_strategy(indicators, "EUR/USD", timeframe, float(prices[i]), params)
+                assert (signal.action, signal.entry_time) == (rule.action, rule.entry_time)
+                assert (int(action[i]), int(confidence[i])) == (strategy.codes[index[i]], signal.confidence)
+            exercised[strategy.name].update(index.tolist())
+    for strategy in (SHORT_STRATEGY, ULTRA_SHORT_STRATEGY):
+        assert len(exercised[strategy.name]) == len(strategy.rules), f"Every {strategy.name} rule is exercised"
+    print(f"✓ {len(SIGNAL_CONDITIONS)} conditions, every rule of both tables agrees on "
+          f"{rows} rows x {len(param_sets)} parameter sets")
+
+
+if __name__ == "__main__":
+    test_first_match_wins()
+    test_invalid_tables_rejected()
+    test_strategy_tables_scalar_matches_vector()
+    print("\nAll rule engine tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test file for session_store.py
+Checks TTL expiry, LRU eviction and footprint reporting.
+Run: python test_session_store.py
+"""
+
+import sys
+import os
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from session_store import Session, SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry():
+    """Test: Idle sessions expire, active ones are refreshed"""
+    clock = FakeClock()
+    store = SessionStore(max_size=10, ttl=60, clock=clock)
+    store.start(1).pair = "EUR/USD"
+    store.start(2)
+
+    clock.now += 45
+    assert store.get(1).pair == "EUR/USD"      # touch refreshes user 1
+    clock.now += 30
+    assert store.get(2) is None                # 75s idle
+    assert 1 in store and len(store) == 1
+
+    clock.now += 61
+    assert store.purge_expired() == 1 and len(store) == 0
+    assert store.stats()["expirations"] == 2
+    print("✓ Sessions expire after the idle TTL")
+
+
+def test_lru_eviction_and_footprint():
+    """Test: The store never exceeds max_size and drops the least recent user"""
+    clock = FakeClock()
+    store = SessionStore(max_size=3, ttl=3600, clock=clock)
+    for user_id in range(1, 4):
+        store.start(user_id)
+        clock.now += 1
+    store.get(1)                               # 2 is now least recent
+    store.start(4)
+    assert len(store) == 3
+    assert store.get(2) is None and store.get(1) is not None
+    assert store.stats()["evictions"] == 1
+    assert "nbytes" not in store.stats(), "stats() stays O(1); nbytes() is on demand"
+
+    assert not hasattr(Session(0.0), "__dict__"), "Sessions are slot records"
+    big = SessionStore(max_size=10_000)
+    for user_id in range(10_000):
+        big.start(user_id).pair = "EUR/USD"
+    per_session = big.nbytes() / len(big)
+    assert per_session < 250, per_session
+    print(f"✓ LRU eviction keeps 3 sessions; ~{per_session:.0f} B per session")
+
+
+if __name__ == "__main__":
+    test_ttl_expiry()
+    test_lru_eviction_and_footprint()
+    print("\nAll session store tests passed")
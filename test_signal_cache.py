@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test file for signal_cache.py
+Checks candle-boundary expiry, LRU eviction and hit/miss counters.
+Run: python test_signal_cache.py
+"""
+
+import sys
+import os
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from signal_cache import SignalCache
+from trading_logic import generate_trading_signal
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_expires_at_candle_close():
+    """Test: An entry is served until the candle closes, then misses"""
+    clock = FakeClock(1_700_000_020.0)   # 40s into a 1m candle
+    cache = SignalCache(clock=clock)
+    signal = generate_trading_signal("EUR/GBP", "1m", 0.8580)
+    cache.put("EUR/GBP", "1m", signal)
+
+    clock.now += 19.9
+    hit = cache.get("EUR/GBP", "1m")
+    assert hit is not None and hit.reasoning == signal.reasoning
+    assert hit is not signal, "Hits return a copy with a fresh entry_instruction"
+
+    clock.now += 0.1                     # next candle opens
+    assert cache.get("EUR/GBP", "1m") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    print("✓ Entries expire exactly at candle close")
+
+
+def test_lru_eviction():
+    """Test: Size is bounded and the least recently used entry goes first"""
+    cache = SignalCache(max_size=2, clock=FakeClock(1_700_000_000.0))
+    for pair in ("EUR/USD", "GBP/USD"):
+        cache.put(pair, "5m", generate_trading_signal(pair, "5m", 1.2))
+    cache.get("EUR/USD", "5m")
+    cache.put("USD/JPY", "5m", generate_trading_signal("USD/JPY", "5m", 149.5))
+
+    assert len(cache) == 2
+    assert cache.get("GBP/USD", "5m") is None, "LRU entry should be evicted"
+    assert cache.get("EUR/USD", "5m") is not None
+    assert cache.stats()["evictions"] == 1
+    print("✓ LRU eviction bounds the cache")
+
+
+if __name__ == "__main__":
+    test_expires_at_candle_close()
+    test_lru_eviction()
+    print("\nAll signal cache tests passed")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test file for single_flight.py
+Checks that concurrent identical requests share one computation.
+Run: python test_single_flight.py
+"""
+
+import sys
+import os
+import asyncio
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from single_flight import SingleFlight
+
+
+def test_burst_shares_one_computation():
+    """Test: 500 concurrent callers for one key run the function once"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "signal"
+
+    async def burst():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do(("EUR/USD", "1m"), compute) for _ in range(500)))
+        return flights, results
+
+    flights, results = asyncio.run(burst())
+    assert results == ["signal"] * 500
+    assert len(calls) == 1
+    assert flights.stats() == {"started": 1, "coalesced": 499, "in_flight": 0}
+    print("✓ Burst of 500 callers shared a single computation")
+
+
+def test_errors_and_cancellation():
+    """Test: Errors reach every waiter; a cancelled caller does not cancel the work"""
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def scenario():
+        flights = SingleFlight()
+        outcomes = await asyncio.gather(
+            flights.do("k", failing), flights.do("k", failing), return_exceptions=True
+        )
+        assert all(isinstance(o, RuntimeError) for o in outcomes)
+
+        first = asyncio.ensure_future(flights.do("s", slow))
+        second = asyncio.ensure_future(flights.do("s", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 42
+        # the key is free again once the computation finished
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
+    print("✓ Errors propagate and cancellation is isolated")
+
+
+if __name__ == "__main__":
+    test_burst_shares_one_computation()
+    test_errors_and_cancellation()
+    print("\nAll single-flight tests passed")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test file for subscriptions.py
+Checks the (pair, timeframe) index, persistence, fan-out outcomes
+and the /subscribe -> candle-close fan-out path of the bot.
+Run: python test_subscriptions.py
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from telegram import Update
+from telegram.error import BadRequest, Forbidden
+
+from loadtest import FakeBotAPI, command_update
+from persistence import SQLitePersistence
+from subscriptions import SubscriptionRegistry, broadcast
+
+
+def test_registry_index_and_persistence():
+    """Test: Subscribers are indexed by (pair, timeframe) and survive restarts"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLitePersistence(os.path.join(tmp, "bot.db"))
+        registry = SubscriptionRegistry(max_per_chat=2, persistence=db)
+        assert registry.subscribe(1, "EUR/USD", "5m") and registry.subscribe(2, "EUR/USD", "5m")
+        assert registry.subscribe(1, "GBP/JPY", "1m")
+        assert not registry.subscribe(1, "EUR/USD", "5m"), "Duplicate"
+        try:
+            registry.subscribe(1, "USD/JPY", "1h")
+            raise AssertionError("Limit not enforced")
+        except ValueError:
+            pass
+        assert sorted(registry.subscribers("EUR/USD", "5m")) == [1, 2]
+        assert registry.subscribers("EUR/USD", "1m") == ()
+
+        assert registry.unsubscribe(2, "EUR/USD", "5m") == 1
+        db.flush()
+        db.close()
+
+        restored = SubscriptionRegistry(persistence=SQLitePersistence(os.path.join(tmp, "bot.db")))
+        assert restored.load() == 2
+        assert restored.of_chat(1) == [("EUR/USD", "5m"), ("GBP/JPY", "1m")]
+        assert restored.unsubscribe(1) == 2 and len(restored) == 0 and restored.keys() == []
+        restored.persistence.close()
+    print("✓ Index, per-chat limit and persistence round trip")
+
+
+def test_broadcast_reports_blocked_chats():
+    """Test: Blocked chats are reported, other failures only counted"""
+    async def scenario():
+        blocked = []
+
+        async def send(chat_id, text, **kwargs):
+            if chat_id == 2:
+                raise Forbidden("bot was blocked by the user")
+            if chat_id == 3:
+                raise BadRequest("Can't parse entities")
+            return True
+
+        counts = await broadcast(send, [1, 2, 3, 4], "hi", on_blocked=blocked.append)
+        return counts, blocked
+
+    counts, blocked = asyncio.run(scenario())
+    assert counts == {"sent": 2, "blocked": 1, "failed": 1} and blocked == [2]
+    print("✓ Fan-out outcomes counted; only blocked chats unsubscribed")
+
+
+def test_subscribe_command_and_candle_close_fanout():
+    """Test: /subscribe registers the chat and a candle close pushes one message per subscriber"""
+    import signal_bot
+    from trading_logic import generate_trading_signal
+
+    async def scenario():
+        api = FakeBotAPI()
+        app = signal_bot.build_application("123456:SUBTEST", base_url=await api.start())
+        await app.initialize()
+        await app.post_init(app)
+        await app.start()
+        try:
+            for update_id, chat in enumerate((501, 502, 503)):
+                raw = command_update(update_id, chat, "/subscribe eur/usd otc 5M")
+                await app.process_update(Update.de_json(raw, app.bot))
+            await app.process_update(Update.de_json(command_update(9, 503, "/unsubscribe EUR/USD OTC 5m"), app.bot))
+            assert sorted(signal_bot.subscriptions.subscribers("EUR/USD OTC", "5m")) == [501, 502]
+
+            signal = generate_trading_signal("EUR/USD OTC", "5m", 1.085)
+            replies = api.calls.get("sendMessage", 0)
+            delivery = await signal_bot.broadcast_candle_close(
+                app.bot, {("EUR/USD OTC", "5m"): signal, ("GBP/JPY", "1m"): signal}
+            )
+            results = await asyncio.wait_for(delivery, 5)
+            assert results == [{"sent": 2, "blocked": 0, "failed": 0}], results
+            return api.calls["sendMessage"] - replies
+        finally:
+            signal_bot.subscriptions.unsubscribe(501)
+            signal_bot.subscriptions.unsubscribe(502)
+            await app.stop()
+            await app.post_shutdown(app)
+            await app.shutdown()
+            await api.stop()
+
+    pushed = asyncio.run(scenario())
+    assert pushed == 2, pushed
+    print("✓ /subscribe + candle close -> one push per subscribed chat")
+
+
+if __name__ == "__main__":
+    test_registry_index_and_persistence()
+    test_broadcast_reports_blocked_chats()
+    test_subscribe_command_and_candle_close_fanout()
+    print("\nAll subscription tests passed")
@@ -7,13 +7,27 @@ Run: python test_trading_logic.py
 
 import sys
 import os
+import json
+import subprocess
+import tempfile
 
 # Add project root to path
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from trading_logic import generate_trading_signal, SignalAction
+from trading_logic import (
+    generate_trading_signal,
+    generate_trading_signals_batch,
+    SignalAction,
+    Candle,
+    IndicatorEngine,
+    StrategyParams,
+    StreamingIndicators,
+    build_indicators,
+    calculate_indicators,
+    simulate_price_history,
+)
 
 
 def print_signal(signal):
@@ -234,6 +248,131 @@ def test_consistent_output():
         print("✓ WAIT message properly formatted")
 
 
+def test_streaming_indicators_match_full_history():
+    """Test: Streaming engine reproduces calculate_indicators candle by candle"""
+    print("\n" + "█"*60)
+    print("TEST 11: Streaming Indicator Engine")
+    print("█"*60)
+    
+    candles = simulate_price_history(1.0850, 120, 0.001, "uptrend")
+    stream = StreamingIndicators()
+    for i, candle in enumerate(candles):
+        stream.push(candle)
+        assert stream.snapshot() == calculate_indicators(candles[:i + 1]), f"Mismatch at candle {i}"
+    
+    # a forming candle can be replaced without disturbing earlier state
+    revised = Candle(open=candles[-1].open, high=candles[-1].high * 1.002,
+                     low=candles[-1].low, close=candles[-1].close * 1.001)
+    stream.replace_last(revised)
+    assert stream.snapshot() == calculate_indicators(candles[:-1] + [revised])
+    print("✓ Streaming snapshots identical to full recomputation")
+    
+    # past the CandleStore window the volatility reference price is the
+    # window's mean, as calculate_indicators over the stored candles sees it
+    window = StreamingIndicators.AVG_WINDOW
+    candles = simulate_price_history(1.0850, window * 3, 0.001, "uptrend", seed=11)
+    stream = StreamingIndicators()
+    labels = ("trend", "volatility_level", "momentum_signal", "pullback_detected")
+    for i, candle in enumerate(candles):
+        stream.push(candle)
+        if i % 10 == 0:
+            stream.replace_last(candle)
+        if i >= window - 1 and i % 7 == 0:
+            streamed = stream.snapshot()
+            stored = calculate_indicators(candles[i + 1 - window:i + 1])
+            for name in labels:
+                assert getattr(streamed, name) == getattr(stored, name), f"{name} differs at candle {i}"
+            assert abs(streamed.ema_slow - stored.ema_slow) < 1e-9
+    print(f"✓ Streaming classification matches the {window}-candle store window")
+    
+    # engine only consumes records newer than the last timestamp
+    engine = IndicatorEngine()
+    records = [
+        {"timestamp": i * 60, "open": c.open, "high": c.high, "low": c.low, "close": c.close}
+        for i, c in enumerate(candles)
+    ]
+    assert engine.update("EUR/USD", "1m", records[:3]) is None, "Needs at least 5 candles"
+    engine.update("EUR/USD", "1m", records[:60])
+    result = engine.update("EUR/USD", "1m", records)
+    assert result == calculate_indicators(candles)
+    assert engine.update("EUR/USD", "1m", records) == result, "Replayed records must be ignored"
+    print("✓ Engine ingests only new candles")
+
+
+def test_batch_matches_single():
+    """Test: Vectorized batch API agrees with per-request generation"""
+    print("\n" + "█"*60)
+    print("TEST 12: Batch Signal Generation")
+    print("█"*60)
+    
+    pairs = [("CAD/JPY", 90.25), ("GBP/JPY", 190.50), ("EUR/GBP", 0.8580),
+             ("USD/CNH", 7.14), ("AUD/CAD", 0.9100), ("EUR/JPY", 162.50)]
+    timeframes = ["5s", "15s", "1m", "5m", "1h"]
+    requests = [(pair, tf, price) for pair, price in pairs for tf in timeframes]
+    requests.append(("CAD/JPY", "2h", 90.25))
+    
+    batch = generate_trading_signals_batch(requests)
+    assert len(batch) == len(requests), "One result per request"
+    for (pair, tf, price), signal in zip(requests, batch):
+        single = generate_trading_signal(pair, tf, price)
+        assert (signal.pair, signal.timeframe) == (pair, tf)
+        assert signal.action == single.action, f"{pair} {tf}: {signal.action} != {single.action}"
+        assert signal.confidence == single.confidence
+        assert abs(signal.support - single.support) < 1e-9 * price
+        assert abs(signal.resistance - single.resistance) < 1e-9 * price
+    print(f"✓ {len(requests)} batch signals match single-request results")
+
+
+def test_strategy_params():
+    """Test: Parameters drive the indicators and thresholds, and load from STRATEGY_CONFIG"""
+    print("\n" + "█"*60)
+    print("TEST 13: Strategy Parameters")
+    print("█"*60)
+    
+    # fast EMA 0.05% above the slow one: FLAT by default, UP with a narrower band
+    values = dict(sma_fast=1.0, sma_slow=1.0, ema_fast=1.0005, ema_slow=1.0, atr=0.003,
+                  avg_price=1.0, rsi=55, support=0.99, resistance=1.01, last_close=1.0)
+    assert build_indicators(**values).trend == "FLAT"
+    narrow = build_indicators(**values, params=StrategyParams(trend_band=0.0002))
+    assert narrow.trend == "UP"
+    assert build_indicators(**values, params=StrategyParams(rsi_bullish=50)).momentum_signal == "BULLISH"
+    print("✓ Thresholds come from the parameters")
+    
+    params = StrategyParams(ema_fast=3, ema_slow=12)
+    candles = simulate_price_history(1.0850, 80, 0.001, "downtrend", seed=3)
+    stream = StreamingIndicators(params)
+    for i, candle in enumerate(candles):
+        stream.push(candle)
+        assert stream.snapshot() == calculate_indicators(candles[:i + 1], params), f"Mismatch at candle {i}"
+    assert calculate_indicators(candles, params).ema_fast != calculate_indicators(candles).ema_fast
+    print("✓ Streaming engine honours custom EMA periods")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "strategy.json")
+        params.save(path, win_rate=0.61)
+        assert StrategyParams.load(path) == params
+        env = dict(os.environ, STRATEGY_CONFIG=path)
+        out = subprocess.run(
+            [sys.executable, "-c", "import trading_logic; print(trading_logic.strategy_params.ema_slow)"],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        assert out.strip() == "12", out
+        
+        with open(path, "w") as f:
+            json.dump({"ema_fast": 5, "ema_medium": 9}, f)
+        try:
+            StrategyParams.load(path)
+            raise AssertionError("Unknown parameter names must be rejected")
+        except ValueError:
+            pass
+    try:
+        StrategyParams(atr_medium=0.6, atr_high=0.5)
+        raise AssertionError("Inconsistent thresholds must be rejected")
+    except ValueError:
+        pass
+    print("✓ Config files round-trip and load through STRATEGY_CONFIG")
+
+
 def run_all_tests():
     """Run all test cases"""
     print("\n\n")
@@ -255,6 +394,9 @@ def run_all_tests():
         ("All Timeframes", test_all_timeframes),
         ("Invalid Input Handling", test_invalid_inputs),
         ("Output Format", test_consistent_output),
+        ("Streaming Indicators", test_streaming_indicators_match_full_history),
+        ("Batch Signals", test_batch_matches_single),
+        ("Strategy Parameters", test_strategy_params),
     ]
     
     passed = 0
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test file for webhook.py
+Checks request validation, update receipt timing, setup failure cleanup
+and per-user ordering of concurrent updates.
+Run: python test_webhook.py
+"""
+
+import sys
+import os
+import asyncio
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import httpx
+from telegram import Update
+
+from loadtest import callback_update, command_update
+from webhook import (
+    SECRET_HEADER,
+    PerUserUpdateProcessor,
+    TimedUpdateQueue,
+    WebhookConfig,
+    WebhookServer,
+    start_webhook,
+)
+
+
+def test_server_validates_and_enqueues():
+    """Test: Only well-formed POSTs with the secret reach the update queue"""
+    async def scenario():
+        queue = TimedUpdateQueue(mode="webhook")
+        server = WebhookServer(queue, bot=None, url_path="telegram", secret_token="s3cret")
+        port = await server.start("127.0.0.1", 0)
+        good = {SECRET_HEADER: "s3cret"}
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            assert (await client.post("/telegram", json=command_update(1, 5, "/start"), headers=good)).status_code == 200
+            assert (await client.post("/telegram", json=command_update(2, 5, "/start"))).status_code == 403
+            assert (await client.post("/other", json={}, headers=good)).status_code == 404
+            assert (await client.post("/telegram", content=b"{nope", headers=good)).status_code == 400
+        await server.stop()
+
+        assert queue.qsize() == 1 and server.received == 1 and server.rejected == 2
+        update = queue.get_nowait()
+        assert update.message.text == "/start"
+        latency = queue.handler_started(update)
+        assert latency is not None and latency >= 0
+        assert queue.handler_started(update) is None, "Latency is recorded once"
+
+    asyncio.run(scenario())
+    print("✓ Webhook accepts valid updates and rejects bad secret/path/body")
+
+
+def test_failed_registration_releases_port():
+    """Test: If set_webhook fails the server is stopped and the error raised"""
+    class Bot:
+        async def set_webhook(self, **kwargs):
+            raise RuntimeError("unauthorized")
+
+    class App:
+        update_queue = TimedUpdateQueue()
+        bot = Bot()
+
+    async def scenario():
+        config = WebhookConfig(url="https://example.invalid", listen="127.0.0.1", port=0)
+        try:
+            await start_webhook(App(), config)
+            assert False, "expected failure"
+        except RuntimeError:
+            pass
+
+    asyncio.run(scenario())
+    print("✓ Failed registration raises (caller falls back to polling)")
+
+
+def test_updates_sequential_per_user():
+    """Test: Different users run concurrently, one user's updates run in order"""
+    async def scenario():
+        processor = PerUserUpdateProcessor(8)
+        running = {}
+        peak = {"all": 0}
+        handled = []
+
+        async def handler(user_id, update_id):
+            running[user_id] = running.get(user_id, 0) + 1
+            peak[user_id] = max(peak.get(user_id, 0), running[user_id])
+            peak["all"] = max(peak["all"], sum(running.values()))
+            await asyncio.sleep(0.01)
+            handled.append((user_id, update_id))
+            running[user_id] -= 1
+
+        raw = [callback_update(i, user_id, "pair_EUR/USD") for i, user_id in enumerate([1, 2, 1, 3, 1, 2])]
+        updates = [Update.de_json(r, None) for r in raw]
+        await asyncio.gather(*(
+            processor.process_update(u, handler(u.effective_user.id, u.update_id)) for u in updates
+        ))
+        return processor, peak, handled
+
+    processor, peak, handled = asyncio.run(scenario())
+    assert peak[1] == peak[2] == peak[3] == 1, "A user's updates never overlap"
+    assert peak["all"] == 3, "Different users run concurrently"
+    assert [u for user, u in handled if user == 1] == [0, 2, 4], "Per-user arrival order is kept"
+    assert processor.users_in_flight == 0, "Idle users are forgotten"
+    print("✓ Updates run concurrently across users and in order per user")
+
+
+if __name__ == "__main__":
+    test_server_validates_and_enqueues()
+    test_failed_registration_releases_port()
+    test_updates_sequential_per_user()
+    print("\nAll webhook tests passed")
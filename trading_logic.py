@@ -12,11 +12,26 @@ Key Features:
 - Returns "WAIT / NO SIGNAL" for weak conditions
 """
 
+import json
 import logging
-from typing import Optional, Dict, Tuple, List
-from dataclasses import dataclass
+import os
+from typing import Any, Optional, Dict, Tuple, List
+from dataclasses import asdict, dataclass, field, fields
 from enum import Enum
 import math
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import vector_indicators
+from candle_store import CandleStoreRegistry, candle_stores
+from metrics import metrics
+from profiling import signal_profiler
+from resampler import resampler
+from rules import Condition, Rule, compile_rules
 
 # new import for real market data
 try:
@@ -28,6 +43,16 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+SIGNAL_STAGE_SECONDS = metrics.histogram(
+    "signal_stage_seconds",
+    "generate_trading_signal time per stage (fetch, convert, indicators, strategy)",
+    ["stage"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# timeframes served by generate_signal_ultra_short (the rest use generate_signal_short)
+ULTRA_SHORT_TIMEFRAMES = ("5s", "10s", "15s", "30s")
+
 
 # ===== Signal Types =====
 class SignalAction(Enum):
@@ -61,165 +86,310 @@ class TechnicalIndicators:
     resistance: float        # Resistance level
 
 
-def generate_signal_short(
-    indicators: TechnicalIndicators,
-    pair: str,
-    timeframe: str,
-    current_price: float
-) -> SignalResult:
+@dataclass(frozen=True)
+class StrategyParams:
     """
-    Signal logic for short timeframes: 1m, 3m, 5m
-    Strategy: Trend + Pullback + Momentum confirmation
+    Tunable indicator periods and strategy thresholds.
 
-    Entry conditions:
-    - Clear trend (EMA alignment)
-    - Pullback to trend line for entry
-    - Momentum confirms trend direction
-    - Volatility not extreme (not risky)
+    The defaults are the values the strategies were written with. The bot
+    loads overrides from the JSON file named by STRATEGY_CONFIG (as
+    written by param_sweep.py); functions below use the shared
+    ``strategy_params`` unless given their own.
     """
-    # Reject flat/choppy markets
-    if indicators.trend == "FLAT":
-        return SignalResult(
-            action=SignalAction.WAIT,
-            confidence=0,
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning="No clear trend. Market is trading sideways.",
-            entry_time="Wait for breakout",
-            entry_instruction=determine_entry_instruction(timeframe)
-        )
+    ema_fast: int = 5               # EMA periods for trend detection
+    ema_slow: int = 20
+    trend_band: float = 0.001       # fast EMA this fraction above/below slow = UP/DOWN
+    atr_medium: float = 0.2         # ATR as % of price above which volatility is MEDIUM
+    atr_high: float = 0.5           # ... and HIGH
+    rsi_bullish: float = 60         # momentum thresholds
+    rsi_bearish: float = 40
+    rsi_oversold: float = 35        # ultra-short STRONG BUY / SELL levels
+    rsi_overbought: float = 65
+    sr_bounce: float = 0.001        # price within this fraction of support/resistance
 
-    # Reject extremely high volatility (too risky)
-    if indicators.volatility_level == "HIGH":
-        return SignalResult(
-            action=SignalAction.WAIT,
-            confidence=0,
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning="Volatility too high. Market is risky and unstable.",
-            entry_time="Wait for stabilization",
-            entry_instruction=determine_entry_instruction(timeframe)
-        )
+    def __post_init__(self) -> None:
+        if self.ema_fast < 1 or self.ema_slow < 1:
+            raise ValueError("EMA periods must be positive")
+        if self.trend_band < 0 or self.sr_bounce < 0:
+            raise ValueError("trend_band and sr_bounce must not be negative")
+        if self.atr_medium > self.atr_high:
+            raise ValueError("atr_medium must not exceed atr_high")
+        if self.rsi_bearish > self.rsi_bullish:
+            raise ValueError("rsi_bearish must not exceed rsi_bullish")
 
-    # UPTREND: BUY on pullback
-    if indicators.trend == "UP":
-        # Ideal: pullback + bullish momentum
-        if indicators.pullback_detected and indicators.momentum_signal == "BULLISH":
-            confidence = calculate_confidence(indicators, SignalAction.BUY, current_price)
-            return SignalResult(
-                action=SignalAction.BUY,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🟢 TREND BUY\nUptrend with pullback to MA. RSI: {indicators.rsi:.1f} (bullish).\nATR: {indicators.atr:.6f} ({indicators.volatility_level}).\nStrong continuation setup.",
-                entry_time="Now",
-                entry_instruction=determine_entry_instruction(timeframe)
-            )
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StrategyParams":
+        """Build from a {name: value} dict; unknown names raise ValueError"""
+        types = {f.name: f.type for f in fields(cls)}
+        unknown = set(data) - set(types)
+        if unknown:
+            raise ValueError(f"Unknown strategy parameters: {', '.join(sorted(unknown))}")
+        return cls(**{name: int(value) if types[name] in (int, "int") else float(value)
+                      for name, value in data.items()})
 
-        # Good: pullback without momentum (neutral RSI)
-        if indicators.pullback_detected:
-            confidence = calculate_confidence(indicators, SignalAction.BUY, current_price)
-            return SignalResult(
-                action=SignalAction.BUY,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🟡 TREND BUY\nUptrend with pullback to MA. RSI: {indicators.rsi:.1f} (neutral).\nGood risk/reward at support level {indicators.support:.6f}.",
-                entry_time="Now",
-                entry_instruction=determine_entry_instruction(timeframe)
-            )
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
-        # Weak: Trend exists but no pullback, price at SMA
-        if indicators.momentum_signal == "BULLISH":
-            confidence = calculate_confidence(indicators, SignalAction.BUY, current_price)
-            return SignalResult(
-                action=SignalAction.BUY,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"Uptrend continues. RSI: {indicators.rsi:.1f} (bullish). Wait for pullback for better entry.",
-                entry_time="Next 5 candles",
-                entry_instruction=determine_entry_instruction(timeframe)
-            )
+    @classmethod
+    def load(cls, path: str) -> "StrategyParams":
+        """Read a config file: {"params": {...}} or a plain {name: value} object"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls.from_dict(data.get("params", data))
 
-    # DOWNTREND: SELL on pullback
-    if indicators.trend == "DOWN":
-        # Ideal: pullback + bearish momentum
-        if indicators.pullback_detected and indicators.momentum_signal == "BEARISH":
-            confidence = calculate_confidence(indicators, SignalAction.SELL, current_price)
-            return SignalResult(
-                action=SignalAction.SELL,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🔴 TREND SELL\nDowntrend with pullback to MA. RSI: {indicators.rsi:.1f} (bearish).\nATR: {indicators.atr:.6f} ({indicators.volatility_level}).\nStrong continuation setup.",
-                entry_time="Now",
-                entry_instruction=determine_entry_instruction(timeframe)
-            )
+    def save(self, path: str, **extra: Any) -> None:
+        """Write a config file loadable by ``load``; ``extra`` keys are stored alongside"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"params": self.to_dict(), **extra}, f, indent=2)
 
-        # Good: pullback without momentum (neutral RSI)
-        if indicators.pullback_detected:
-            confidence = calculate_confidence(indicators, SignalAction.SELL, current_price)
-            return SignalResult(
-                action=SignalAction.SELL,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🟡 TREND SELL\nDowntrend with pullback to MA. RSI: {indicators.rsi:.1f} (neutral).\nGood risk/reward at resistance level {indicators.resistance:.6f}.",
-                entry_time="Now",
-                entry_instruction=determine_entry_instruction(timeframe)
-            )
+    @classmethod
+    def from_env(cls) -> "StrategyParams":
+        """Parameters from the STRATEGY_CONFIG file, defaults when unset"""
+        path = os.getenv("STRATEGY_CONFIG")
+        if not path:
+            return cls()
+        params = cls.load(path)
+        logger.info("Strategy parameters loaded from %s: %s", path, params)
+        return params
 
-        # Weak: Trend exists but no pullback, price at SMA
-        if indicators.momentum_signal == "BEARISH":
-            confidence = calculate_confidence(indicators, SignalAction.SELL, current_price)
-            return SignalResult(
-                action=SignalAction.SELL,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"Downtrend continues. RSI: {indicators.rsi:.1f} (bearish). Wait for pullback for better entry.",
-                entry_time="Next 5 candles",
-                entry_instruction=determine_entry_instruction(timeframe)
-            )
 
+# shared parameters used when a function is not given its own
+strategy_params = StrategyParams.from_env()
+
+
+@dataclass
+class Candle:
+    """Single OHLC candle"""
+    open: float
+    high: float
+    low: float
+    close: float
+    timestamp: float = 0.0   # Candle open time (epoch seconds), 0 if unknown
+
+    @property
+    def range(self) -> float:
+        """High-low range of the candle"""
+        return self.high - self.low
+
+
+@dataclass
+class SignalResult:
+    """Complete trading signal with reasoning"""
+    action: SignalAction
+    confidence: int          # 0-100
+    timeframe: str
+    pair: str
+    current_price: float
+    support: float
+    resistance: float
+    reasoning: str
+    entry_time: str          # "Now" / "Next candle" / "Wait for setup"
+    entry_instruction: str = ""
+    # seconds spent per generation stage (see StageTimer)
+    timings: Dict[str, float] = field(default_factory=dict, compare=False, repr=False)
+
+    def to_message(self) -> str:
+        """Render the signal as a plain-text message"""
+        if self.action == SignalAction.WAIT:
+            lines = [
+                "⏸️ WAIT / NO SIGNAL",
+                "",
+                f"Pair: {self.pair}",
+                f"Timeframe: {self.timeframe}",
+                f"Price: {self.current_price:.5f}",
+                "",
+                f"Reason: {self.reasoning}",
+                "",
+                f"Recommendation: {self.entry_time}.",
+            ]
+            return "\n".join(lines)
+
+        arrow = "↗️" if self.action == SignalAction.BUY else "↘️"
+        lines = [
+            "📊 TRADING SIGNAL",
+            "",
+            f"Pair: {self.pair}",
+            f"Action: {self.action.value} {arrow}",
+            f"Timeframe: {self.timeframe}",
+            f"Entry Time: {self.entry_time}",
+            f"Confidence: {self.confidence}%",
+        ]
+        if self.entry_instruction:
+            lines.append(f"Entry: {self.entry_instruction}")
+        lines += [
+            "",
+            "Key Levels:",
+            f"Resistance: {self.resistance:.5f}",
+            f"Support: {self.support:.5f}",
+            "",
+            f"Analysis: {self.reasoning}",
+        ]
+        return "\n".join(lines)
+
+
+# ===== Strategy Rules =====
+# action codes of the vectorized strategy
+ACTION_CODES = {SignalAction.BUY: 1, SignalAction.SELL: -1, SignalAction.WAIT: 0}
+
+# conditions the strategy tables may use: scalar form over a TechnicalIndicators
+# record, vector form over indicator arrays and ``indicator_masks``
+SIGNAL_CONDITIONS = {
+    "up": Condition(
+        lambda ind, p: ind.trend == "UP",
+        lambda v, m, p: m["up"]),
+    "down": Condition(
+        lambda ind, p: ind.trend == "DOWN",
+        lambda v, m, p: m["down"]),
+    "flat": Condition(
+        lambda ind, p: ind.trend == "FLAT",
+        lambda v, m, p: ~(m["up"] | m["down"])),
+    "high_volatility": Condition(
+        lambda ind, p: ind.volatility_level == "HIGH",
+        lambda v, m, p: m["high_volatility"]),
+    "low_volatility": Condition(
+        lambda ind, p: ind.volatility_level == "LOW",
+        lambda v, m, p: m["low_volatility"]),
+    "bullish": Condition(
+        lambda ind, p: ind.momentum_signal == "BULLISH",
+        lambda v, m, p: m["bullish"]),
+    "bearish": Condition(
+        lambda ind, p: ind.momentum_signal == "BEARISH",
+        lambda v, m, p: m["bearish"]),
+    "neutral": Condition(
+        lambda ind, p: ind.momentum_signal == "NEUTRAL",
+        lambda v, m, p: ~(m["bullish"] | m["bearish"])),
+    "pullback": Condition(
+        lambda ind, p: ind.pullback_detected,
+        lambda v, m, p: m["pullback"]),
+    "oversold": Condition(
+        lambda ind, p: ind.rsi < p.rsi_oversold,
+        lambda v, m, p: v["rsi"] < p.rsi_oversold),
+    "overbought": Condition(
+        lambda ind, p: ind.rsi > p.rsi_overbought,
+        lambda v, m, p: v["rsi"] > p.rsi_overbought),
+    "rsi_upper_half": Condition(
+        lambda ind, p: ind.rsi >= 50,
+        lambda v, m, p: v["rsi"] >= 50),
+    "rsi_lower_half": Condition(
+        lambda ind, p: ind.rsi <= 50,
+        lambda v, m, p: v["rsi"] <= 50),
+}
+
+# Trend + Pullback + Momentum confirmation (1m, 3m, 5m); first match wins
+SHORT_RULES = (
+    # Reject flat/choppy markets
+    Rule(SignalAction.WAIT, ("flat",), confidence="none", entry_time="Wait for breakout",
+         reasoning="No clear trend. Market is trading sideways."),
+    # Reject extremely high volatility (too risky)
+    Rule(SignalAction.WAIT, ("high_volatility",), confidence="none", entry_time="Wait for stabilization",
+         reasoning="Volatility too high. Market is risky and unstable."),
+    # UPTREND: BUY on pullback. Ideal: pullback + bullish momentum
+    Rule(SignalAction.BUY, ("up", "pullback", "bullish"), entry_time="Now",
+         reasoning="🟢 TREND BUY\nUptrend with pullback to MA. RSI: {rsi:.1f} (bullish).\n"
+                   "ATR: {atr:.6f} ({volatility_level}).\nStrong continuation setup."),
+    # Good: pullback without momentum (neutral RSI)
+    Rule(SignalAction.BUY, ("up", "pullback"), entry_time="Now",
+         reasoning="🟡 TREND BUY\nUptrend with pullback to MA. RSI: {rsi:.1f} (neutral).\n"
+                   "Good risk/reward at support level {support:.6f}."),
+    # Weak: Trend exists but no pullback, price at SMA
+    Rule(SignalAction.BUY, ("up", "bullish"), entry_time="Next 5 candles",
+         reasoning="Uptrend continues. RSI: {rsi:.1f} (bullish). Wait for pullback for better entry."),
+    # DOWNTREND: SELL on pullback, same three grades
+    Rule(SignalAction.SELL, ("down", "pullback", "bearish"), entry_time="Now",
+         reasoning="🔴 TREND SELL\nDowntrend with pullback to MA. RSI: {rsi:.1f} (bearish).\n"
+                   "ATR: {atr:.6f} ({volatility_level}).\nStrong continuation setup."),
+    Rule(SignalAction.SELL, ("down", "pullback"), entry_time="Now",
+         reasoning="🟡 TREND SELL\nDowntrend with pullback to MA. RSI: {rsi:.1f} (neutral).\n"
+                   "Good risk/reward at resistance level {resistance:.6f}."),
+    Rule(SignalAction.SELL, ("down", "bearish"), entry_time="Next 5 candles",
+         reasoning="Downtrend continues. RSI: {rsi:.1f} (bearish). Wait for pullback for better entry."),
+    Rule(SignalAction.WAIT, confidence="none", entry_time="Wait for setup",
+         reasoning="Unable to determine reliable signal from current market conditions."),
+)
+
+# Volatility + Momentum filters (5s, 10s, 15s, 30s); first match wins
+ULTRA_SHORT_RULES = (
+    # Reject flat markets
+    Rule(SignalAction.WAIT, ("low_volatility",), confidence="none", entry_time="Wait for volatility",
+         reasoning="⏸️ WAIT — NO SIGNAL\nMarket is too flat. ATR: {atr:.6f} (LOW).\n"
+                   "RSI: {rsi:.1f} | Momentum: {momentum_signal}\n"
+                   "Waiting for volatility expansion and clear direction."),
+    # Reject if no clear momentum
+    Rule(SignalAction.WAIT, ("neutral",), confidence="none", entry_time="Wait for setup",
+         reasoning="⏸️ WAIT — NO SIGNAL\nNo clear momentum direction.\nRSI at {rsi:.1f} (neutral 40-60 zone).\n"
+                   "Volatility: {volatility_level} | Waiting for momentum alignment."),
+    # BUY: Oversold + Bullish momentum
+    Rule(SignalAction.BUY, ("oversold", "bullish"), entry_time="Immediate",
+         reasoning="🟢 STRONG BUY\nRSI oversold at {rsi:.1f}, bullish momentum confirmed.\n"
+                   "Volatility: {volatility_level} (ATR: {atr_text})\nQuick reversal expected."),
+    # SELL: Overbought + Bearish momentum
+    Rule(SignalAction.SELL, ("overbought", "bearish"), entry_time="Immediate",
+         reasoning="🔴 STRONG SELL\nRSI overbought at {rsi:.1f}, bearish momentum confirmed.\n"
+                   "Volatility: {volatility_level} (ATR: {atr_text})\nQuick reversal expected."),
+    # Weak momentum in direction
+    Rule(SignalAction.BUY, ("bullish", "rsi_upper_half"), entry_time="Next candle",
+         reasoning="🟡 MILD BUY\nBullish bias (RSI: {rsi:.1f}).\nVolatility: {volatility_level}. Moderate risk.\n"
+                   "Consider waiting for stronger signal or lower entry."),
+    Rule(SignalAction.SELL, ("bearish", "rsi_lower_half"), entry_time="Next candle",
+         reasoning="🟡 MILD SELL\nBearish bias (RSI: {rsi:.1f}).\nVolatility: {volatility_level}. Moderate risk.\n"
+                   "Consider waiting for stronger signal or higher entry."),
+    Rule(SignalAction.WAIT, confidence="none", entry_time="Wait for setup",
+         reasoning="Mixed signals. Waiting for alignment between trend, momentum, and volatility."),
+)
+
+SHORT_STRATEGY = compile_rules("short", SHORT_RULES, SIGNAL_CONDITIONS, codes=ACTION_CODES)
+ULTRA_SHORT_STRATEGY = compile_rules("ultra_short", ULTRA_SHORT_RULES, SIGNAL_CONDITIONS, codes=ACTION_CODES)
+
+
+def _signal_from_rule(
+    rule: Rule,
+    indicators: TechnicalIndicators,
+    pair: str,
+    timeframe: str,
+    current_price: float,
+    params: StrategyParams
+) -> SignalResult:
+    """Build the SignalResult for the rule a strategy table selected"""
+    context = vars(indicators)
+    if "{atr_text}" in rule.reasoning:
+        context = dict(context, atr_text=f"{indicators.atr:.6f}" if indicators.atr > 0 else "N/A")
+    confidence = 0
+    if rule.confidence == "score":
+        confidence = calculate_confidence(indicators, rule.action, current_price, params)
     return SignalResult(
-        action=SignalAction.WAIT,
-        confidence=0,
+        action=rule.action,
+        confidence=confidence,
         timeframe=timeframe,
         pair=pair,
         current_price=current_price,
         support=indicators.support,
         resistance=indicators.resistance,
-        reasoning="Unable to determine reliable signal from current market conditions.",
-        entry_time="Wait for setup",
+        reasoning=rule.reasoning.format_map(context),
+        entry_time=rule.entry_time,
         entry_instruction=determine_entry_instruction(timeframe)
     )
-    
+
+
+def generate_signal_short(
+    indicators: TechnicalIndicators,
+    pair: str,
+    timeframe: str,
+    current_price: float,
+    params: Optional[StrategyParams] = None
+) -> SignalResult:
+    """
+    Signal logic for short timeframes: 1m, 3m, 5m
+    Strategy: Trend + Pullback + Momentum confirmation
+
+    Entry conditions (see SHORT_RULES):
+    - Clear trend (EMA alignment)
+    - Pullback to trend line for entry
+    - Momentum confirms trend direction
+    - Volatility not extreme (not risky)
+    """
+    params = params or strategy_params
+    rule = SHORT_STRATEGY.decide(indicators, params)
+    return _signal_from_rule(rule, indicators, pair, timeframe, current_price, params)
 
 
 # ===== Technical Indicators Calculation =====
@@ -235,7 +405,12 @@ def calculate_ema(prices: List[float], period: int) -> float:
     return ema
 
 
-def calculate_confidence(indicators: TechnicalIndicators, action: SignalAction, current_price: float) -> int:
+def calculate_confidence(
+    indicators: TechnicalIndicators,
+    action: SignalAction,
+    current_price: float,
+    params: Optional[StrategyParams] = None
+) -> int:
     """Score confidence based on weighted technical factors.
 
     Base 50%.  Additional points:
@@ -243,7 +418,7 @@ def calculate_confidence(indicators: TechnicalIndicators, action: SignalAction,
     * +15 ATR/volatility confirmation (non-LOW volatility)
     * +15 Trend alignment (trend matches action)
     * +15 Momentum alignment (momentum matches action)
-    * +10 Support/Resistance bounce (price near level)
+    * +10 Support/Resistance bounce (price within ``sr_bounce`` of the level)
 
     Maximum 90%. ``WAIT`` always returns 0.
     """
@@ -269,10 +444,11 @@ def calculate_confidence(indicators: TechnicalIndicators, action: SignalAction,
         action == SignalAction.SELL and indicators.momentum_signal == "BEARISH"
     ):
         score += 15
-    # support/resistance bounce (within 0.1% of level)
-    if action == SignalAction.BUY and abs(current_price - indicators.support) < 0.001 * current_price:
+    # support/resistance bounce (within 0.1% of level by default)
+    bounce = (params or strategy_params).sr_bounce * current_price
+    if action == SignalAction.BUY and abs(current_price - indicators.support) < bounce:
         score += 10
-    if action == SignalAction.SELL and abs(current_price - indicators.resistance) < 0.001 * current_price:
+    if action == SignalAction.SELL and abs(current_price - indicators.resistance) < bounce:
         score += 10
 
     return min(score, 90)
@@ -373,54 +549,88 @@ def calculate_atr(candles: List[Candle], period: int = 14) -> float:
     return sum(true_ranges[-period:]) / period
 
 
-def calculate_indicators(candles: List[Candle]) -> TechnicalIndicators:
+def calculate_indicators(candles: List[Candle], params: Optional[StrategyParams] = None) -> TechnicalIndicators:
     """Calculate all technical indicators from candle history"""
+    params = params or strategy_params
     closes = [c.close for c in candles]
     
     # Moving averages (SMA still kept for backward compatibility)
     sma_fast = calculate_sma(closes, 5)
     sma_slow = calculate_sma(closes, 20)
     # Exponential moving averages for trend detection
-    ema_fast = calculate_ema(closes, 5)
-    ema_slow = calculate_ema(closes, 20)
+    ema_fast = calculate_ema(closes, params.ema_fast)
+    ema_slow = calculate_ema(closes, params.ema_slow)
+    
+    # ATR and volatility
+    atr = calculate_atr(candles, 14)
+    avg_closes = closes[-vector_indicators.AVG_PRICE_WINDOW:]
+    avg_price = sum(avg_closes) / len(avg_closes)
     
+    # RSI and momentum
+    rsi = calculate_rsi(closes, 14)
+    
+    # Support/Resistance (simple recent high/low)
+    recent_candles = candles[-20:]
+    support = min(c.low for c in recent_candles)
+    resistance = max(c.high for c in recent_candles)
+    
+    return build_indicators(
+        sma_fast, sma_slow, ema_fast, ema_slow, atr, avg_price, rsi,
+        support, resistance, closes[-1], params
+    )
+
+
+def calculate_indicators_from_arrays(highs, lows, closes, params: Optional[StrategyParams] = None) -> TechnicalIndicators:
+    """Calculate indicators from column arrays (e.g. zero-copy CandleStore views)"""
+    params = params or strategy_params
+    values = vector_indicators.indicator_values(highs, lows, closes, params.ema_fast, params.ema_slow)
+    return build_indicators(**{name: float(value[0]) for name, value in values.items()}, params=params)
+
+
+def build_indicators(
+    sma_fast: float,
+    sma_slow: float,
+    ema_fast: float,
+    ema_slow: float,
+    atr: float,
+    avg_price: float,
+    rsi: float,
+    support: float,
+    resistance: float,
+    last_close: float,
+    params: Optional[StrategyParams] = None
+) -> TechnicalIndicators:
+    """Classify raw indicator values into a TechnicalIndicators record.
+
+    Shared by the full-history path (``calculate_indicators``) and the
+    streaming engine so both apply exactly the same thresholds.
+    """
+    params = params or strategy_params
     # Determine trend using EMA (more responsive)
-    if ema_fast > ema_slow * 1.001:
+    if ema_fast > ema_slow * (1 + params.trend_band):
         trend = "UP"
-    elif ema_fast < ema_slow * 0.999:
+    elif ema_fast < ema_slow * (1 - params.trend_band):
         trend = "DOWN"
     else:
         trend = "FLAT"
     
-    # ATR and volatility
-    atr = calculate_atr(candles, 14)
-    avg_price = sum(closes) / len(closes)
     atr_percent = (atr / avg_price) * 100
-    
-    if atr_percent > 0.5:
+    if atr_percent > params.atr_high:
         volatility_level = "HIGH"
-    elif atr_percent > 0.2:
+    elif atr_percent > params.atr_medium:
         volatility_level = "MEDIUM"
     else:
         volatility_level = "LOW"
     
-    # RSI and momentum
-    rsi = calculate_rsi(closes, 14)
     # momentum based on RSI threshold
-    if rsi > 60:
+    if rsi > params.rsi_bullish:
         momentum_signal = "BULLISH"
-    elif rsi < 40:
+    elif rsi < params.rsi_bearish:
         momentum_signal = "BEARISH"
     else:
         momentum_signal = "NEUTRAL"
     
-    # Support/Resistance (simple recent high/low)
-    recent_candles = candles[-20:]
-    support = min(c.low for c in recent_candles)
-    resistance = max(c.high for c in recent_candles)
-    
     # Pullback detection (price pulled back toward MA)
-    last_close = closes[-1]
     pullback_detected = False
     if trend == "UP" and last_close < sma_fast:
         pullback_detected = True
@@ -443,280 +653,576 @@ def calculate_indicators(candles: List[Candle]) -> TechnicalIndicators:
     )
 
 
+def indicator_masks(
+    values: Dict[str, "np.ndarray"],
+    params: Optional[StrategyParams] = None
+) -> Dict[str, "np.ndarray"]:
+    """Vectorized ``build_indicators`` thresholds as one boolean array per condition.
+
+    ``values`` is the dict returned by ``vector_indicators.indicator_values``
+    (or ``indicator_series``); keys are up/down (trend), high_volatility /
+    low_volatility, bullish/bearish (momentum) and pullback.
+    """
+    params = params or strategy_params
+    ema_fast, ema_slow = values["ema_fast"], values["ema_slow"]
+    up = ema_fast > ema_slow * (1 + params.trend_band)
+    down = ~up & (ema_fast < ema_slow * (1 - params.trend_band))
+    
+    atr_percent = (values["atr"] / values["avg_price"]) * 100
+    high_volatility = atr_percent > params.atr_high
+    low_volatility = ~high_volatility & ~(atr_percent > params.atr_medium)
+    
+    rsi = values["rsi"]
+    bullish = rsi > params.rsi_bullish
+    bearish = ~bullish & (rsi < params.rsi_bearish)
+    
+    last_close, sma_fast = values["last_close"], values["sma_fast"]
+    pullback = (up & (last_close < sma_fast)) | (down & (last_close > sma_fast))
+    
+    return {
+        "up": up,
+        "down": down,
+        "high_volatility": high_volatility,
+        "low_volatility": low_volatility,
+        "bullish": bullish,
+        "bearish": bearish,
+        "pullback": pullback,
+    }
+
+
+def classify_indicator_arrays(
+    values: Dict[str, "np.ndarray"],
+    params: Optional[StrategyParams] = None
+) -> Dict[str, "np.ndarray"]:
+    """Vectorized ``build_indicators`` classification for batch results.
+
+    ``values`` is the dict returned by ``vector_indicators.indicator_values``;
+    the returned arrays hold one label per row.
+    """
+    masks = indicator_masks(values, params)
+    return {
+        "trend": np.where(masks["up"], "UP", np.where(masks["down"], "DOWN", "FLAT")),
+        "volatility_level": np.where(
+            masks["high_volatility"], "HIGH",
+            np.where(masks["low_volatility"], "LOW", "MEDIUM")
+        ),
+        "momentum_signal": np.where(
+            masks["bullish"], "BULLISH",
+            np.where(masks["bearish"], "BEARISH", "NEUTRAL")
+        ),
+        "pullback_detected": masks["pullback"],
+    }
+
+
+# ===== Streaming Indicator Engine =====
+class StreamingIndicators:
+    """
+    Incremental indicator state for a single (pair, timeframe) series.
+
+    Each ``push`` costs O(1) regardless of history length: EMAs and the
+    running total of the last AVG_PRICE_WINDOW closes are updated in
+    place, and the windowed values (SMA, RSI, ATR, support/resistance) are
+    recomputed from small fixed-size deques.  Fed the same candles,
+    ``snapshot`` returns the same values as ``calculate_indicators`` over
+    the CandleStore window (the last AVG_PRICE_WINDOW candles).
+
+    The most recent candle may still be forming; ``replace_last`` swaps it
+    for an updated version without disturbing the rest of the state.
+
+    Args:
+        params: EMA periods and thresholds (default: the shared strategy_params)
+    """
+
+    FAST = 5
+    SLOW = 20
+    RSI_PERIOD = 14
+    ATR_PERIOD = 14
+    SR_WINDOW = 20
+    AVG_WINDOW = vector_indicators.AVG_PRICE_WINDOW
+
+    def __init__(self, params: Optional[StrategyParams] = None) -> None:
+        self.params = params or strategy_params
+        self._alpha_fast = 2 / (self.params.ema_fast + 1)
+        self._alpha_slow = 2 / (self.params.ema_slow + 1)
+        # windows keep one spare slot so the last push can be undone
+        self._closes: deque = deque(maxlen=max(self.SLOW, self.RSI_PERIOD + 1) + 1)
+        self._lows: deque = deque(maxlen=self.SR_WINDOW + 1)
+        self._highs: deque = deque(maxlen=self.SR_WINDOW + 1)
+        self._true_ranges: deque = deque(maxlen=self.ATR_PERIOD + 1)
+        self._avg_closes: deque = deque(maxlen=self.AVG_WINDOW + 1)
+        self._first_range = 0.0
+        self._ema_fast = 0.0
+        self._ema_slow = 0.0
+        self._close_sum = 0.0
+        self._count = 0
+        self._prev_close = 0.0
+        self._undo: Optional[Tuple[float, float, float, float, bool]] = None
+        self.last_timestamp: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def push(self, candle: Candle) -> None:
+        """Append a new candle to the series."""
+        self.push_values(candle.timestamp, candle.open, candle.high, candle.low, candle.close)
+
+    def push_values(self, timestamp: float, open_: float, high: float, low: float, close: float) -> None:
+        """Append a new candle given as plain values (no Candle object needed)."""
+        has_tr = self._count > 0
+        self._undo = (self._ema_fast, self._ema_slow, self._close_sum, self._prev_close, has_tr)
+
+        if self._count == 0:
+            self._ema_fast = close
+            self._ema_slow = close
+            self._first_range = high - low
+        else:
+            alpha_fast, alpha_slow = self._alpha_fast, self._alpha_slow
+            self._ema_fast = alpha_fast * close + (1 - alpha_fast) * self._ema_fast
+            self._ema_slow = alpha_slow * close + (1 - alpha_slow) * self._ema_slow
+            self._true_ranges.append(max(
+                high - low,
+                abs(high - self._prev_close),
+                abs(low - self._prev_close)
+            ))
+
+        self._closes.append(close)
+        self._lows.append(low)
+        self._highs.append(high)
+        self._avg_closes.append(close)
+        self._close_sum += close
+        if len(self._avg_closes) > self.AVG_WINDOW:
+            # the oldest close only stays for replace_last; drop it from the window
+            self._close_sum -= self._avg_closes[0]
+        self._count += 1
+        self._prev_close = close
+        self.last_timestamp = timestamp
+
+    def replace_last(self, candle: Candle) -> None:
+        """Replace the most recently pushed candle (e.g. a forming bar)."""
+        self.replace_last_values(candle.timestamp, candle.open, candle.high, candle.low, candle.close)
+
+    def replace_last_values(self, timestamp: float, open_: float, high: float, low: float, close: float) -> None:
+        """``replace_last`` for a candle given as plain values."""
+        if self._undo is None:
+            raise ValueError("No candle to replace")
+        self._ema_fast, self._ema_slow, self._close_sum, self._prev_close, has_tr = self._undo
+        self._closes.pop()
+        self._lows.pop()
+        self._highs.pop()
+        self._avg_closes.pop()
+        if has_tr:
+            self._true_ranges.pop()
+        self._count -= 1
+        self.push_values(timestamp, open_, high, low, close)
+
+    def snapshot(self) -> TechnicalIndicators:
+        """Return the indicators for the current state of the series."""
+        if self._count == 0:
+            raise ValueError("No candles pushed yet")
+        closes = list(self._closes)
+
+        sma_fast = calculate_sma(closes, self.FAST)
+        sma_slow = calculate_sma(closes[-self.SLOW:], self.SLOW)
+
+        true_ranges = list(self._true_ranges)[-self.ATR_PERIOD:]
+        if not true_ranges:
+            atr = self._first_range
+        else:
+            atr = sum(true_ranges) / len(true_ranges)
+        avg_price = self._close_sum / min(self._count, self.AVG_WINDOW)
+
+        if self._count < self.RSI_PERIOD + 1:
+            rsi = 50.0
+        else:
+            rsi = calculate_rsi(closes[-(self.RSI_PERIOD + 1):], self.RSI_PERIOD)
+
+        support = min(list(self._lows)[-self.SR_WINDOW:])
+        resistance = max(list(self._highs)[-self.SR_WINDOW:])
+
+        return build_indicators(
+            sma_fast, sma_slow, self._ema_fast, self._ema_slow, atr, avg_price, rsi,
+            support, resistance, closes[-1], self.params
+        )
+
+
+class IndicatorEngine:
+    """
+    Registry of ``StreamingIndicators`` keyed by (pair, timeframe).
+
+    Candles live in the columnar ``CandleStore`` for the series; the engine
+    only pushes the rows that arrived since its last sync, so repeated
+    requests for the same pair within a candle do no indicator work at all.
+    Records must carry a ``timestamp`` (candle open time) for incremental
+    updates; callers fall back to ``calculate_indicators`` otherwise.
+    """
+
+    def __init__(self, stores: Optional[CandleStoreRegistry] = None) -> None:
+        self.stores = stores if stores is not None else candle_stores
+        self._series: Dict[Tuple[str, str], StreamingIndicators] = {}
+        self._registry_lock = threading.Lock()
+
+    def _get(self, pair: str, timeframe: str) -> StreamingIndicators:
+        key = (pair, timeframe)
+        series = self._series.get(key)
+        if series is None:
+            with self._registry_lock:
+                series = self._series.get(key)
+                if series is None:
+                    series = StreamingIndicators()
+                    self._series[key] = series
+        return series
+
+    def update(self, pair: str, timeframe: str, records: List[Dict]) -> Optional[TechnicalIndicators]:
+        """Write market data records to the candle store and return the indicators.
+
+        Returns None when the series holds fewer than 5 candles.
+        """
+        store = self.stores.get(pair, timeframe)
+        with store.lock:
+            store.extend_records(records)
+        return self.sync(pair, timeframe)
+
+    def sync(self, pair: str, timeframe: str) -> Optional[TechnicalIndicators]:
+        """Push candles added to the series' store since the last sync.
+
+        Returns None when the series holds fewer than 5 candles.
+        """
+        store = self.stores.get(pair, timeframe)
+        series = self._get(pair, timeframe)
+        with store.lock:
+            rows = store.since(series.last_timestamp)
+            stamps, opens, highs, lows, closes = (col.tolist() for col in rows)
+            last_ts = series.last_timestamp
+            for ts, o, h, l, c in zip(stamps, opens, highs, lows, closes):
+                if last_ts is not None and ts == last_ts:
+                    series.replace_last_values(ts, o, h, l, c)
+                else:
+                    series.push_values(ts, o, h, l, c)
+                last_ts = ts
+            if len(series) < 5:
+                return None
+            return series.snapshot()
+
+    def reset(self, pair: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        """Drop stored indicator state for one series, or for all series."""
+        with self._registry_lock:
+            if pair is None:
+                self._series.clear()
+            else:
+                self._series.pop((pair, timeframe or ""), None)
+
+
+# shared engine used by generate_trading_signal
+indicator_engine = IndicatorEngine()
+
+
 # ===== Signal Generation Logic =====
 def generate_signal_ultra_short(
     indicators: TechnicalIndicators,
     pair: str,
     timeframe: str,
-    current_price: float
+    current_price: float,
+    params: Optional[StrategyParams] = None
 ) -> SignalResult:
     """
     Signal logic for ultra-short timeframes: 5s, 10s, 15s, 30s
     Strategy: Volatility + Momentum filters
     
-    Entry conditions:
+    Entry conditions (see ULTRA_SHORT_RULES):
     - Medium-High volatility (for movement)
     - RSI extreme (oversold/overbought) + momentum
     - No flat markets
     """
-    # Reject flat markets
-    if indicators.volatility_level == "LOW":
-        return SignalResult(
-            action=SignalAction.WAIT,
-            confidence=0,
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning=f"⏸️ WAIT — NO SIGNAL\nMarket is too flat. ATR: {indicators.atr:.6f} (LOW).\nRSI: {indicators.rsi:.1f} | Momentum: {indicators.momentum_signal}\nWaiting for volatility expansion and clear direction.",
-            entry_time="Wait for volatility",
-            entry_instruction=determine_entry_instruction(timeframe)
-        )
-    
-    # Reject if no clear momentum
-    if indicators.momentum_signal == "NEUTRAL":
+    params = params or strategy_params
+    rule = ULTRA_SHORT_STRATEGY.decide(indicators, params)
+    return _signal_from_rule(rule, indicators, pair, timeframe, current_price, params)
+
+
+# ===== Price Data Simulation =====
+def simulate_price_history(
+    current_price: float,
+    num_candles: int = 50,
+    volatility: float = 0.001,
+    trend: str = "neutral",
+    seed: Optional[int] = None
+) -> List[Candle]:
+    """
+    Generate realistic price movement using Gaussian distribution.
+
+    Args:
+        current_price: Current market price (last close of the series)
+        num_candles: Historical candles to generate
+        volatility: Per-candle volatility (fraction of price)
+        trend: "uptrend" / "downtrend" / "flat" / "high_volatility" / "neutral"
+        seed: Random seed; derived from the inputs when omitted so that the
+              same request always sees the same history
+
+    Returns:
+        List of Candle objects (OHLC data), oldest first
+    """
+    if seed is None:
+        rng = random.Random(f"{current_price:.8f}:{num_candles}:{trend}")
+    else:
+        rng = random.Random(seed)
+
+    drift = 0.0
+    noise = volatility
+    if trend == "uptrend":
+        drift = volatility * 0.6
+    elif trend == "downtrend":
+        drift = -volatility * 0.6
+    elif trend == "flat":
+        noise = volatility * 0.2
+    elif trend == "high_volatility":
+        noise = volatility * 8
+
+    # build a relative path, then scale it so the last close is current_price
+    path = []
+    price = 1.0
+    for _ in range(num_candles):
+        open_ = price
+        close = open_ * (1 + drift + rng.gauss(0, noise))
+        high = max(open_, close) * (1 + abs(rng.gauss(0, noise)) * 0.5)
+        low = min(open_, close) * (1 - abs(rng.gauss(0, noise)) * 0.5)
+        path.append((open_, high, low, close))
+        price = close
+
+    scale = current_price / price
+    return [
+        Candle(open=o * scale, high=h * scale, low=l * scale, close=c * scale)
+        for o, h, l, c in path
+    ]
+
+
+def _validate_signal_request(
+    pair: str,
+    timeframe: str,
+    current_price: float
+) -> Optional[SignalResult]:
+    """Return a WAIT result for invalid inputs, None when the request is valid"""
+    if not pair or not isinstance(pair, str):
+        logger.error("Invalid pair: %s", pair)
         return SignalResult(
             action=SignalAction.WAIT,
             confidence=0,
             timeframe=timeframe,
             pair=pair,
             current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning=f"⏸️ WAIT — NO SIGNAL\nNo clear momentum direction.\nRSI at {indicators.rsi:.1f} (neutral 40-60 zone).\nVolatility: {indicators.volatility_level} | Waiting for momentum alignment.",
-            entry_time="Wait for setup",
-            entry_instruction=determine_entry_instruction(timeframe)
-        )
-    
-    # BUY: Oversold + Bullish momentum
-    if indicators.rsi < 35 and indicators.momentum_signal == "BULLISH":
-        confidence = int(65 + (35 - indicators.rsi))  # Higher confidence if very oversold
-        confidence = min(90, confidence)
-        vol_text = f"{indicators.atr:.6f}" if indicators.atr > 0 else "N/A"
-        
-        confidence = calculate_confidence(indicators, SignalAction.BUY, current_price)
-        return SignalResult(
-            action=SignalAction.BUY,
-            confidence=confidence,
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning=f"🟢 STRONG BUY\nRSI oversold at {indicators.rsi:.1f}, bullish momentum confirmed.\nVolatility: {indicators.volatility_level} (ATR: {vol_text})\nQuick reversal expected.",
-            entry_time="Immediate",
-            entry_instruction=determine_entry_instruction(timeframe)
-        )
-    
-    # SELL: Overbought + Bearish momentum
-    if indicators.rsi > 65 and indicators.momentum_signal == "BEARISH":
-        confidence = int(65 + (indicators.rsi - 65))  # Higher confidence if very overbought
-        confidence = min(90, confidence)
-        vol_text = f"{indicators.atr:.6f}" if indicators.atr > 0 else "N/A"
-        
-        confidence = calculate_confidence(indicators, SignalAction.SELL, current_price)
-        return SignalResult(
-            action=SignalAction.SELL,
-            confidence=confidence,
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning=f"🔴 STRONG SELL\nRSI overbought at {indicators.rsi:.1f}, bearish momentum confirmed.\nVolatility: {indicators.volatility_level} (ATR: {vol_text})\nQuick reversal expected.",
-            entry_time="Immediate",
-            entry_instruction=determine_entry_instruction(timeframe)
-        )
-    
-    # Weak momentum in direction
-    if indicators.momentum_signal == "BULLISH" and indicators.rsi >= 50:
-        confidence = int(50 + (indicators.rsi - 50) * 0.4)
-        confidence = calculate_confidence(indicators, SignalAction.BUY, current_price)
-        return SignalResult(
-            action=SignalAction.BUY,
-            confidence=min(90, confidence),
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning=f"🟡 MILD BUY\nBullish bias (RSI: {indicators.rsi:.1f}).\nVolatility: {indicators.volatility_level}. Moderate risk.\nConsider waiting for stronger signal or lower entry.",
-            entry_time="Next candle",
-            entry_instruction=determine_entry_instruction(timeframe)
-        )
-    
-    if indicators.momentum_signal == "BEARISH" and indicators.rsi <= 50:
-        confidence = int(50 + (50 - indicators.rsi) * 0.4)
-        confidence = calculate_confidence(indicators, SignalAction.SELL, current_price)
-        return SignalResult(
-            action=SignalAction.SELL,
-            confidence=min(90, confidence),
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning=f"🟡 MILD SELL\nBearish bias (RSI: {indicators.rsi:.1f}).\nVolatility: {indicators.volatility_level}. Moderate risk.\nConsider waiting for stronger signal or higher entry.",
-            entry_time="Next candle",
-            entry_instruction=determine_entry_instruction(timeframe)
+            support=current_price * 0.99,
+            resistance=current_price * 1.01,
+            reasoning="Invalid pair specified.",
+            entry_time="N/A"
         )
     
-    # Default: wait
-    return SignalResult(
-        action=SignalAction.WAIT,
-        confidence=0,
-        timeframe=timeframe,
-        pair=pair,
-        current_price=current_price,
-        support=indicators.support,
-        resistance=indicators.resistance,
-        reasoning="Mixed signals. Waiting for alignment between trend, momentum, and volatility.",
-            entry_time="Wait for setup",
-            entry_instruction=determine_entry_instruction(timeframe)
-    """
-    Signal logic for short timeframes: 1m, 3m, 5m
-    Strategy: Trend + Pullback + Momentum confirmation
-    
-    Entry conditions:
-    - Clear trend (SMA alignment)
-    - Pullback to trend line for entry
-    - Momentum confirms trend direction
-    - Volatility not extreme (not risky)
-    """
-    # Reject flat/choppy markets
-    if indicators.trend == "FLAT":
+    # allow a broader set of timeframes; actual available list is controlled by bot UI
+    valid_tfs = {"5s", "10s", "15s", "30s",
+                 "1m", "3m", "5m", "10m", "15m", "30m", "1h"}
+    if timeframe not in valid_tfs:
+        logger.error("Invalid timeframe: %s", timeframe)
         return SignalResult(
             action=SignalAction.WAIT,
             confidence=0,
             timeframe=timeframe,
             pair=pair,
             current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning="No clear trend. Market is trading sideways.",
-            entry_time="Wait for breakout"
+            support=current_price * 0.99,
+            resistance=current_price * 1.01,
+            reasoning="Invalid timeframe specified.",
+            entry_time="N/A"
         )
     
-    # Reject extremely high volatility (too risky)
-    if indicators.volatility_level == "HIGH":
+    if not isinstance(current_price, (int, float)) or current_price <= 0:
+        logger.error("Invalid price: %s", current_price)
         return SignalResult(
             action=SignalAction.WAIT,
             confidence=0,
             timeframe=timeframe,
             pair=pair,
             current_price=current_price,
-            support=indicators.support,
-            resistance=indicators.resistance,
-            reasoning="Volatility too high. Market is risky and unstable.",
-            entry_time="Wait for stabilization"
+            support=current_price * 0.99 if current_price > 0 else 0,
+            resistance=current_price * 1.01 if current_price > 0 else 0,
+            reasoning="Invalid price data.",
+            entry_time="N/A"
         )
-    
-    # UPTREND: BUY on pullback
-    if indicators.trend == "UP":
-        # Ideal: pullback + bullish momentum
-        if indicators.pullback_detected and indicators.momentum_signal == "BULLISH":
-            confidence = 80
-            return SignalResult(
-                action=SignalAction.BUY,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🟢 TREND BUY\nUptrend with pullback to MA. RSI: {indicators.rsi:.1f} (bullish).\nATR: {indicators.atr:.6f} ({indicators.volatility_level}).\nStrong continuation setup.",
-                entry_time="Now"
-            )
-        
-        # Good: pullback without momentum (neutral RSI)
-        if indicators.pullback_detected:
-            confidence = 70
-            return SignalResult(
-                action=SignalAction.BUY,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🟡 TREND BUY\nUptrend with pullback to MA. RSI: {indicators.rsi:.1f} (neutral).\nGood risk/reward at support level {indicators.support:.6f}.",
-                entry_time="Now"
-            )
-        
-        # Weak: Trend exists but no pullback, price at SMA
-        if indicators.momentum_signal == "BULLISH":
-            confidence = 60
-            return SignalResult(
-                action=SignalAction.BUY,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"Uptrend continues. RSI: {indicators.rsi:.1f} (bullish). Wait for pullback for better entry.",
-                entry_time="Next 5 candles"
-            )
-    
-    # DOWNTREND: SELL on pullback
-    if indicators.trend == "DOWN":
-        # Ideal: pullback + bearish momentum
-        if indicators.pullback_detected and indicators.momentum_signal == "BEARISH":
-            confidence = 80
-            return SignalResult(
-                action=SignalAction.SELL,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🔴 TREND SELL\nDowntrend with pullback to MA. RSI: {indicators.rsi:.1f} (bearish).\nATR: {indicators.atr:.6f} ({indicators.volatility_level}).\nStrong continuation setup.",
-                entry_time="Now"
-            )
-        
-        # Good: pullback without momentum (neutral RSI)
-        if indicators.pullback_detected:
-            confidence = 70
-            return SignalResult(
-                action=SignalAction.SELL,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"🟡 TREND SELL\nDowntrend with pullback to MA. RSI: {indicators.rsi:.1f} (neutral).\nGood risk/reward at resistance level {indicators.resistance:.6f}.",
-                entry_time="Now"
-            )
-        
-        # Weak: Trend exists but no pullback, price at SMA
-        if indicators.momentum_signal == "BEARISH":
-            confidence = 60
-            return SignalResult(
-                action=SignalAction.SELL,
-                confidence=confidence,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=indicators.support,
-                resistance=indicators.resistance,
-                reasoning=f"Downtrend continues. RSI: {indicators.rsi:.1f} (bearish). Wait for pullback for better entry.",
-                entry_time="Next 5 candles"
-            )
-    
+    return None
+
+
+def _error_signal(pair: str, timeframe: str, current_price: float) -> SignalResult:
+    """WAIT result returned when signal calculation fails"""
     return SignalResult(
         action=SignalAction.WAIT,
         confidence=0,
         timeframe=timeframe,
         pair=pair,
         current_price=current_price,
-        support=indicators.support,
-        resistance=indicators.resistance,
-        reasoning="Unable to determine reliable signal from current market conditions.",
-        entry_time="Wait for setup"
+        support=current_price * 0.99 if current_price > 0 else 0,
+        resistance=current_price * 1.01 if current_price > 0 else 0,
+        reasoning="Error calculating signal. Please try again.",
+        entry_time="N/A"
+    )
+
+
+def _load_candles(
+    pair: str,
+    timeframe: str,
+    current_price: float,
+    candles_data: Optional[List[Dict]] = None
+) -> List[Candle]:
+    """Convert market data records to candles, simulating history if too few"""
+    candles: List[Candle] = []
+    if candles_data:
+        # convert dictionary records to Candle objects
+        for rec in candles_data:
+            try:
+                candles.append(Candle(
+                    open=rec["open"],
+                    high=rec["high"],
+                    low=rec["low"],
+                    close=rec["close"],
+                ))
+            except Exception:
+                continue
+    # if we failed to get enough candles, fall back to simulation
+    if len(candles) < 5:
+        # choose volatility/length based on timeframe
+        if timeframe in ULTRA_SHORT_TIMEFRAMES:
+            volatility = 0.0005
+            num_candles = 30
+        else:
+            volatility = 0.001
+            num_candles = 50
+
+        # simple deterministic trend for tests
+        pair_upper = pair.upper()
+        pair_condition_map = {
+            "CAD/JPY": "neutral",
+            "GBP/JPY": "uptrend",
+            "EUR/GBP": "flat",
+            "USD/CNH": "high_volatility",
+            "AUD/CAD": "downtrend",
+            "AUD/JPY": "neutral",
+            # legacy
+            "EURUSD": "neutral",
+            "GBPUSD": "uptrend",
+            "USDJPY": "flat",
+            "XAUUSD": "high_volatility",
+            "AUDUSD": "downtrend",
+            "XAGUSD": "neutral",
+        }
+        detected_trend = pair_condition_map.get(pair_upper, "neutral")
+        candles = simulate_price_history(current_price, num_candles, volatility, detected_trend)
+    return candles
+
+
+def _load_ohlc_columns(pair: str, timeframe: str, current_price: float) -> Tuple:
+    """Return (highs, lows, closes) arrays for a request.
+
+    Resampled or timestamped feeds are read as zero-copy views of the
+    series' CandleStore; anything else goes through ``_load_candles``.
+    """
+    store = candle_stores.get(pair, timeframe)
+    if resampler.refresh(pair, get_market_data):
+        with store.lock:
+            view = store.view()
+        if len(view.close) >= 5:
+            return view.high, view.low, view.close
+        # derived timeframe still warming up
+        candles_data = get_market_data(pair, timeframe)
+    else:
+        candles_data = get_market_data(pair, timeframe)
+        if candles_data and "timestamp" in candles_data[-1]:
+            with store.lock:
+                store.extend_records(candles_data)
+                view = store.view()
+            if len(view.close) >= 5:
+                return view.high, view.low, view.close
+    candles = _load_candles(pair, timeframe, current_price, candles_data)
+    ohlc = np.array([(c.high, c.low, c.close) for c in candles], dtype=np.float64)
+    return ohlc[:, 0], ohlc[:, 1], ohlc[:, 2]
+
+
+def _apply_strategy(
+    indicators: TechnicalIndicators,
+    pair: str,
+    timeframe: str,
+    current_price: float,
+    params: Optional[StrategyParams] = None
+) -> SignalResult:
+    """Select strategy based on timeframe (ultra-short vs short)"""
+    if timeframe in ULTRA_SHORT_TIMEFRAMES:
+        return generate_signal_ultra_short(indicators, pair, timeframe, current_price, params)
+    return generate_signal_short(indicators, pair, timeframe, current_price, params)
+
+
+def calculate_confidence_arrays(
+    values: Dict[str, "np.ndarray"],
+    masks: Dict[str, "np.ndarray"],
+    action: "np.ndarray",
+    prices: "np.ndarray",
+    params: Optional[StrategyParams] = None
+) -> "np.ndarray":
+    """Vectorized ``calculate_confidence`` for action codes (see ACTION_CODES)"""
+    buy, sell = action == 1, action == -1
+    rsi = values["rsi"]
+    bounce = (params or strategy_params).sr_bounce * prices
+    near_support = np.abs(prices - values["support"]) < bounce
+    near_resistance = np.abs(prices - values["resistance"]) < bounce
+    score = (
+        50
+        + 15 * ((buy & (rsi < 30)) | (sell & (rsi > 70)))
+        + 15 * ~masks["low_volatility"]
+        + 15 * ((buy & masks["up"]) | (sell & masks["down"]))
+        + 15 * ((buy & masks["bullish"]) | (sell & masks["bearish"]))
+        + 10 * ((buy & near_support) | (sell & near_resistance))
     )
+    return np.where(action == 0, 0, np.minimum(score, 90))
+
+
+def apply_strategy_arrays(
+    values: Dict[str, "np.ndarray"],
+    masks: Dict[str, "np.ndarray"],
+    timeframe: str,
+    prices: "np.ndarray",
+    params: Optional[StrategyParams] = None
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Vectorized ``_apply_strategy``: (action codes, confidences) per row.
+
+    ``masks`` comes from ``indicator_masks`` (with the same ``params``);
+    rows are matched against the same rule tables as
+    ``generate_signal_short`` and ``generate_signal_ultra_short``.
+    """
+    params = params or strategy_params
+    strategy = ULTRA_SHORT_STRATEGY if timeframe in ULTRA_SHORT_TIMEFRAMES else SHORT_STRATEGY
+    rule = strategy.decide_arrays(values, masks, params)
+    action = strategy.codes.take(rule)
+    confidence = calculate_confidence_arrays(values, masks, action, prices, params)
+    confidence *= _SCORED[strategy.name].take(rule)
+    return action, confidence
+
+
+# rules whose confidence rule is "score", per strategy (for apply_strategy_arrays)
+_SCORED = {s.name: s.column("confidence") == "score" for s in (SHORT_STRATEGY, ULTRA_SHORT_STRATEGY)}
+
+
+class StageTimer:
+    """Accumulates perf_counter time per named stage between ``mark`` calls"""
+    __slots__ = ("timings", "_last")
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Charge the time since the previous mark to ``stage``"""
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def observe(self) -> Dict[str, float]:
+        """Record the stage timings in the stage histogram and return them"""
+        for stage, seconds in self.timings.items():
+            SIGNAL_STAGE_SECONDS.labels(stage=stage).observe(seconds)
+        return self.timings
 
 
 def generate_trading_signal(
@@ -726,6 +1232,8 @@ def generate_trading_signal(
 ) -> SignalResult:
     """
     Main signal generation function.
+
+    Sampled through cProfile when SIGNAL_PROFILE_SAMPLE is set (see profiling.py).
     
     Workflow:
     1. Simulate price history (in production, fetch real data)
@@ -741,100 +1249,44 @@ def generate_trading_signal(
     Returns:
         SignalResult with action, confidence, and reasoning
     """
+    return signal_profiler.call(_generate_trading_signal, pair, timeframe, current_price)
+
+
+def _generate_trading_signal(pair: str, timeframe: str, current_price: float) -> SignalResult:
     try:
         # Validate inputs
-        if not pair or not isinstance(pair, str):
-            logger.error("Invalid pair: %s", pair)
-            return SignalResult(
-                action=SignalAction.WAIT,
-                confidence=0,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=current_price * 0.99,
-                resistance=current_price * 1.01,
-                reasoning="Invalid pair specified.",
-                entry_time="N/A"
-            )
+        invalid = _validate_signal_request(pair, timeframe, current_price)
+        if invalid is not None:
+            return invalid
         
-        # allow a broader set of timeframes; actual available list is controlled by bot UI
-        valid_tfs = {"5s", "10s", "15s", "30s",
-                     "1m", "3m", "5m", "10m", "15m", "30m", "1h"}
-        if timeframe not in valid_tfs:
-            logger.error("Invalid timeframe: %s", timeframe)
-            return SignalResult(
-                action=SignalAction.WAIT,
-                confidence=0,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=current_price * 0.99,
-                resistance=current_price * 1.01,
-                reasoning="Invalid timeframe specified.",
-                entry_time="N/A"
-            )
-        
-        if not isinstance(current_price, (int, float)) or current_price <= 0:
-            logger.error("Invalid price: %s", current_price)
-            return SignalResult(
-                action=SignalAction.WAIT,
-                confidence=0,
-                timeframe=timeframe,
-                pair=pair,
-                current_price=current_price,
-                support=current_price * 0.99 if current_price > 0 else 0,
-                resistance=current_price * 1.01 if current_price > 0 else 0,
-                reasoning="Invalid price data.",
-                entry_time="N/A"
-            )
-        
-        # Attempt to fetch real market data first
-        candles_data = get_market_data(pair, timeframe)
-        candles: List[Candle] = []
-        if candles_data:
-            # convert dictionary records to Candle objects
-            for rec in candles_data:
-                try:
-                    candles.append(Candle(
-                        open=rec["open"],
-                        high=rec["high"],
-                        low=rec["low"],
-                        close=rec["close"],
-                    ))
-                except Exception:
-                    continue
-        # if we failed to get enough candles, fall back to simulation
-        if len(candles) < 5:
-            # choose volatility/length based on timeframe
-            if timeframe in ["5s", "10s", "15s", "30s"]:
-                volatility = 0.0005
-                num_candles = 30
-            else:
-                volatility = 0.001
-                num_candles = 50
-
-            # simple deterministic trend for tests
-            pair_upper = pair.upper()
-            pair_condition_map = {
-                "CAD/JPY": "neutral",
-                "GBP/JPY": "uptrend",
-                "EUR/GBP": "flat",
-                "USD/CNH": "high_volatility",
-                "AUD/CAD": "downtrend",
-                "AUD/JPY": "neutral",
-                # legacy
-                "EURUSD": "neutral",
-                "GBPUSD": "uptrend",
-                "USDJPY": "flat",
-                "XAUUSD": "high_volatility",
-                "AUDUSD": "downtrend",
-                "XAGUSD": "neutral",
-            }
-            detected_trend = pair_condition_map.get(pair_upper, "neutral")
-            candles = simulate_price_history(current_price, num_candles, volatility, detected_trend)
+        # Attempt to fetch real market data first: one base-timeframe fetch
+        # per pair feeds every timeframe through the resampler
+        timer = StageTimer()
+        indicators: Optional[TechnicalIndicators] = None
+        candles_data = None
+        has_base = resampler.refresh(pair, get_market_data)
+        if not has_base:
+            candles_data = get_market_data(pair, timeframe)
+        timer.mark("fetch")
+
+        if has_base:
+            indicators = indicator_engine.sync(pair, timeframe)
+            timer.mark("indicators")
+            if indicators is None:
+                # derived timeframe still warming up
+                candles_data = get_market_data(pair, timeframe)
+                timer.mark("fetch")
+        elif candles_data and "timestamp" in candles_data[-1]:
+            # timestamped feed: only new candles touch the streaming engine
+            indicators = indicator_engine.update(pair, timeframe, candles_data)
+            timer.mark("indicators")
 
         # Calculate technical indicators
-        indicators = calculate_indicators(candles)
+        if indicators is None:
+            candles = _load_candles(pair, timeframe, current_price, candles_data)
+            timer.mark("convert")
+            indicators = calculate_indicators(candles)
+            timer.mark("indicators")
         
         logger.debug(
             "Indicators for %s [%s]: Trend=%s, Volatility=%s, RSI=%.1f, Momentum=%s",
@@ -842,11 +1294,10 @@ def generate_trading_signal(
             indicators.rsi, indicators.momentum_signal
         )
         
-        # Select strategy based on timeframe (ultra-short vs short)
-        if timeframe in ["5s", "10s", "15s", "30s"]:
-            signal = generate_signal_ultra_short(indicators, pair, timeframe, current_price)
-        else:
-            signal = generate_signal_short(indicators, pair, timeframe, current_price)
+        # strategy selection plus building the reasoning text
+        signal = _apply_strategy(indicators, pair, timeframe, current_price)
+        timer.mark("strategy")
+        signal.timings = timer.observe()
         
         logger.info(
             "Signal generated for %s [%s]: %s (confidence: %d%%)",
@@ -857,14 +1308,84 @@ def generate_trading_signal(
     
     except Exception as e:
         logger.exception("Error generating signal for %s [%s]", pair, timeframe)
-        return SignalResult(
-            action=SignalAction.WAIT,
-            confidence=0,
-            timeframe=timeframe,
-            pair=pair,
-            current_price=current_price,
-            support=current_price * 0.99 if current_price > 0 else 0,
-            resistance=current_price * 1.01 if current_price > 0 else 0,
-            reasoning="Error calculating signal. Please try again.",
-            entry_time="N/A"
-        )
+        return _error_signal(pair, timeframe, current_price)
+
+
+def generate_trading_signals_batch(
+    requests: List[Tuple[str, str, float]]
+) -> List[SignalResult]:
+    """
+    Vectorized signal generation for many pairs/timeframes at once.
+    
+    Candle histories of equal length are stacked into 2-D arrays and the
+    indicators plus trend/volatility/momentum classifications are computed
+    for all rows in one pass (see vector_indicators.py). Only the final
+    strategy step runs per request.
+    
+    Args:
+        requests: List of (pair, timeframe, current_price) tuples
+    
+    Returns:
+        SignalResults in the same order as ``requests``
+    """
+    results: List[Optional[SignalResult]] = [None] * len(requests)
+    # rows grouped by history length: (request index, (highs, lows, closes))
+    groups: Dict[int, List[Tuple[int, Tuple]]] = {}
+    timers: Dict[int, StageTimer] = {}
+    
+    for idx, (pair, timeframe, current_price) in enumerate(requests):
+        try:
+            invalid = _validate_signal_request(pair, timeframe, current_price)
+            if invalid is not None:
+                results[idx] = invalid
+                continue
+            timers[idx] = timer = StageTimer()
+            columns = _load_ohlc_columns(pair, timeframe, current_price)
+            timer.mark("fetch")
+            groups.setdefault(len(columns[2]), []).append((idx, columns))
+        except Exception:
+            logger.exception("Error loading candles for %s [%s]", pair, timeframe)
+            results[idx] = _error_signal(pair, timeframe, current_price)
+    
+    for rows in groups.values():
+        try:
+            started = time.perf_counter()
+            highs = np.stack([columns[0] for _, columns in rows])
+            lows = np.stack([columns[1] for _, columns in rows])
+            closes = np.stack([columns[2] for _, columns in rows])
+            values = vector_indicators.indicator_values(
+                highs, lows, closes, strategy_params.ema_fast, strategy_params.ema_slow
+            )
+            labels = classify_indicator_arrays(values)
+            # the vectorized pass is shared: charge each row its share
+            shared = (time.perf_counter() - started) / len(rows)
+            for row, (idx, _) in enumerate(rows):
+                pair, timeframe, current_price = requests[idx]
+                indicators = TechnicalIndicators(
+                    sma_fast=float(values["sma_fast"][row]),
+                    sma_slow=float(values["sma_slow"][row]),
+                    ema_fast=float(values["ema_fast"][row]),
+                    ema_slow=float(values["ema_slow"][row]),
+                    trend=str(labels["trend"][row]),
+                    atr=float(values["atr"][row]),
+                    volatility_level=str(labels["volatility_level"][row]),
+                    rsi=float(values["rsi"][row]),
+                    momentum_signal=str(labels["momentum_signal"][row]),
+                    pullback_detected=bool(labels["pullback_detected"][row]),
+                    support=float(values["support"][row]),
+                    resistance=float(values["resistance"][row])
+                )
+                timer = timers[idx]
+                timer.timings["indicators"] = shared
+                strategy_started = time.perf_counter()
+                results[idx] = _apply_strategy(indicators, pair, timeframe, current_price)
+                timer.timings["strategy"] = time.perf_counter() - strategy_started
+                results[idx].timings = timer.observe()
+        except Exception:
+            logger.exception("Error in batch signal generation (%d requests)", len(rows))
+            for idx, _ in rows:
+                pair, timeframe, current_price = requests[idx]
+                results[idx] = _error_signal(pair, timeframe, current_price)
+    
+    logger.info("Batch signals generated for %d requests", len(requests))
+    return [r for r in results if r is not None]
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Vectorized Technical Indicators (NumPy)
+
+Array versions of the indicator functions in trading_logic.py. Every
+function takes 2-D arrays shaped (rows, candles) - one row per
+pair/timeframe history, oldest candle first - and returns one value per
+row, so a whole market refresh is a handful of array operations instead
+of one pure-Python pass per request.
+
+The ``*_series`` functions take a single 1-D history instead and return
+the indicator at every candle, as the scalar function would compute it
+over the candles up to and including that one (used by backtest.py).
+
+Results match the scalar functions up to floating point rounding.
+"""
+
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from candle_store import DEFAULT_CAPACITY
+
+# block length of the blocked EMA recurrence in ema_series
+EMA_BLOCK = 256
+
+# closes averaged into avg_price (the ATR% volatility reference): the
+# CandleStore window the live signal paths read
+AVG_PRICE_WINDOW = DEFAULT_CAPACITY
+
+
+def _as_2d(values) -> np.ndarray:
+    """Return values as a float64 array with at least two dimensions"""
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr[np.newaxis, :]
+    return arr
+
+
+def ema_last(closes, period: int) -> np.ndarray:
+    """Exponential Moving Average of each row (seeded with the first close)"""
+    closes = _as_2d(closes)
+    n = closes.shape[1]
+    if n == 0:
+        return np.zeros(closes.shape[0])
+    alpha = 2 / (period + 1)
+    # ema_n = (1-a)^(n-1) * p0 + sum_i a * (1-a)^(n-1-i) * p_i
+    weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (n - 1)
+    return closes @ weights
+
+
+def sma_last(closes, period: int) -> np.ndarray:
+    """Simple Moving Average of the last ``period`` closes of each row"""
+    closes = _as_2d(closes)
+    return closes[:, -period:].mean(axis=1)
+
+
+def rsi_last(closes, period: int = 14) -> np.ndarray:
+    """Relative Strength Index (0-100) of each row, 50 when history is short"""
+    closes = _as_2d(closes)
+    if closes.shape[1] < period + 1:
+        return np.full(closes.shape[0], 50.0)
+
+    deltas = np.diff(closes[:, -(period + 1):], axis=1)
+    avg_gain = np.clip(deltas, 0, None).sum(axis=1) / period
+    avg_loss = np.clip(-deltas, 0, None).sum(axis=1) / period
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = np.where(avg_loss == 0, 100.0, rsi)
+    return np.clip(rsi, 0, 100)
+
+
+def true_range(highs, lows, closes) -> np.ndarray:
+    """True range of every candle after the first (shape: rows, candles - 1)"""
+    highs, lows, closes = _as_2d(highs), _as_2d(lows), _as_2d(closes)
+    prev_close = closes[:, :-1]
+    high, low = highs[:, 1:], lows[:, 1:]
+    return np.maximum.reduce([
+        high - low,
+        np.abs(high - prev_close),
+        np.abs(low - prev_close),
+    ])
+
+
+def atr_last(highs, lows, closes, period: int = 14) -> np.ndarray:
+    """Average True Range of each row"""
+    highs, lows, closes = _as_2d(highs), _as_2d(lows), _as_2d(closes)
+    if closes.shape[1] < 2:
+        return highs[:, 0] - lows[:, 0]
+    return true_range(highs, lows, closes)[:, -period:].mean(axis=1)
+
+
+def indicator_values(highs, lows, closes, ema_fast: int = 5, ema_slow: int = 20) -> Dict[str, np.ndarray]:
+    """
+    Raw indicator values for every row, using the same periods as
+    ``trading_logic.calculate_indicators`` (EMA periods per StrategyParams).
+
+    Returns a dict of 1-D arrays keyed like the arguments of
+    ``trading_logic.build_indicators``.
+    """
+    highs, lows, closes = _as_2d(highs), _as_2d(lows), _as_2d(closes)
+    return {
+        "sma_fast": sma_last(closes, 5),
+        "sma_slow": sma_last(closes, 20),
+        "ema_fast": ema_last(closes, ema_fast),
+        "ema_slow": ema_last(closes, ema_slow),
+        "atr": atr_last(highs, lows, closes, 14),
+        "avg_price": closes[:, -AVG_PRICE_WINDOW:].mean(axis=1),
+        "rsi": rsi_last(closes, 14),
+        "support": lows[:, -20:].min(axis=1),
+        "resistance": highs[:, -20:].max(axis=1),
+        "last_close": closes[:, -1],
+    }
+
+
+# ===== Per-candle series (1-D histories) =====
+
+def _window(values: np.ndarray, period: int, fill: float) -> np.ndarray:
+    """Trailing windows of ``period`` values, front-padded with ``fill``"""
+    padded = np.concatenate([np.full(period - 1, fill), values])
+    return sliding_window_view(padded, period)
+
+
+def _window_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """Mean of the last ``period`` values (fewer at the start) at every index"""
+    counts = np.minimum(np.arange(1, len(values) + 1), period)
+    return _window(values, period, 0.0).sum(axis=1) / counts
+
+
+def _running_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """``_window_mean`` for long windows: one cumulative sum instead of ``period`` adds per index"""
+    if len(values) == 0:
+        return values.copy()
+    # offset by the first value so the running sums stay small
+    base = values[0]
+    sums = np.cumsum(values - base)
+    totals = sums.copy()
+    totals[period:] -= sums[:-period]
+    counts = np.minimum(np.arange(1, len(values) + 1), period)
+    return base + totals / counts
+
+
+def ema_series(closes, period: int, block: int = EMA_BLOCK) -> np.ndarray:
+    """EMA at every candle (seeded with the first close).
+
+    The recurrence is solved a block at a time: one matrix product with a
+    lower-triangular Toeplitz matrix of decay weights gives every block's
+    EMA from a zero start, and the value carried in from the previous
+    block is added back with its decay per position.
+    """
+    closes = np.asarray(closes, dtype=np.float64).reshape(-1)
+    n = len(closes)
+    if n == 0:
+        return np.zeros(0)
+    alpha = 2 / (period + 1)
+    decay = 1 - alpha
+    lags = np.subtract.outer(np.arange(block), np.arange(block))
+    weights = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+
+    blocks = np.zeros(-(-n // block) * block)
+    blocks[:n] = closes
+    blocks = blocks.reshape(-1, block)
+    local = blocks @ weights.T
+
+    # EMA just before each block; the seed acts as the value before candle 0
+    carry = np.empty(len(blocks))
+    state = closes[0]
+    tail_decay = decay ** block
+    for i, last in enumerate(local[:, -1].tolist()):
+        carry[i] = state
+        state = last + tail_decay * state
+    ramp = decay ** np.arange(1, block + 1)
+    return (local + carry[:, np.newaxis] * ramp).ravel()[:n]
+
+
+def sma_series(closes, period: int) -> np.ndarray:
+    """SMA of the last ``period`` closes (all of them early on) at every candle"""
+    return _window_mean(np.asarray(closes, dtype=np.float64).reshape(-1), period)
+
+
+def rsi_series(closes, period: int = 14) -> np.ndarray:
+    """RSI at every candle, 50 until ``period + 1`` candles exist"""
+    closes = np.asarray(closes, dtype=np.float64).reshape(-1)
+    rsi = np.full(len(closes), 50.0)
+    if len(closes) < period + 1:
+        return rsi
+    deltas = np.diff(closes)
+    avg_gain = sliding_window_view(np.clip(deltas, 0, None), period).sum(axis=1) / period
+    avg_loss = sliding_window_view(np.clip(-deltas, 0, None), period).sum(axis=1) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi[period:] = np.clip(np.where(avg_loss == 0, 100.0, values), 0, 100)
+    return rsi
+
+
+def atr_series(highs, lows, closes, period: int = 14) -> np.ndarray:
+    """ATR at every candle (the first candle's range before any true range exists)"""
+    highs, lows, closes = (np.asarray(a, dtype=np.float64).reshape(-1) for a in (highs, lows, closes))
+    atr = np.empty(len(closes))
+    if len(closes) == 0:
+        return atr
+    atr[0] = highs[0] - lows[0]
+    atr[1:] = _window_mean(true_range(highs, lows, closes)[0], period)
+    return atr
+
+
+def indicator_series(highs, lows, closes, ema_fast: int = 5, ema_slow: int = 20) -> Dict[str, np.ndarray]:
+    """
+    ``indicator_values`` at every candle of one history.
+
+    Entry ``i`` of each array equals ``indicator_values`` (and
+    ``trading_logic.calculate_indicators``) over candles ``0..i``, and so
+    also over the CandleStore window the live signals see: every windowed
+    value, avg_price included, looks back at most AVG_PRICE_WINDOW candles.
+    """
+    highs, lows, closes = (np.asarray(a, dtype=np.float64).reshape(-1) for a in (highs, lows, closes))
+    return {
+        "sma_fast": sma_series(closes, 5),
+        "sma_slow": sma_series(closes, 20),
+        "ema_fast": ema_series(closes, ema_fast),
+        "ema_slow": ema_series(closes, ema_slow),
+        "atr": atr_series(highs, lows, closes, 14),
+        "avg_price": _running_mean(closes, AVG_PRICE_WINDOW),
+        "rsi": rsi_series(closes, 14),
+        "support": _window(lows, 20, np.inf).min(axis=1),
+        "resistance": _window(highs, 20, -np.inf).max(axis=1),
+        "last_close": closes.copy(),
+    }
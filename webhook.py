@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Webhook Serving Mode
+
+An embedded asyncio HTTP server that receives updates pushed by Telegram
+and feeds them into the application's update_queue, as a low-latency
+alternative to long polling. It needs no extra dependencies (PTB's own
+run_webhook requires the tornado-based ``[webhooks]`` extra).
+
+Configured from the environment (see WebhookConfig.from_env); when
+WEBHOOK_URL is unset or the webhook cannot be set up, signal_bot falls
+back to run_polling.
+
+TimedUpdateQueue stamps every update when it is received (from the
+webhook or from getUpdates) so update-to-handler latency and ingest
+rate can be compared across modes. PerUserUpdateProcessor runs updates
+concurrently across users but one at a time per user.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import secrets
+import signal
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from http_util import http_response, read_http_request
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+UPDATES_RECEIVED = metrics.counter(
+    "bot_updates_received_total", "Updates put on the update queue", ["mode"]
+)
+UPDATE_LATENCY = metrics.histogram(
+    "bot_update_latency_seconds", "Time from update receipt to handler start", ["mode"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+# ===== Update receipt timing =====
+
+class TimedUpdateQueue(asyncio.Queue):
+    """
+    update_queue that remembers when each update arrived.
+
+    Handlers call ``handler_started(update)`` (see signal_bot._instrumented)
+    to record receipt-to-handler latency under the current ``mode``.
+    """
+
+    def __init__(self, mode: str = "polling", max_tracked: int = 10_000) -> None:
+        super().__init__()
+        self.mode = mode
+        self.max_tracked = max_tracked
+        self._received: "OrderedDict[int, float]" = OrderedDict()
+
+    def put_nowait(self, item) -> None:
+        if isinstance(item, Update):
+            self._received[item.update_id] = time.perf_counter()
+            if len(self._received) > self.max_tracked:
+                self._received.popitem(last=False)
+            UPDATES_RECEIVED.labels(mode=self.mode).inc()
+        super().put_nowait(item)
+
+    def handler_started(self, update: object) -> Optional[float]:
+        """Record and return the latency since ``update`` was received"""
+        update_id = getattr(update, "update_id", None)
+        received = self._received.pop(update_id, None)
+        if received is None:
+            return None
+        latency = time.perf_counter() - received
+        UPDATE_LATENCY.labels(mode=self.mode).observe(latency)
+        return latency
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Concurrent update processing, sequential per user.
+
+    Updates from different users run concurrently (up to
+    ``max_concurrent_updates``); a user's own updates run one at a time in
+    arrival order, so handlers reading and writing that user's session
+    (pair_selection, timeframe_selection) never interleave. Updates
+    without a user are not serialized.
+
+    Args:
+        max_concurrent_updates: Updates processed at once across all users
+    """
+
+    def __init__(self, max_concurrent_updates: int) -> None:
+        super().__init__(max_concurrent_updates)
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._pending: Dict[int, int] = {}
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        user = update.effective_user if isinstance(update, Update) else None
+        if user is None:
+            await coroutine
+            return
+        user_id = user.id
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        self._pending[user_id] = self._pending.get(user_id, 0) + 1
+        try:
+            async with lock:
+                await coroutine
+        finally:
+            # forget idle users so the maps only hold users with updates in flight
+            remaining = self._pending[user_id] - 1
+            if remaining:
+                self._pending[user_id] = remaining
+            else:
+                del self._pending[user_id]
+                del self._locks[user_id]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @property
+    def users_in_flight(self) -> int:
+        return len(self._locks)
+
+
+# ===== Webhook server =====
+
+@dataclass
+class WebhookConfig:
+    """Where Telegram should push updates and where we listen for them"""
+    url: str                        # public base URL, e.g. https://bot.example.com
+    listen: str = "0.0.0.0"
+    port: int = 8443
+    url_path: str = "telegram"
+    secret_token: str = ""
+    max_connections: int = 40
+    drop_pending_updates: bool = False
+
+    @property
+    def webhook_url(self) -> str:
+        return f"{self.url.rstrip('/')}/{self.url_path.lstrip('/')}"
+
+    @classmethod
+    def from_env(cls) -> Optional["WebhookConfig"]:
+        """Config from WEBHOOK_* (and Railway's PORT); None when WEBHOOK_URL is unset"""
+        url = os.getenv("WEBHOOK_URL")
+        if not url:
+            return None
+        return cls(
+            url=url,
+            listen=os.getenv("WEBHOOK_LISTEN", "0.0.0.0"),
+            port=int(os.getenv("WEBHOOK_PORT") or os.getenv("PORT") or 8443),
+            url_path=os.getenv("WEBHOOK_PATH", "telegram"),
+            # a random secret still lets us reject requests that did not come from Telegram
+            secret_token=os.getenv("WEBHOOK_SECRET") or secrets.token_urlsafe(32),
+            max_connections=int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40")),
+            drop_pending_updates=os.getenv("WEBHOOK_DROP_PENDING", "0") == "1",
+        )
+
+
+class WebhookServer:
+    """
+    Accepts update POSTs on ``/<url_path>`` and puts them on ``update_queue``.
+
+    Args:
+        update_queue: The application's update queue
+        bot: Bot used to deserialize updates
+        url_path: Path Telegram posts to
+        secret_token: Expected X-Telegram-Bot-Api-Secret-Token ("" = no check)
+    """
+
+    def __init__(self, update_queue: asyncio.Queue, bot, url_path: str, secret_token: str = "") -> None:
+        self.update_queue = update_queue
+        self.bot = bot
+        self.path = "/" + url_path.lstrip("/")
+        self.secret_token = secret_token
+        self.port: Optional[int] = None
+        self.received = 0
+        self.rejected = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, listen: str, port: int) -> int:
+        """Bind and start serving; returns the bound port"""
+        self._server = await asyncio.start_server(self._serve, listen, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Webhook server listening on %s:%d%s", listen, self.port, self.path)
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await read_http_request(reader)
+                if request is None:
+                    break
+                status = await self._handle(*request)
+                writer.write(http_response(status))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> int:
+        if method != "POST" or path.split("?", 1)[0] != self.path:
+            return 404
+        if self.secret_token and not hmac.compare_digest(headers.get(SECRET_HEADER, ""), self.secret_token):
+            self.rejected += 1
+            return 403
+        try:
+            update = Update.de_json(json.loads(body), self.bot)
+        except Exception:
+            logger.warning("Rejected malformed webhook payload")
+            self.rejected += 1
+            return 400
+        self.received += 1
+        await self.update_queue.put(update)
+        return 200
+
+
+async def start_webhook(app, config: WebhookConfig, port: Optional[int] = None) -> WebhookServer:
+    """Start the server and register it with Telegram (``app`` must be initialized).
+
+    The server is bound before set_webhook so Telegram never pushes to a
+    closed port; on any failure it is stopped again and the error raised.
+    """
+    if isinstance(app.update_queue, TimedUpdateQueue):
+        app.update_queue.mode = "webhook"
+    server = WebhookServer(app.update_queue, app.bot, config.url_path, config.secret_token)
+    await server.start(config.listen, config.port if port is None else port)
+    try:
+        await app.bot.set_webhook(
+            url=config.webhook_url,
+            secret_token=config.secret_token or None,
+            max_connections=config.max_connections,
+            drop_pending_updates=config.drop_pending_updates,
+        )
+    except Exception:
+        await server.stop()
+        raise
+    logger.info("Webhook registered at %s", config.webhook_url)
+    return server
+
+
+async def serve_webhook(app, config: WebhookConfig) -> None:
+    """Run the application in webhook mode until SIGINT/SIGTERM.
+
+    Raises if the webhook cannot be started, after undoing initialization,
+    so the caller can fall back to polling.
+    """
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    try:
+        server = await start_webhook(app, config)
+    except Exception:
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+        await app.shutdown()
+        raise
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    await app.start()
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Stopping webhook server (received %d updates)", server.received)
+        await server.stop()
+        await app.stop()
+        if app.post_stop:
+            await app.post_stop(app)
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+        await app.shutdown()